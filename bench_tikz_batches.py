@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the simultaneous parent-change grouping in visualize_rpl.py.
+
+Builds synthetic convergence storms (runs of parent switches sharing one
+timestamp) and times:
+    scan      the former backward scan over the event list (quadratic in N)
+    batches   batch_positions(), the linear grouping stage
+    render    generate_tikz_pages() end to end, output to a temp file
+
+Per-event time of 'batches' and 'render' should stay flat as N grows.
+
+Usage:
+    python3 bench_tikz_batches.py [--sizes 1000,4000,16000,64000] [--max-scan 16000] [--dio-share 0.05]
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+
+from rpl_event_store import KIND_DIO, KIND_DAG
+from visualize_rpl import batch_positions, _parent_change_graph, generate_tikz_pages
+
+NODES = list(range(1, 41))
+STORMS = 4              # Storms per run, one second apart
+
+
+def storm_records(n, dio_share=0.0, seed=1):
+    """
+    n render records in STORMS bursts, each burst a run of parent switches of
+    one graph at one timestamp. dio_share of the records are DIOs, which
+    break the run.
+    """
+    rnd = random.Random(seed)
+    records = []
+    per_storm = n // STORMS
+    for s in range(STORMS):
+        t = 1.0 + s
+        graph = s % 2
+        for _ in range(per_storm):
+            kind = KIND_DIO if rnd.random() < dio_share else KIND_DAG
+            records.append((t, "00:00:01.000", kind, rnd.choice(NODES), rnd.choice(NODES), graph))
+    return records
+
+
+def scan_batches(records):
+    """The former per-event backward scan, kept as the reference."""
+    out = []
+    for i, (t, _, kind, _, _, graph) in enumerate(records):
+        idx_in_batch = 0
+        if kind == KIND_DAG:
+            k = i
+            while k >= 0 and abs(records[k][0] - t) < 0.001 \
+                  and records[k][2] == KIND_DAG and records[k][5] == graph:
+                idx_in_batch += 1
+                k -= 1
+        out.append(idx_in_batch)
+    return out
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simultaneous-event grouping")
+    parser.add_argument("--sizes", default="1000,4000,16000,64000,256000",
+                        help="Comma separated storm sizes (events)")
+    parser.add_argument("--max-scan", type=int, default=16000,
+                        help="Largest size timed with the quadratic scan")
+    parser.add_argument("--dio-share", type=float, default=0.0,
+                        help="Fraction of DIO records inside the storms (default: 0)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    print(f"{'events':>8} {'scan s':>10} {'batches s':>10} {'render s':>10} {'batches us/evt':>15} {'render us/evt':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "storm.tex")
+        for n in sizes:
+            records = storm_records(n, args.dio_share)
+
+            t_batches, batched = timed(lambda r: [idx for _, _, idx in batch_positions(r, _parent_change_graph)], records)
+
+            t_scan = float('nan')
+            if n <= args.max_scan:
+                t_scan, reference = timed(scan_batches, records)
+                if reference != batched:
+                    raise SystemExit(f"Mismatch between scan and batch_positions at n={n}")
+
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                t_render, _ = timed(generate_tikz_pages, NODES, iter(records), out_path)
+
+            print(f"{len(records):8d} {t_scan:10.3f} {t_batches:10.3f} {t_render:10.3f} "
+                  f"{t_batches / len(records) * 1e6:15.2f} {t_render / len(records) * 1e6:14.2f}")
+
+
+if __name__ == "__main__":
+    main()
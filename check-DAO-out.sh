@@ -1,29 +1,4 @@
-# Checking contents of log files
-
-FUNCTION="dao_output_target()"
-SEARCH="Sending a DAO with"
-TEST1a="fd00"
-TEST1b="fd02"
-TEST2a="fd00"
-TEST2b="fd02"
-
-#FUNCTION="dio_input"
-#SEARCH="Processing a DIO out"
-
-#FUNCTION="dao_input_nonstoring()"
-#SEARCH="DAO lifetime:"
-#TEST1a="prefix: fd00"
-#TEST1b="prefix: fd02"
-#TEST2a="fd00"
-#TEST2b="fd02"
-
-echo Parsing output from $FUNCTION
-echo -n "$SEARCH with $TEST1a lines: "
-grep -n "$SEARCH" $1 | grep "$TEST1a" |  wc -l 
-echo -n "$SEARCH with $TEST1b lines: "
-grep -n "$SEARCH" $1 | grep "$TEST1b" |  wc -l
-echo -n "$SEARCH with $TEST1a & $TEST2b lines: "
-grep -n "$SEARCH" $1 | grep "$TEST1a" | grep $TEST2b | wc -l
-#echo -n "$SEARCH with $TEST1b & $TEST2a lines: "
-#grep -n "$SEARCH" $1 | grep "$TEST1b" | grep $TEST2a | wc -l
-
+#!/bin/bash
+# DAOs sent (and received) per prefix, with fd00/fd02 cross-contamination.
+# rpl_dao_stats.py reads the log once; see its --help for --window and --format.
+exec python3 "$(dirname "$(readlink -f "$0")")/rpl_dao_stats.py" "$@"
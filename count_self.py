@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Per-log pattern counts over the whole log archive (was countSelf.sh).
+
+countSelf.sh ran 'grep | grep -c' once per OF x DAG combination, reading
+every log four times. Here each log is memory-mapped, so it is read from
+disk once, and every pattern is counted from that mapping:
+
+    a pattern is a name and one or more regular expressions that must all
+    match a line; patterns sharing their first expression share one scan
+    of the mapping, so the four default patterns cost two in-memory scans
+    (one per DAG prefix), and the other expressions are only tried on the
+    lines found. Matches are taken within their line, so ^ and $ anchor at
+    line ends as with grep.
+
+Logs are scanned in parallel (one process per log). Counts are cached in
+SCAN_CACHE by path, size, mtime and pattern set, so a rescan of an
+unchanged archive only lists the directory.
+
+Usage:
+    python3 count_self.py [log_dir] [--csv counts.csv] [--parquet counts.parquet]
+    python3 count_self.py --pattern 'DIO=Incoming DIO' --pattern 'DAO=Sending DAO'
+"""
+import os
+import re
+import sys
+import csv
+import json
+import mmap
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Configuration ---
+LOG_DIR = Path("/local/scratch/stevecos/logs")
+SCAN_CACHE = Path.home() / "data" / "rpl_cache" / "corpus_scan.json"
+DEFAULT_WORKERS = os.cpu_count() or 1
+SCAN_FORMAT = 2   # Bump when counting changes, so cached counts are redone
+
+# Self-comparisons of the root address, per objective function (countSelf.sh order)
+DEFAULT_PATTERNS = [
+    (f"{of}+fd0{dag}", [f"compare fd0{dag}::209:9:9:9 and fd0{dag}::209", of])
+    for of in ("OF0", "MRHOF") for dag in (0, 2)
+]
+
+
+def patterns_key(patterns):
+    return hashlib.sha1(json.dumps([SCAN_FORMAT, patterns]).encode('utf-8')).hexdigest()[:16]
+
+
+def count_patterns(path, patterns):
+    """{name: matching lines} of one log; each line counts once per pattern, like grep -c."""
+    counts = {name: 0 for name, _ in patterns}
+    if os.path.getsize(path) == 0:
+        return counts
+
+    # Group the patterns by their first expression: one scan of the mapping per group
+    groups = {}
+    for name, expressions in patterns:
+        groups.setdefault(expressions[0], []).append(
+            (name, [re.compile(e.encode('utf-8')) for e in expressions[1:]]))
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        for first, members in groups.items():
+            regex = re.compile(first.encode('utf-8'), re.MULTILINE)
+            pos = 0
+            while pos < size:
+                m = regex.search(mm, pos)
+                if m is None or (m.start() == size and mm[size - 1] == 0x0A):
+                    break   # (Nothing, or only the empty string after the last newline, which is no line)
+                start = mm.rfind(b"\n", 0, m.start()) + 1
+                end = mm.find(b"\n", m.start())
+                if end < 0:
+                    end = size
+                line = mm[start:end]
+                # A match running across a newline ([^x], \s, ...) only counts if one fits in the line
+                if m.end() <= end or regex.search(line):
+                    for name, rest in members:
+                        if all(r.search(line) for r in rest):
+                            counts[name] += 1
+                pos = end + 1
+    return counts
+
+
+def _count_job(job):
+    path, patterns = job
+    try:
+        return path, count_patterns(path, patterns), None
+    except (OSError, ValueError) as e:
+        return path, None, str(e)
+
+
+def load_cache(cache_path=SCAN_CACHE):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, cache_path=SCAN_CACHE):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
+def scan_corpus(log_dir, patterns, workers=DEFAULT_WORKERS, cache_path=SCAN_CACHE, rescan=False):
+    """[(path, {name: count})] for every file of log_dir in name order; (results, n_scanned)."""
+    key = patterns_key(patterns)
+    all_cache = load_cache(cache_path)
+    cache = all_cache.setdefault(key, {})   # One table per pattern set
+    files = sorted(p for p in log_dir.iterdir() if p.is_file())
+
+    results, jobs = {}, []
+    for path in files:
+        st = path.stat()
+        entry = cache.get(str(path))
+        if not rescan and entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            results[path] = entry['counts']
+        else:
+            jobs.append((str(path), patterns))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            # Biggest logs first, so one large log does not finish last on its own
+            jobs.sort(key=lambda j: -os.path.getsize(j[0]))
+            for path, counts, error in pool.map(_count_job, jobs):
+                if counts is None:
+                    print(f"Warning: Skipping {path}: {error}")
+                    continue
+                st = os.stat(path)
+                cache[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'counts': counts}
+                results[Path(path)] = counts
+
+    # Forget logs that are gone
+    for path in [p for p in cache if p.startswith(str(log_dir) + os.sep) and not os.path.exists(p)]:
+        del cache[path]
+    save_cache(all_cache, cache_path)
+    return [(p, results[p]) for p in files if p in results], len(jobs)
+
+
+def parse_pattern_args(specs):
+    """NAME=REGEX options; repeating a NAME adds an expression the line must also match."""
+    patterns = {}
+    for spec in specs:
+        if "=" not in spec:
+            raise ValueError(f"Expected NAME=REGEX, got {spec}")
+        name, expression = spec.split("=", 1)
+        re.compile(expression)
+        patterns.setdefault(name, []).append(expression)
+    return list(patterns.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count patterns in every log of the archive, reading each log once")
+    parser.add_argument("log_dir", type=Path, nargs="?", default=LOG_DIR, help=f"Default: {LOG_DIR}")
+    parser.add_argument("--pattern", action="append", default=[], metavar="NAME=REGEX",
+                        help="Replaces the OF x DAG defaults; repeat a NAME to require several expressions")
+    parser.add_argument("--csv", type=Path, help="Write the file x pattern table as CSV")
+    parser.add_argument("--parquet", type=Path, help="Write the file x pattern table as Parquet (needs pandas)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Logs scanned at the same time (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--rescan", action="store_true", help="Ignore the cached counts")
+    parser.add_argument("--quiet", action="store_true", help="No per-file lines")
+    args = parser.parse_args()
+
+    if not args.log_dir.is_dir():
+        print(f"Directory not found: {args.log_dir}")
+        sys.exit(1)
+    try:
+        patterns = parse_pattern_args(args.pattern) if args.pattern else DEFAULT_PATTERNS
+    except (ValueError, re.error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    names = [name for name, _ in patterns]
+
+    rows, n_scanned = scan_corpus(args.log_dir, patterns, args.workers, rescan=args.rescan)
+
+    if not args.quiet:
+        for path, counts in rows:
+            print(f"{path}: " + "".join(f"{name} = {counts[name]}, " for name in names))
+    print(f"{len(rows)} logs, {n_scanned} scanned, {len(rows) - n_scanned} from cache")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["file"] + names)
+            for path, counts in rows:
+                writer.writerow([str(path)] + [counts[name] for name in names])
+        print(f"Wrote {args.csv}")
+    if args.parquet:
+        try:
+            import pandas as pd
+        except ImportError:
+            print("Error: --parquet needs pandas (and pyarrow); use --csv instead")
+            sys.exit(1)
+        frame = pd.DataFrame([[str(path)] + [counts[name] for name in names] for path, counts in rows],
+                             columns=["file"] + names)
+        frame.to_parquet(args.parquet, index=False)
+        print(f"Wrote {args.parquet}")
+
+
+if __name__ == "__main__":
+    main()
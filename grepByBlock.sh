@@ -1,98 +1,18 @@
 #!/bin/bash
 
-# --- Script Configuration ---
-# Stop the script if any command fails
-#set -e
-# Ensure that a pipeline command fails if any of its components fail
-#set -o pipefail
+# Counts lines matching a pattern in blocks of lines of a (large) log.
+# The work is done by grep_by_block.py (one memory-mapped pass, worker
+# processes for big files); see its --help for several patterns and
+# --format csv/json. Patterns are Python regular expressions (like
+# grep -E), not grep's basic syntax: escape ( ) or pass -F for a plain string.
 
 # Check if the correct number of arguments is provided
 if [ "$#" -lt 3 ]; then
-    echo "Usage: $0 <filename> <block_size> <grep_pattern>"
+    echo "Usage: $0 <filename> <block_size> [-s] [-F] <pattern> [more patterns]"
     echo "Example: $0 my_log.log 20000 'ERROR|WARNING'"
+    echo "Patterns are Python regular expressions (like grep -E); -F for plain strings"
     echo "Not $@"
     exit 1
 fi
 
-start_time=`date +%x-%X`
-temp_dir="/local/scratch/stevecos/"
-temp_file=".current_block_temp.txt"
-
-filename="$1"
-block_size="$2"
-echo $@
-
-if [ "$3" = "-s" ]; then
-    saveFiles=true
-    temp_dir="$temp_dir/grepByBlock/"
-    temp_file=grepByBlock-`date +%Y%m%d%H%M%S`-
-    temp_count=1
-    echo "Saving output files to $temp_dir$temp_file$temp_count.txt"
-    shift
-fi
-
-grep_pattern="$3"
-
-# Validate block_size is a positive integer
-if ! [[ "$block_size" =~ ^[0-9]+$ ]] || [ "$block_size" -eq 0 ]; then
-    echo "Error: Block size must be a positive integer."
-    exit 1
-fi
-
-# Validate file exists
-if [ ! -f "$filename" ]; then
-    echo "Error: File '$filename' not found."
-    exit 1
-fi
-
-temp_fullpath=$temp_dir$temp_file$temp_count.txt 
-mkdir -p $temp_dir
-
-current_line=0
-total_matches=0
-block_number=0
-
-echo "At $start_time, starting analysis of '$filename' with block size '$block_size' and pattern '$grep_pattern'..."
-echo "--------------------------------------------------------------------------------"
-
-# Loop through the file in blocks
-while IFS= read -r line; do
-
-    ((current_line++))
-    echo "$line" >> $temp_fullpath # Write line to a temporary file for the current block
-
-    if [ "$((current_line % block_size))" -eq 0 ]; then
-        ((block_number++))
-        # Use grep -c to count matches in the temporary block file
-        block_matches=$(grep -c "$grep_pattern" $temp_fullpath)
-        total_matches=$((total_matches + block_matches))
-
-        echo "At `date +%X`, Block $((block_number * block_size / block_size)) (lines $(( (block_number - 1) * block_size + 1 )) - $((block_number * block_size))): Matches = $block_matches, Running Total = $total_matches"
-        if [ $saveFiles=true ]; then # increment the count for saved files
-            ((temp_count++))
-            temp_fullpath=$temp_dir$temp_file$temp_count.txt
-        else
-            rm $temp_fullpath # Clear the temporary file for the next block
-        fi
-    fi
-done < "$filename"
-
-# Handle any remaining lines in the last block
-if [ -f $temp_fullpath ]; then
-    ((block_number++))
-    block_matches=$(grep -c "$grep_pattern" $temp_fullpath)
-    total_matches=$((total_matches + block_matches))
-    start_line=$(( (block_number - 1) * block_size + 1 ))
-    end_line=$current_line
-    echo "Block $block_number (lines $start_line - $end_line): Matches = $block_matches, Running Total = $total_matches (Partial Block)"
-    rm $temp_fullpath
-fi
-
-echo    "--------------------------------------------------------------------------------"
-echo    "Analysis complete. Final total matches: $total_matches"
-echo -n "Analysis started at $start_time, finished at `date +%X`"
-if [ $saveFiles=true ]; then 
-    echo " final block saved in $temp_fullpath."
-else
-    echo "."
-fi
+exec python3 "$(dirname "$(readlink -f "$0")")/grep_by_block.py" "$@"
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Counts lines matching one or more patterns in fixed-size blocks of lines.
+
+Replaces the bash loop of grepByBlock.sh (one grep -c per block) with a
+single pass over a memory-mapped file. Files larger than PARALLEL_MIN_BYTES
+are split at line boundaries into CHUNK_BYTES pieces and scanned by worker
+processes; results are printed in block order as they complete.
+
+As with grep -c, a line counts once per pattern however often it matches,
+and matches never run across lines: ^ and $ anchor at every line, and a
+match reaching past the end of its line is retried within the line.
+Patterns are Python regular expressions, so 'ERROR|WARNING' is an
+alternation (as with grep -E) and '(' must be escaped; -F takes them as
+fixed strings, as grep -F does.
+
+Output keeps the grepByBlock.sh lines (block number, line range, matches,
+running total); with several patterns the counts are listed in pattern
+order. --format csv/json gives one record per block for plotting.
+
+--from/--to restrict the scan to a sim-time window, located through the
+log index (rpl_log_index.py) without reading the rest of the file; line
+numbers then count from the first line of the window.
+
+Usage:
+    python3 grep_by_block.py my_log.log 20000 'ERROR|WARNING'
+    python3 grep_by_block.py my_log.log 20000 -s 'Incoming DIO' 'Sending DAO'
+    python3 grep_by_block.py my_log.log 20000 -F 'Incoming DIO (id'
+    python3 grep_by_block.py my_log.log 20000 'DIO' 'DAO' --format csv -o density.csv
+    python3 grep_by_block.py my_log.log 20000 'Incoming DIO' --from 40:00 --to 45:00
+"""
+import os
+import re
+import sys
+import csv
+import json
+import mmap
+import argparse
+from pathlib import Path
+from datetime import datetime
+from multiprocessing import Pool
+
+# --- Configuration ---
+SAVE_DIR = Path("/local/scratch/stevecos/grepByBlock")
+CHUNK_BYTES = 64 * 1024 * 1024
+PARALLEL_MIN_BYTES = 2 * CHUNK_BYTES
+DEFAULT_WORKERS = os.cpu_count() or 1
+RULE = "-" * 80
+
+# --- Worker state (one mapping per process) ---
+_mm = None
+_regexes = None
+
+
+def _init_worker(path, patterns):
+    global _mm, _regexes
+    with open(path, 'rb') as f:
+        _mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    _regexes = [re.compile(p.encode('utf-8'), re.MULTILINE) for p in patterns]
+
+
+def chunk_ranges(mm, size, chunk_bytes=CHUNK_BYTES, start=0):
+    """Byte ranges of about chunk_bytes from start to size, each ending just after a newline (or at size)."""
+    ranges = []
+    while start < size:
+        end = min(size, start + chunk_bytes)
+        if end < size:
+            nl = mm.find(b"\n", end - 1)
+            end = size if nl < 0 else nl + 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _line_count(byte_range):
+    start, end = byte_range
+    data = _mm[start:end]
+    return data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+
+
+def _scan(task):
+    """{block index: [matching lines per pattern]} of one chunk starting at line first_line (0-based)."""
+    start, end, first_line, block_size = task
+    data = _mm[start:end]
+    blocks = {}
+    for p, regex in enumerate(_regexes):
+        pos = counted_to = line = 0
+        while True:
+            m = regex.search(data, pos)
+            if m is None or (m.start() == len(data) and data.endswith(b"\n")):
+                break   # (Nothing, or only the empty string after the last newline, which is no line)
+            nl = data.find(b"\n", m.start())
+            line_end = len(data) if nl < 0 else nl
+            if m.end() > line_end:
+                # Ran across a newline ([^x], \s, ...), which grep never does: retry within the line
+                m = regex.search(data, data.rfind(b"\n", 0, m.start()) + 1, line_end)
+            if m is not None:
+                line += data.count(b"\n", counted_to, m.start())
+                counted_to = m.start()
+                counts = blocks.setdefault((first_line + line) // block_size, [0] * len(_regexes))
+                counts[p] += 1
+            if nl < 0:
+                break
+            pos = nl + 1   # One count per line, like grep -c
+    return blocks
+
+
+def block_counts(path, block_size, patterns, workers=DEFAULT_WORKERS, chunk_bytes=CHUNK_BYTES,
+                 byte_range=None):
+    """
+    Yields (block_number, first_line, last_line, [matches per pattern]) for every
+    block of the file (or of the line-aligned byte_range) in order; line
+    numbers are 1-based and inclusive.
+    """
+    begin, size = byte_range or (0, os.path.getsize(path))
+    if size <= begin:
+        return
+    _init_worker(str(path), patterns)
+    if workers > 1 and size - begin >= PARALLEL_MIN_BYTES:
+        pool = Pool(workers, initializer=_init_worker, initargs=(str(path), patterns))
+        imap = pool.imap
+    else:
+        pool = None
+        imap = map
+
+    try:
+        ranges = chunk_ranges(_mm, size, chunk_bytes, begin)
+        line_counts = list(imap(_line_count, ranges))
+        total_lines = sum(line_counts)
+
+        tasks, first = [], 0
+        for (start, end), n in zip(ranges, line_counts):
+            tasks.append((start, end, first, block_size))
+            first += n
+
+        pending = {}
+        next_block = 0
+        n_blocks = (total_lines + block_size - 1) // block_size
+        for task, n, blocks in zip(tasks, line_counts, imap(_scan, tasks)):
+            for b, counts in blocks.items():
+                acc = pending.setdefault(b, [0] * len(patterns))
+                for i, c in enumerate(counts):
+                    acc[i] += c
+            # Blocks wholly before the end of this chunk are final
+            done_to = (task[2] + n) // block_size if task is not tasks[-1] else n_blocks
+            while next_block < done_to:
+                counts = pending.pop(next_block, [0] * len(patterns))
+                first_line = next_block * block_size + 1
+                yield next_block + 1, first_line, min(total_lines, first_line + block_size - 1), counts
+                next_block += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def save_blocks(path, block_size, save_dir, byte_range=None):
+    """Writes every block to <save_dir>/grepByBlock-<time>-<n>.txt; returns the last file."""
+    save_dir.mkdir(parents=True, exist_ok=True)
+    prefix = f"grepByBlock-{datetime.now().strftime('%Y%m%d%H%M%S')}-"
+    out_path = None
+    begin, end = byte_range or (0, os.path.getsize(path))
+    with open(path, 'rb') as f:
+        f.seek(begin)
+        block_number = 0
+        remaining = end - begin
+        while True:
+            lines = []
+            for line in f:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                lines.append(line)
+                if len(lines) == block_size:
+                    break
+            if not lines:
+                break
+            block_number += 1
+            out_path = save_dir / f"{prefix}{block_number}.txt"
+            with open(out_path, 'wb') as out:
+                out.writelines(lines)
+    return out_path
+
+
+def _fmt(counts):
+    return " / ".join(str(c) for c in counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count pattern matches per block of lines")
+    parser.add_argument("filename", type=Path)
+    parser.add_argument("block_size", help="Lines per block")
+    parser.add_argument("patterns", nargs="+", help="One or more regular expressions, counted separately")
+    parser.add_argument("-F", "--fixed-strings", action="store_true",
+                        help="Patterns are plain strings, not regular expressions (like grep -F)")
+    parser.add_argument("-s", "--save", action="store_true", help="Also save every block under --save-dir")
+    parser.add_argument("--save-dir", type=Path, default=SAVE_DIR, help=f"Default: {SAVE_DIR}")
+    parser.add_argument("--format", choices=("text", "csv", "json"), default="text")
+    parser.add_argument("-o", "--output", type=Path, help="Write csv/json here (the text report still goes to stdout)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Scanner processes for large files (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--from", dest="t_from", help="Sim time to start at: seconds, MM:SS or HH:MM:SS")
+    parser.add_argument("--to", dest="t_to", help="Sim time to stop after")
+    args = parser.parse_intermixed_args()
+
+    if not args.block_size.isdigit() or int(args.block_size) == 0:
+        print("Error: Block size must be a positive integer.")
+        sys.exit(1)
+    block_size = int(args.block_size)
+    if not args.filename.is_file():
+        print(f"Error: File '{args.filename}' not found.")
+        sys.exit(1)
+    patterns = [re.escape(p) for p in args.patterns] if args.fixed_strings else args.patterns
+    for p in patterns:
+        try:
+            re.compile(p, re.MULTILINE)
+        except re.error as e:
+            print(f"Error: Bad pattern '{p}': {e} (use -F for a plain string)")
+            sys.exit(1)
+
+    byte_range = None
+    if args.t_from or args.t_to:
+        from rpl_log_index import load_log_index, parse_window_args   # Needs numpy
+        t_from, t_to = parse_window_args(args)
+        index = load_log_index(args.filename)
+        if not index.monotonic:
+            # Lines are counted, not parsed, so nothing would drop the lines after --to
+            print("Error: Sim time goes backwards in this log (runs appended?), so --from/--to "
+                  "cannot be mapped to a range of lines")
+            sys.exit(1)
+        byte_range = index.byte_range(args.filename, t_from, t_to)
+
+    text = args.format == "text" or args.output is not None
+    start_time = datetime.now()
+    if text:
+        print(f"At {start_time.strftime('%x-%X')}, starting analysis of '{args.filename}' with block size "
+              f"'{block_size}' and pattern{'s' if len(args.patterns) > 1 else ''} "
+              + ", ".join(f"'{p}'" for p in args.patterns) + "...")
+        if byte_range:
+            print(f"Window {args.t_from or 'start'} - {args.t_to or 'end'}: bytes {byte_range[0]} - {byte_range[1]}, "
+                  f"line numbers count from its first line")
+        print(RULE)
+
+    records = []
+    totals = [0] * len(args.patterns)
+    for block, first_line, last_line, counts in block_counts(args.filename, block_size, patterns, args.workers,
+                                                                byte_range=byte_range):
+        totals = [t + c for t, c in zip(totals, counts)]
+        partial = last_line - first_line + 1 < block_size
+        records.append({'block': block, 'first_line': first_line, 'last_line': last_line, 'partial': partial,
+                        'matches': counts, 'running_total': totals})
+        if text:
+            if partial:
+                print(f"Block {block} (lines {first_line} - {last_line}): Matches = {_fmt(counts)}, "
+                      f"Running Total = {_fmt(totals)} (Partial Block)")
+            else:
+                print(f"At {datetime.now().strftime('%X')}, Block {block} (lines {first_line} - {last_line}): "
+                      f"Matches = {_fmt(counts)}, Running Total = {_fmt(totals)}")
+
+    saved = save_blocks(args.filename, block_size, args.save_dir, byte_range) if args.save else None
+
+    if args.format != "text":
+        out = open(args.output, 'w', newline='') if args.output else sys.stdout
+        try:
+            if args.format == "csv":
+                writer = csv.writer(out)
+                writer.writerow(["block", "first_line", "last_line", "partial"]
+                                + [f"matches:{p}" for p in args.patterns]
+                                + [f"total:{p}" for p in args.patterns])
+                for r in records:
+                    writer.writerow([r['block'], r['first_line'], r['last_line'], int(r['partial'])]
+                                    + r['matches'] + r['running_total'])
+            else:
+                json.dump({'file': str(args.filename), 'block_size': block_size, 'patterns': args.patterns,
+                           'blocks': records, 'total': totals}, out, indent=1)
+                out.write("\n")
+        finally:
+            if args.output:
+                out.close()
+
+    if text:
+        print(RULE)
+        print(f"Analysis complete. Final total matches: {_fmt(totals)}")
+        finished = f"Analysis started at {start_time.strftime('%x-%X')}, finished at {datetime.now().strftime('%X')}"
+        print(finished + (f" final block saved in {saved}." if saved else "."))
+        if args.output:
+            print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Incremental version of process_rpl_log.sh.
+
+The steps of the shell script are declared with their input and output
+files; a step runs once the steps producing its inputs are done, so
+independent steps run side by side:
+
+    tree       log, rpl-conf.h, parse_rpl_log_fixed.py -> text_<ts>.txt, rpl_graph_<ts>.tex, rpl_table_<ts>.tex
+    routes     log, parse_rpl_log_routes.py            -> routes_<ts>.txt
+    graph_pdf  rpl_graph_<ts>.tex (latexmk -lualatex)   -> graph_<ts>.pdf
+    table_pdf  rpl_table_<ts>.tex (latexmk -pdflatex)   -> table_<ts>.pdf
+    summary    text_<ts>.txt, graph_<ts>.pdf            -> SimSummary.d/entry_<ts>.tex
+
+A step is skipped when its outputs are newer than its inputs, or when its
+inputs and outputs still have the content hashes recorded after its last
+run (so rewriting a file with the same content does not ripple down the
+graph). Hashes are kept in build_<ts>.json and the per-step timings are
+written to build_<ts>.txt, both next to the run's outputs.
+
+Unlike the shell script, routes_<ts>.txt is rewritten rather than appended
+to, so a rerun does not duplicate it. parse_rpl_log_fixed.py always writes
+rpl_graph.tex and rpl_table.tex; the tree step copies them to per-run names
+while holding TREE_LOCK_FILE, so another log's run cannot swap them under
+this one's PDFs.
+
+Usage:
+    python3 process_rpl_log.py <path/to/logfile.txt> [--force] [--jobs N] [--no-view]
+"""
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from summarize_run import DATA_DIR, FRAGMENT_DIR
+
+# --- Path Variables (as in process_rpl_log.sh) ---
+BASE_DIR = Path.home()
+PYTHON_SCRIPT = BASE_DIR / "Documents" / "references" / "parse_rpl_log_fixed.py"
+PYTHON_SCRIPT_LOGS = BASE_DIR / "Documents" / "references" / "parse_rpl_log_routes.py"
+SUMMARIZE_SCRIPT = Path(__file__).resolve().with_name("summarize_run.py")
+GRAPH_TEX_FILE = DATA_DIR / "rpl_graph.tex"    # Written by PYTHON_SCRIPT for every log
+TABLE_TEX_FILE = DATA_DIR / "rpl_table.tex"
+TREE_LOCK_FILE = DATA_DIR / "rpl_tree.lock"
+CONFIG_FILE = BASE_DIR / "contiki-ng" / "os" / "net" / "routing" / "rpl-classic" / "rpl-conf.h"
+CONFIG_LINES = (52, 59)        # cat -n | head -59 | tail -8
+SUMMARY_FILE = DATA_DIR / "SimSummary.pdf"
+
+DEFAULT_JOBS = 4
+
+Step = namedtuple('Step', "name inputs outputs action")
+
+
+class StepError(Exception):
+    pass
+
+
+# --- Step Actions ---
+def _run(command, stdout=None, cwd=None, env=None):
+    """Runs a command; raises StepError with the tail of its output if it fails."""
+    result = subprocess.run(command, stdout=subprocess.PIPE if stdout is None else stdout,
+                            stderr=subprocess.PIPE, cwd=cwd, env=env)
+    if result.returncode != 0:
+        tail = (result.stderr or result.stdout or b"").decode('utf-8', errors='replace')[-1500:]
+        raise StepError(f"{Path(command[0]).name} exited with {result.returncode}\n{tail}")
+    return result
+
+
+def _write_if_changed(path, data):
+    """Writes atomically, leaving the file (and its mtime) alone if the content is unchanged."""
+    if path.is_file() and path.read_bytes() == data:
+        return
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _ls_date(path):
+    """'day month time' as printed by ls -l | awk '{print $7, $6, $8}'."""
+    mtime = datetime.fromtimestamp(path.stat().st_mtime)
+    recent = abs(time.time() - mtime.timestamp()) < 182 * 24 * 3600
+    return f"{mtime.day} {mtime.strftime('%b')} {mtime.strftime('%H:%M') if recent else mtime.year}"
+
+
+def tree_header(logfile):
+    """Steps 1 of process_rpl_log.sh: first log line, run and config dates, rpl-conf.h excerpt."""
+    with open(logfile, 'r', encoding='utf-8', errors='replace') as f:
+        first_line = f.readline()
+    with open(CONFIG_FILE, 'r', encoding='utf-8', errors='replace') as f:
+        config = f.read().splitlines()
+    first, last = CONFIG_LINES
+    excerpt = "".join(f"{n:6d}\t{config[n - 1]}\n" for n in range(first, min(last, len(config)) + 1))
+    return (first_line + f"    Run finished at {_ls_date(logfile)}\n"
+            + f"Routing at {_ls_date(CONFIG_FILE)}\n" + excerpt
+            + f"Edit options: nano +53 {CONFIG_FILE}")
+
+
+def make_tree(logfile, tree_file, graph_tex, table_tex):
+    env = dict(os.environ, PYTHONIOENCODING="UTF-8")
+    with open(TREE_LOCK_FILE, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)   # One parser at a time owns the shared .tex files
+        parsed = _run([sys.executable, str(PYTHON_SCRIPT), str(logfile)], env=env).stdout
+        _write_if_changed(graph_tex, GRAPH_TEX_FILE.read_bytes())
+        _write_if_changed(table_tex, TABLE_TEX_FILE.read_bytes())
+    _write_if_changed(tree_file, tree_header(logfile).encode('utf-8') + parsed)
+
+
+def make_routes(logfile, routes_file):
+    _write_if_changed(routes_file, _run([sys.executable, str(PYTHON_SCRIPT_LOGS), str(logfile)]).stdout)
+
+
+def make_pdf(tex_file, pdf_out, engine):
+    """latexmk in a private directory, so the two compiles do not share aux files."""
+    with tempfile.TemporaryDirectory(prefix="rpl_latexmk_") as tmp:
+        _run(["latexmk", f"-{engine}", "-interaction=nonstopmode", f"-output-directory={tmp}", str(tex_file)],
+             cwd=tex_file.parent)
+        _write_if_changed(pdf_out, (Path(tmp) / tex_file.with_suffix(".pdf").name).read_bytes())
+
+
+def make_summary(tree_file):
+    _run([sys.executable, str(SUMMARIZE_SCRIPT), str(tree_file)])
+
+
+def run_steps(logfile, suffix):
+    tree_file = DATA_DIR / f"text_{suffix}.txt"
+    routes_file = DATA_DIR / f"routes_{suffix}.txt"
+    graph_pdf = DATA_DIR / f"graph_{suffix}.pdf"
+    table_pdf = DATA_DIR / f"table_{suffix}.pdf"
+    graph_tex = DATA_DIR / f"rpl_graph_{suffix}.tex"
+    table_tex = DATA_DIR / f"rpl_table_{suffix}.tex"
+    return [
+        Step("tree", [logfile, CONFIG_FILE, PYTHON_SCRIPT], [tree_file, graph_tex, table_tex],
+             lambda: make_tree(logfile, tree_file, graph_tex, table_tex)),
+        Step("routes", [logfile, PYTHON_SCRIPT_LOGS], [routes_file],
+             lambda: make_routes(logfile, routes_file)),
+        Step("graph_pdf", [graph_tex], [graph_pdf],
+             lambda: make_pdf(graph_tex, graph_pdf, "lualatex")),
+        Step("table_pdf", [table_tex], [table_pdf],
+             lambda: make_pdf(table_tex, table_pdf, "pdflatex")),
+        Step("summary", [tree_file, graph_pdf, SUMMARIZE_SCRIPT], [FRAGMENT_DIR / f"entry_{suffix}.tex"],
+             lambda: make_summary(tree_file)),
+    ]
+
+
+# --- Build State ---
+class BuildState:
+    """
+    Content hashes from the last successful run of each step (build_<ts>.json).
+    File hashes are reused while a file's size and mtime are unchanged.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.steps = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files, self.steps = data['files'], data['steps']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def digest(self, path):
+        st = path.stat()
+        known = self.files.get(str(path))
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        self.files[str(path)] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def up_to_date(self, step):
+        """Why the step can be skipped, or None if it has to run."""
+        if not all(p.is_file() for p in step.outputs):
+            return None
+        newest_input = max(p.stat().st_mtime_ns for p in step.inputs)
+        if min(p.stat().st_mtime_ns for p in step.outputs) >= newest_input:
+            return "skipped (newer)"
+        recorded = self.steps.get(step.name)
+        if recorded and recorded == self.hashes(step):
+            return "skipped (same hash)"
+        return None
+
+    def hashes(self, step):
+        return {'inputs': {str(p): self.digest(p) for p in step.inputs},
+                'outputs': {str(p): self.digest(p) for p in step.outputs}}
+
+    def record(self, step):
+        self.steps[step.name] = self.hashes(step)
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files, 'steps': self.steps}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+# --- Scheduler ---
+def _timed(action):
+    start = time.time()
+    action()
+    return time.time() - start
+
+
+def run_graph(steps, state, jobs=DEFAULT_JOBS, force=False):
+    """
+    Runs the steps in dependency order, up to 'jobs' at a time.
+    Returns {name: (status, seconds)}; a failed step blocks the steps after it.
+    """
+    producers = {out: step.name for step in steps for out in step.outputs}
+    deps = {step.name: {producers[p] for p in step.inputs if p in producers} for step in steps}
+    results = {}
+    pending = list(steps)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            progress = True
+            while progress:
+                progress = False
+                for step in list(pending):
+                    if not deps[step.name] <= results.keys():
+                        continue
+                    pending.remove(step)
+                    progress = True
+                    if any(results[d][0] in ("failed", "blocked") for d in deps[step.name]):
+                        results[step.name] = ("blocked", 0.0)
+                        print(f"--> {step.name}: blocked by a failed step")
+                        continue
+                    missing = [p for p in step.inputs if not p.is_file()]
+                    if missing:
+                        results[step.name] = ("failed", 0.0)
+                        print(f"--> {step.name}: failed, missing input {missing[0]}")
+                        continue
+                    reason = None if force else state.up_to_date(step)
+                    if reason:
+                        results[step.name] = (reason, 0.0)
+                        print(f"--> {step.name}: {reason}")
+                        continue
+                    print(f"--> {step.name}: running")
+                    running[pool.submit(_timed, step.action)] = step
+
+            if not running:
+                if pending:   # Only possible with a dependency cycle
+                    for step in pending:
+                        results[step.name] = ("blocked", 0.0)
+                    pending = []
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    seconds = future.result()
+                except (StepError, OSError) as e:
+                    results[step.name] = ("failed", 0.0)
+                    print(f"--> {step.name}: failed\n{e}")
+                    continue
+                missing = [p for p in step.outputs if not p.is_file()]
+                if missing:
+                    results[step.name] = ("failed", seconds)
+                    print(f"--> {step.name}: failed, {missing[0]} was not written")
+                    continue
+                state.record(step)
+                results[step.name] = ("ran", seconds)
+                print(f"--> {step.name}: done in {seconds:.1f}s")
+    return results
+
+
+def write_report(path, logfile, steps, results, wall):
+    lines = [f"process_rpl_log.py {logfile}  {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+             f"{'step':12s} {'status':22s} {'seconds':>8s}"]
+    for step in steps:
+        status, seconds = results.get(step.name, ("not run", 0.0))
+        lines.append(f"{step.name:12s} {status:22s} {seconds:8.2f}")
+    lines.append(f"{'total (wall)':35s} {wall:8.2f}")
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process an RPL log, rebuilding only what changed")
+    parser.add_argument("logfile", type=Path, help="Cooja log, e.g. 10-RPL-20250702210825.txt")
+    parser.add_argument("--force", action="store_true", help="Run every step")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Steps run at the same time (default: {DEFAULT_JOBS})")
+    parser.add_argument("--no-view", action="store_true", help="Do not open the summary in okular")
+    args = parser.parse_args()
+
+    logfile = args.logfile.resolve()
+    if not logfile.is_file():
+        print(f"Error: File not found: '{args.logfile}'")
+        sys.exit(1)
+
+    print(f"--> Processing file: {args.logfile}")
+    match = re.search(r"(\d{14})", str(args.logfile))
+    if not match:
+        print(f"Error: Filename '{args.logfile}' does not contain a valid YYYYMMDDHHMMSS timestamp.")
+        print("       Expected format example: '...-20250702210825.txt'")
+        sys.exit(1)
+    suffix = match.group(1)
+    print(f"--> Extracted date suffix: {suffix}")
+
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    steps = run_steps(logfile, suffix)
+    state = BuildState(DATA_DIR / f"build_{suffix}.json")
+
+    start = time.time()
+    results = run_graph(steps, state, args.jobs, args.force)
+    state.save()
+    report = write_report(DATA_DIR / f"build_{suffix}.txt", logfile, steps, results, time.time() - start)
+    print("\n" + "\n".join(report))
+
+    if any(status in ("failed", "blocked") for status, _ in results.values()):
+        sys.exit(1)
+
+    if not args.no_view and shutil.which("okular"):
+        subprocess.Popen(["okular", str(SUMMARY_FILE)], stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+    print("\n--> Script finished successfully!")
+
+
+if __name__ == "__main__":
+    main()
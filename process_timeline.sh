@@ -7,7 +7,12 @@
 #   reports in timeline format.
 #
 # Usage:
-#   ./process_timeline.sh <path/to/logfile.txt>
+#   ./process_timeline.sh <path/to/logfile.txt> [--no-view]
+#
+#   --no-view  Do not open the PDF in okular (for watch_logs.py)
+#
+# Every run writes the same RPL_Timeline.tex/.pdf, so runs take turns
+#   through a lock on $LOCK_FILE.
 #
 # 26 November 2025
 #
@@ -34,13 +39,25 @@ set -o pipefail
 #         CONFIG_NBR=" tail -8 "
       SUMMARY_FILE="$BASE_DIR/data/timeline/RPL_Timeline"
   SUMMARY_FILE_TEX="$SUMMARY_FILE.tex"
+         LOCK_FILE="$WORKING_DIR/.process_timeline.lock"
 
 
 # --- Input Validation ---
+NO_VIEW=0
+ARGS=()
+for ARG in "$@"; do
+    if [ "$ARG" = "--no-view" ]; then
+        NO_VIEW=1
+    else
+        ARGS+=("$ARG")
+    fi
+done
+set -- "${ARGS[@]}"
+
 # Check if a file argument was provided
 if [ "$#" -ne 1 ]; then
     echo "Error: Incorrect number of arguments."
-    echo "Usage: $0 <filename>"
+    echo "Usage: $0 <filename> [--no-view]"
     exit 1
 fi
 
@@ -84,6 +101,10 @@ fi
 # grep DAG /tmp/table.txt > /tmp/OFs.txt
 
 # --- Main Processing Steps ---
+# Wait for any other run, which would overwrite $SUMMARY_FILE_TEX and its PDF
+exec 9>"$LOCK_FILE"
+flock 9
+
 echo "--> Step 1: Generating tex file $SUMMARY_FILE_TEX"
 cd $WORKING_DIR
 PYTHONIOENCODING=UTF-8 python3 "$PYTHON_SCRIPT" "$FILE"
@@ -97,7 +118,9 @@ echo "--> Step 3: Copying and renaming generated PDF to $SUMMARY_FILE_PDF"
 # Note: I removed the redundant `cp rpl_*.pdf ...` as the next two lines are more specific and safer.
 cp "$SUMMARY_FILE.pdf" "$SUMMARY_FILE_PDF"
 
-if ! pgrep -f "$SUMMARY_FILE_PDF" > /dev/null; then
+if [ "$NO_VIEW" -eq 1 ]; then
+  echo "--> Step 5: Skipped opening the PDF (--no-view)"
+elif ! pgrep -f "$SUMMARY_FILE_PDF" > /dev/null; then
   echo "--> Step 5: Opening PDF for review"
   okular "$SUMMARY_FILE_PDF" > /dev/null 2>&1 &
 else
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+DAO accounting for a Cooja log in one streaming pass (was check-DAO-in.sh
+and check-DAO-out.sh).
+
+Counts, per DAG prefix (fd00 / fd02):
+    sent          'Sending a DAO with ...'   (dao_output_target(), sending node)
+    no_path_sent  'Sending a No-Path DAO with ...', kept out of sent as
+                  check-DAO-out.sh's grep did
+    received      'DAO lifetime: ...'        (dao_input_nonstoring(), receiving root)
+    contaminated, a DAO for one prefix whose line also mentions the other
+    (e.g. an fd00 target sent to the fd02 root)
+
+totalled, per node and per time window. Lines are read one at a time
+through the shared tokenizer, so memory stays flat however large the log
+is; only the counters (nodes x prefixes, windows x prefixes) and the
+first few contaminated lines are kept.
+
+DAOs are counted by the prefix of their target, where the old scripts
+grep'd for the prefix anywhere in the line: their 'fd00 lines' are fd00
+sent + fd02 sent+other here (the same for fd02 and for received), and
+their 'fd00 & fd02 lines' the sum of sent+other.
+
+--match also joins every send to its reception at the root, giving the
+DAO latency (node to root, Cooja time) and loss per prefix and node. The
+root does not log the sequence number, so a reception is matched to the
+oldest unmatched send of the same target within --match-window seconds
+(No-Path DAOs included, as the root logs those too); sends still
+unmatched when they leave the window count as lost. Only the sends
+inside the window are held, and latencies go into millisecond
+histograms, so this is memory-bounded too. Nodes whose median latency is
+above the overall 90th percentile, or who lose twice the overall share of
+their DAOs, are listed as outliers.
+
+Usage:
+    python3 rpl_dao_stats.py <logfile.txt> [--window 60] [--format text|csv|json] [--show 10]
+    python3 rpl_dao_stats.py <logfile.txt> --match [--match-window 10]
+"""
+import sys
+import csv
+import json
+import argparse
+from pathlib import Path
+from collections import Counter, deque
+
+from rpl_log_tokenizer import CoojaLogScanner, DAO
+
+# --- Configuration ---
+PREFIXES = ("fd00", "fd02")
+DEFAULT_WINDOW_S = 60.0
+DEFAULT_SHOW = 10            # Contaminated lines kept as examples
+DEFAULT_MATCH_WINDOW_S = 10.0
+OUTLIER_MIN_SENT = 10        # Fewer sends than this are never outliers
+
+COUNTS = ("sent", "received", "contaminated_sent", "contaminated_received", "no_path_sent")
+
+
+def dao_prefix(target):
+    """fd00 / fd02 from a DAO target address, 'other' for anything else (or nothing parsed)."""
+    if target:
+        head = target[:4].lower()
+        if head in PREFIXES:
+            return head
+    return "other"
+
+
+class DaoStats:
+    """Counters filled from DAO events; see the module doc."""
+    def __init__(self, window_s=DEFAULT_WINDOW_S, show=DEFAULT_SHOW):
+        self.window_s = window_s
+        self.show = show
+        self.totals = Counter()     # (prefix, count name)
+        self.by_node = Counter()    # (node, prefix, count name)
+        self.by_window = Counter()  # (window index, prefix, count name)
+        self.examples = []
+
+    def add(self, evt):
+        prefix = dao_prefix(evt.target)
+        name = "sent" if evt.direction == 'out' else "received"
+        window = int(evt.rel_time // self.window_s)
+        keys = ["no_path_sent"] if evt.no_path else [name]
+        others = [p for p in PREFIXES if p != prefix]
+        if not evt.no_path and prefix in PREFIXES and any(p in evt.message for p in others):
+            keys.append("contaminated_" + name)
+            if len(self.examples) < self.show:
+                self.examples.append((evt.timestamp_str, evt.node, prefix, evt.message.strip()))
+        for key in keys:
+            self.totals[(prefix, key)] += 1
+            self.by_node[(evt.node, prefix, key)] += 1
+            self.by_window[(window, prefix, key)] += 1
+
+    # --- Tables ---
+    def rows(self):
+        """One structured table: scope (total/node/window), key, prefix and the COUNTS."""
+        def collect(counter, scope, key_of):
+            grouped = {}
+            for k, n in counter.items():
+                *head, count_name = k
+                grouped.setdefault(tuple(head), Counter())[count_name] += n
+            for head in sorted(grouped, key=lambda h: (h[:-1], PREFIXES.index(h[-1]) if h[-1] in PREFIXES else 9)):
+                counts = grouped[head]
+                yield {'scope': scope, 'key': key_of(head), 'prefix': head[-1],
+                       **{c: counts[c] for c in COUNTS}}
+
+        yield from collect(self.totals, "total", lambda h: "")
+        yield from collect(self.by_node, "node", lambda h: h[0])
+        yield from collect(self.by_window, "window", lambda h: round(h[0] * self.window_s, 3))
+
+
+def percentile(hist, q):
+    """q-th percentile (0-100) of a {value: count} histogram; None when empty."""
+    total = sum(hist.values())
+    if not total:
+        return None
+    rank = max(1, -(-total * q // 100))   # Nearest rank
+    seen = 0
+    for value in sorted(hist):
+        seen += hist[value]
+        if seen >= rank:
+            return value
+    return value
+
+
+class DaoMatcher:
+    """Joins DAO sends to receptions at the root; see the module doc."""
+    def __init__(self, window_s=DEFAULT_MATCH_WINDOW_S):
+        self.window_s = window_s
+        self.in_flight = deque()   # [time, node, prefix, target, matched] in send order
+        self.by_target = {}        # target -> deque of the same lists, unmatched only
+        self.sent = Counter()      # (node, prefix)
+        self.lost = Counter()
+        self.matched = Counter()
+        self.latency = {}          # (node, prefix) -> Counter of ms
+        self.unmatched_in = Counter()   # prefix; received with no send in the window
+        self.pending_at_end = Counter()
+
+    def _expire(self, now):
+        while self.in_flight and now - self.in_flight[0][0] > self.window_s:
+            send = self.in_flight.popleft()
+            if not send[4]:
+                self.lost[(send[1], send[2])] += 1
+                queue = self.by_target[send[3]]
+                queue.popleft()   # Oldest unmatched send of its target is this one
+                if not queue:
+                    del self.by_target[send[3]]
+
+    def add(self, evt):
+        self._expire(evt.rel_time)
+        if not evt.target:
+            return
+        target = evt.target.lower()
+        prefix = dao_prefix(target)
+        if evt.direction == 'out':
+            send = [evt.rel_time, evt.node, prefix, target, False]
+            self.in_flight.append(send)
+            self.by_target.setdefault(target, deque()).append(send)
+            self.sent[(evt.node, prefix)] += 1
+            return
+        queue = self.by_target.get(target)
+        if not queue:
+            self.unmatched_in[prefix] += 1
+            return
+        send = queue.popleft()
+        if not queue:
+            del self.by_target[target]
+        send[4] = True
+        key = (send[1], send[2])
+        self.matched[key] += 1
+        self.latency.setdefault(key, Counter())[round((evt.rel_time - send[0]) * 1000)] += 1
+
+    def finish(self):
+        """Sends still in the window when the log ends are neither lost nor matched."""
+        for send in self.in_flight:
+            if not send[4]:
+                self.pending_at_end[(send[1], send[2])] += 1
+        self.in_flight.clear()
+        self.by_target.clear()
+
+    # --- Tables ---
+    def _row(self, scope, key, prefix, sent, matched, lost, pending, hist):
+        decided = matched + lost
+        return {'scope': scope, 'key': key, 'prefix': prefix, 'sent': sent, 'matched': matched,
+                'lost': lost, 'pending_at_end': pending,
+                'loss_pct': round(100.0 * lost / decided, 2) if decided else None,
+                'p50_ms': percentile(hist, 50), 'p90_ms': percentile(hist, 90),
+                'p99_ms': percentile(hist, 99), 'max_ms': max(hist) if hist else None}
+
+    def rows(self):
+        """Per prefix and per (node, prefix): counts, loss % and latency percentiles."""
+        keys = sorted(set(self.sent) | set(self.matched) | set(self.lost) | set(self.pending_at_end))
+        prefixes = sorted({p for _, p in keys} | set(self.unmatched_in))
+        for prefix in prefixes:
+            hist = Counter()
+            for key in keys:
+                if key[1] == prefix:
+                    hist.update(self.latency.get(key, {}))
+            row = self._row("total", "", prefix,
+                            *(sum(c[k] for k in keys if k[1] == prefix)
+                              for c in (self.sent, self.matched, self.lost, self.pending_at_end)), hist)
+            row['unmatched_received'] = self.unmatched_in[prefix]
+            yield row
+        for node, prefix in keys:
+            key = (node, prefix)
+            yield self._row("node", node, prefix, self.sent[key], self.matched[key], self.lost[key],
+                            self.pending_at_end[key], self.latency.get(key, {}))
+
+    def outliers(self, rows):
+        totals = {r['prefix']: r for r in rows if r['scope'] == "total"}
+        flagged = []
+        for r in rows:
+            total = totals[r['prefix']]
+            if r['scope'] != "node" or r['sent'] < OUTLIER_MIN_SENT:
+                continue
+            reasons = []
+            if r['p50_ms'] is not None and total['p90_ms'] is not None and r['p50_ms'] > total['p90_ms']:
+                reasons.append(f"median {r['p50_ms']} ms > overall p90 {total['p90_ms']} ms")
+            if r['loss_pct'] is not None and total['loss_pct'] and r['loss_pct'] > 2 * total['loss_pct']:
+                reasons.append(f"loss {r['loss_pct']}% > 2 x overall {total['loss_pct']}%")
+            if reasons:
+                flagged.append((r['key'], r['prefix'], "; ".join(reasons)))
+        return flagged
+
+
+def analyze(filepath, window_s=DEFAULT_WINDOW_S, show=DEFAULT_SHOW, match_window_s=None):
+    """DaoStats of the log, and a finished DaoMatcher when match_window_s is given (else None)."""
+    stats = DaoStats(window_s, show)
+    scanner = CoojaLogScanner()
+    scanner.subscribe(DAO, stats.add)
+    matcher = None
+    if match_window_s is not None:
+        matcher = DaoMatcher(match_window_s)
+        scanner.subscribe(DAO, matcher.add)
+    scanner.scan(filepath)
+    if matcher is not None:
+        matcher.finish()
+    return stats, matcher
+
+
+def print_text(stats, filepath):
+    header = (f"{'':8s} {'prefix':6s} {'sent':>8s} {'received':>9s} {'sent+other':>11s} {'recv+other':>11s} "
+              f"{'no-path':>8s}")
+    rows = list(stats.rows())
+    print(f"DAOs in {filepath}")
+    for scope, title in (("total", "Totals"), ("node", "Per node"),
+                         ("window", f"Per {stats.window_s:g}s window (seconds since log start)")):
+        print(f"\n{title}\n{header}")
+        for r in rows:
+            if r['scope'] == scope:
+                print(f"{str(r['key']):8s} {r['prefix']:6s} {r['sent']:8d} {r['received']:9d} "
+                      f"{r['contaminated_sent']:11d} {r['contaminated_received']:11d} {r['no_path_sent']:8d}")
+    if stats.examples:
+        print(f"\nFirst {len(stats.examples)} contaminated DAOs")
+        for timestamp, node, prefix, message in stats.examples:
+            print(f"{timestamp} Node:{node} [{prefix}] {message}")
+
+
+def _ms(value):
+    return "-" if value is None else str(value)
+
+
+def print_latency(matcher):
+    rows = list(matcher.rows())
+    header = (f"{'':8s} {'prefix':6s} {'sent':>7s} {'matched':>8s} {'lost':>6s} {'loss%':>6s} "
+              f"{'p50 ms':>7s} {'p90 ms':>7s} {'p99 ms':>7s} {'max ms':>7s}")
+    print(f"\nDAO latency, node to root (matched within {matcher.window_s:g}s)")
+    for scope, title in (("total", "Totals"), ("node", "Per sending node")):
+        print(f"\n{title}\n{header}")
+        for r in rows:
+            if r['scope'] == scope:
+                print(f"{str(r['key']):8s} {r['prefix']:6s} {r['sent']:7d} {r['matched']:8d} {r['lost']:6d} "
+                      f"{_ms(r['loss_pct']):>6s} {_ms(r['p50_ms']):>7s} {_ms(r['p90_ms']):>7s} "
+                      f"{_ms(r['p99_ms']):>7s} {_ms(r['max_ms']):>7s}")
+    for r in rows:
+        if r['scope'] == "total" and (r['unmatched_received'] or r['pending_at_end']):
+            print(f"{r['prefix']}: {r['unmatched_received']} received with no send in the window, "
+                  f"{r['pending_at_end']} sent too close to the end of the log to tell")
+    outliers = matcher.outliers(rows)
+    if outliers:
+        print("\nOutliers")
+        for node, prefix, reason in outliers:
+            print(f"Node {node} {prefix}: {reason}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count DAOs sent/received per prefix, node and time window")
+    parser.add_argument("logfile", type=Path, help="Path to raw log")
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_S,
+                        help=f"Window length in seconds (default: {DEFAULT_WINDOW_S:g})")
+    parser.add_argument("--format", choices=("text", "csv", "json"), default="text")
+    parser.add_argument("--show", type=int, default=DEFAULT_SHOW,
+                        help=f"Contaminated lines to list (default: {DEFAULT_SHOW})")
+    parser.add_argument("--match", action="store_true",
+                        help="Match sends to receptions at the root: latency, loss and outliers "
+                             "(with --format csv, this table replaces the counts)")
+    parser.add_argument("--match-window", type=float, default=DEFAULT_MATCH_WINDOW_S,
+                        help=f"Seconds a send waits for its reception (default: {DEFAULT_MATCH_WINDOW_S:g})")
+    args = parser.parse_args()
+
+    if not args.logfile.exists():
+        print(f"File not found: {args.logfile}")
+        sys.exit(1)
+    if args.window <= 0 or args.match_window <= 0:
+        print("Error: --window and --match-window must be positive")
+        sys.exit(1)
+
+    stats, matcher = analyze(args.logfile, args.window, args.show,
+                             args.match_window if args.match else None)
+
+    if args.format == "text":
+        print_text(stats, args.logfile)
+        if matcher is not None:
+            print_latency(matcher)
+    elif args.format == "csv":
+        if matcher is not None:
+            rows = list(matcher.rows())
+            fieldnames = list(rows[0]) if rows else ["scope", "key", "prefix"]
+            writer = csv.DictWriter(sys.stdout, fieldnames=fieldnames, restval="")
+        else:
+            rows = stats.rows()
+            writer = csv.DictWriter(sys.stdout, fieldnames=["scope", "key", "prefix", *COUNTS])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        report = {'file': str(args.logfile), 'window_s': args.window, 'rows': list(stats.rows()),
+                  'contaminated_examples': [dict(zip(("timestamp", "node", "prefix", "message"), e))
+                                            for e in stats.examples]}
+        if matcher is not None:
+            rows = list(matcher.rows())
+            report['latency'] = {'match_window_s': matcher.window_s, 'rows': rows,
+                                 'outliers': [dict(zip(("node", "prefix", "reason"), o))
+                                              for o in matcher.outliers(rows)]}
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Columnar, array-backed store for the events of a Cooja log.
+
+Instead of one Python dict per DIO / parent event, every event is one row of a
+NumPy structured array (about 30 bytes). Strings (timestamps, instance ids and
+DAG prefixes) are interned once in a side table and referenced by index.
+
+While scanning, rows are appended to parallel typed arrays (array.array);
+freeze() turns them into the structured array the renderers consume.
+
+Large logs can be parsed in parallel: the file is memory-mapped, split at
+line boundaries into chunks and the chunks are tokenized in a process pool.
+Chunk results are concatenated in file order, giving the same table as a
+sequential scan.
+
+Usage (diagnostics):
+    python3 rpl_event_store.py <logfile.txt> [--workers N]
+"""
+import os
+import sys
+import mmap
+import argparse
+from array import array
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rpl_log_tokenizer import (CoojaLogScanner, LogTokenizer, find_start_time, open_log,
+                               DIO, DAG, TABLE_START, TABLE_ENTRY, TABLE_END)
+
+# --- Row Kinds ---
+KIND_DIO = 0
+KIND_DAG = 1
+KIND_TABLE_START = 2
+KIND_TABLE_ENTRY = 3
+KIND_TABLE_END = 4
+
+KIND_NAMES = {KIND_DIO: DIO, KIND_DAG: DAG, KIND_TABLE_START: TABLE_START,
+              KIND_TABLE_ENTRY: TABLE_ENTRY, KIND_TABLE_END: TABLE_END}
+
+# --- Flags ---
+FLAG_PREFERRED = 1  # DAG line / table entry marked 'Pref Y'
+
+# Column layout:
+#   time   seconds since the first timestamped line of the log
+#   label  'HH:MM:SS.ms' string (index into strings)
+#   kind   KIND_*
+#   node   receiving node (DIO), reporting node (DAG), table owner (TABLE_*)
+#   peer   sending node (DIO), parent (DAG / TABLE_ENTRY, 0 = none), else 0
+#   scope  instance id (DIO / TABLE_*) or DAG prefix (DAG) (index into strings)
+#   rank   advertised rank (DIO) or Rank: field (DAG), -1 if unknown
+#   flags  FLAG_*
+EVENT_DTYPE = np.dtype([
+    ('time', 'f8'),
+    ('label', 'i4'),
+    ('kind', 'u1'),
+    ('node', 'i4'),
+    ('peer', 'i4'),
+    ('scope', 'i4'),
+    ('rank', 'i4'),
+    ('flags', 'u1'),
+])
+
+_COLUMN_CODES = {'f8': 'd', 'i4': 'i', 'u1': 'B'}
+
+# --- Parallel Parsing ---
+DEFAULT_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_BYTES = 64 * 1024 * 1024   # Smaller logs are parsed sequentially
+CHUNKS_PER_WORKER = 4
+# Chunks start at a neighbour-table header so no table dump spans two chunks.
+# The header is looked for within MARKER_SEARCH_BYTES of the nominal split;
+# without one, a split inside an open dump is moved to just after its end line.
+TABLE_START_MARKER = b"RPL Neighbour Set for Instance ID:"
+TABLE_END_MARKER = b"--- End of Table"
+MARKER_SEARCH_BYTES = 4 * 1024 * 1024
+
+
+class EventTable:
+    """
+    Frozen event table: a structured array plus the interned string table.
+    All selections are vectorized and return a new EventTable sharing the strings.
+    """
+    def __init__(self, rows, strings, nodes, start_time_abs):
+        self.rows = rows
+        self.strings = strings
+        self.nodes = np.asarray(nodes, dtype='i4')
+        self.start_time_abs = start_time_abs
+        self._index = {s: i for i, s in enumerate(strings)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, column):
+        return self.rows[column]
+
+    def _derive(self, rows):
+        return EventTable(rows, self.strings, self.nodes, self.start_time_abs)
+
+    def string_id(self, text):
+        """Interned index of a string, -1 if it never occurs in the log."""
+        return self._index.get(text, -1)
+
+    def label(self, row_idx):
+        return self.strings[self.rows['label'][row_idx]]
+
+    def mask(self, kind=None, scope=None, node=None, t_from=None, t_to=None, preferred=None):
+        """Boolean row mask. kind/scope/node accept a single value or a sequence."""
+        rows = self.rows
+        m = np.ones(len(rows), dtype=bool)
+        if kind is not None:
+            m &= np.isin(rows['kind'], np.atleast_1d(kind))
+        if scope is not None:
+            scopes = [scope] if isinstance(scope, str) else scope
+            m &= np.isin(rows['scope'], [self.string_id(s) for s in scopes])
+        if node is not None:
+            m &= np.isin(rows['node'], np.atleast_1d(node))
+        if t_from is not None:
+            m &= rows['time'] >= t_from
+        if t_to is not None:
+            m &= rows['time'] <= t_to
+        if preferred is not None:
+            is_pref = (rows['flags'] & FLAG_PREFERRED) != 0
+            m &= is_pref if preferred else ~is_pref
+        return m
+
+    def select(self, **criteria):
+        """Filtered copy, see mask() for the criteria."""
+        return self._derive(self.rows[self.mask(**criteria)])
+
+    def sort_by_time(self):
+        """Copy ordered by time; rows with equal times keep their log order."""
+        order = np.argsort(self.rows['time'], kind='stable')
+        return self._derive(self.rows[order])
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes
+
+
+class EventStoreBuilder:
+    """
+    Collects tokenizer events into parallel typed arrays.
+    Subscribes to DIO, DAG and neighbour-table events.
+    """
+    def __init__(self):
+        self.columns = {name: array(_COLUMN_CODES[EVENT_DTYPE[name].str[1:]])
+                        for name in EVENT_DTYPE.names}
+        self.strings = []
+        self._intern = {}
+
+    @property
+    def handlers(self):
+        return {DIO: self.on_dio, DAG: self.on_dag, TABLE_START: self.on_table_start,
+                TABLE_ENTRY: self.on_table_entry, TABLE_END: self.on_table_end}
+
+    def subscribe(self, scanner):
+        for event_type, handler in self.handlers.items():
+            scanner.subscribe(event_type, handler)
+
+    def consume(self, events):
+        """Appends events coming straight from a LogTokenizer."""
+        handlers = self.handlers
+        for evt in events:
+            handlers[evt.type](evt)
+
+    def intern(self, text):
+        idx = self._intern.get(text)
+        if idx is None:
+            idx = self._intern[text] = len(self.strings)
+            self.strings.append(text)
+        return idx
+
+    def append(self, evt, kind, node, peer, scope, rank=-1, flags=0):
+        c = self.columns
+        c['time'].append(evt.rel_time)
+        c['label'].append(self.intern(evt.timestamp_str))
+        c['kind'].append(kind)
+        c['node'].append(node)
+        c['peer'].append(peer)
+        c['scope'].append(self.intern(scope))
+        c['rank'].append(rank)
+        c['flags'].append(flags)
+
+    def on_dio(self, evt):
+        rank = evt.rank if evt.rank is not None else -1
+        self.append(evt, KIND_DIO, evt.node, evt.tx_node, evt.instance, rank)
+
+    def on_dag(self, evt):
+        # Lines whose Parent: field could not be parsed are of no use to any renderer
+        if evt.parent is None:
+            return
+        rank = evt.rank if evt.rank is not None else -1
+        self.append(evt, KIND_DAG, evt.node, evt.parent, evt.dag, rank,
+                    FLAG_PREFERRED if evt.preferred else 0)
+
+    def on_table_start(self, evt):
+        self.append(evt, KIND_TABLE_START, evt.node, 0, evt.instance)
+
+    def on_table_entry(self, evt):
+        self.append(evt, KIND_TABLE_ENTRY, evt.node, evt.parent, evt.instance,
+                    flags=FLAG_PREFERRED if evt.preferred else 0)
+
+    def on_table_end(self, evt):
+        self.append(evt, KIND_TABLE_END, evt.node, 0, evt.instance)
+
+    def freeze(self, tokenizer):
+        """Builds the EventTable once the scan has finished."""
+        rows = np.empty(len(self.columns['time']), dtype=EVENT_DTYPE)
+        for name, col in self.columns.items():
+            rows[name] = np.frombuffer(col, dtype=EVENT_DTYPE[name]) if len(col) else []
+        return EventTable(rows, list(self.strings), sorted(tokenizer.nodes), tokenizer.start_time_abs)
+
+
+def concat_tables(tables, start_time_abs):
+    """
+    Concatenates tables built from consecutive slices of one log.
+    Strings are re-interned in order of first use, as a single scan would.
+    """
+    strings = []
+    index = {}
+    parts = []
+    nodes = set()
+    for table in tables:
+        remap = np.empty(len(table.strings), dtype='i4')
+        for i, text in enumerate(table.strings):
+            idx = index.get(text)
+            if idx is None:
+                idx = index[text] = len(strings)
+                strings.append(text)
+            remap[i] = idx
+        rows = table.rows.copy()
+        if len(rows):
+            rows['label'] = remap[rows['label']]
+            rows['scope'] = remap[rows['scope']]
+        parts.append(rows)
+        nodes.update(table.nodes.tolist())
+    rows = np.concatenate(parts) if parts else np.empty(0, dtype=EVENT_DTYPE)
+    return EventTable(rows, strings, sorted(nodes), start_time_abs)
+
+
+def _table_open_at(mm, pos):
+    """Whether a neighbour table dump started before byte pos is still open there."""
+    header = mm.rfind(TABLE_START_MARKER, 0, pos)
+    return header >= 0 and mm.rfind(TABLE_END_MARKER, header, pos) < 0
+
+
+def chunk_bounds(mm, n_chunks):
+    """
+    Byte offsets splitting a mapped log into about n_chunks line-aligned
+    pieces, none of them starting inside a table dump (see TABLE_START_MARKER).
+    """
+    size = len(mm)
+    has_tables = mm.find(TABLE_START_MARKER) >= 0
+    bounds = [0]
+    for i in range(1, n_chunks):
+        pos = max(size * i // n_chunks, bounds[-1])
+        newline = mm.find(b"\n", pos)
+        if newline < 0:
+            break
+        pos = newline + 1
+        marker = mm.find(TABLE_START_MARKER, pos, pos + MARKER_SEARCH_BYTES)
+        if marker >= 0:
+            pos = mm.rfind(b"\n", 0, marker) + 1
+        elif has_tables and _table_open_at(mm, pos):
+            # The next chunk's tokenizer would not know the table: split after its end
+            end = mm.find(TABLE_END_MARKER, pos)
+            newline = mm.find(b"\n", end) if end >= 0 else -1
+            if newline < 0:
+                break   # The dump runs to the end of the log
+            pos = newline + 1
+        if bounds[-1] < pos < size:
+            bounds.append(pos)
+    bounds.append(size)
+    return bounds
+
+
+def parse_byte_range(filepath, start, end, start_time_abs, t_from=None, t_to=None):
+    """
+    EventTable of the lines in bytes [start, end) of a log; start and end must
+    be line starts. start_time_abs keeps relative times as in a full parse;
+    t_from / t_to (absolute sim time) drop the lines outside a window.
+    """
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode('utf-8', errors='ignore')
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    builder = EventStoreBuilder()
+    tokenizer = LogTokenizer(types=builder.handlers.keys(), start_time_abs=start_time_abs, t_from=t_from, t_to=t_to)
+    builder.consume(tokenizer.tokenize(text.split("\n")))
+    return builder.freeze(tokenizer)
+
+
+def _parse_chunk(job):
+    """Worker: tokenizes one byte range of the log into a partial EventTable."""
+    return parse_byte_range(*job)
+
+
+def load_event_table_parallel(filepath, workers=DEFAULT_WORKERS):
+    """Parses a log in line-aligned chunks across a process pool."""
+    with open_log(filepath) as f:
+        start_time_abs = find_start_time(f)
+
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = chunk_bounds(mm, workers * CHUNKS_PER_WORKER)
+
+    jobs = [(str(filepath), a, b, start_time_abs) for a, b in zip(bounds, bounds[1:])]
+    print(f"Parsing {len(jobs)} chunks with {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tables = list(pool.map(_parse_chunk, jobs))
+    return concat_tables(tables, start_time_abs)
+
+
+def load_event_table(filepath, workers=1, min_parallel_bytes=PARALLEL_MIN_BYTES):
+    """
+    Parses a raw log into an EventTable.
+    With workers > 1, logs of at least min_parallel_bytes are parsed in parallel.
+    """
+    if workers > 1 and os.path.getsize(filepath) >= max(min_parallel_bytes, 1):
+        return load_event_table_parallel(filepath, workers)
+
+    scanner = CoojaLogScanner()
+    builder = EventStoreBuilder()
+    builder.subscribe(scanner)
+    tokenizer = scanner.scan(filepath)
+    return builder.freeze(tokenizer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse a Cooja log into an event table")
+    parser.add_argument("logfile", type=Path, help="Path to raw log")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parser processes for large logs (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    if not args.logfile.exists():
+        print(f"File not found: {args.logfile}")
+        sys.exit(1)
+
+    table = load_event_table(args.logfile, args.workers)
+    print(f"Rows: {len(table)} ({table.nbytes / 1e6:.1f} MB), strings: {len(table.strings)}")
+    kinds, counts = np.unique(table['kind'], return_counts=True)
+    for kind, count in zip(kinds, counts):
+        print(f"{KIND_NAMES[int(kind)]:12s} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Exports parent-table (DAG) lines and received DIOs of a Cooja log as tables
+(replaces editing and re-running parse-rpl.sh / parse-Pref.sh).
+
+    parents  time, timestamp, node, dag, parent, rank, lnkm, pathcost, pref
+             from 'RPL: DAG: fd00 Parent: 07 | Rank: 128, LnkM: ..., Pref Y'
+    dio      time, timestamp, rx_node, tx_node, instance, version, rank
+             from 'Incoming DIO (id, ver, rank) = (30,240,434) from:fe80::...'
+
+Both tables come from one pass over the log. The filters are handed to the
+tokenizer, so lines of other nodes, prefixes, instances or times are
+dropped before their fields are extracted. With --from the log index
+(rpl_log_index.py) seeks straight to the window; reading stops after --to.
+Without filters every node and both DODAGs are exported.
+
+time is the sim time in seconds, timestamp the 'HH:MM:SS.ms' of the line;
+parent is the parent's node id (0 = none). CSV and JSON Lines are written
+as the log is read; Parquet (needs pandas) is written at the end.
+
+Usage:
+    python3 rpl_export.py <logfile.txt> [--table parents,dio] [--format csv|jsonl|parquet] [-o prefix]
+    python3 rpl_export.py <logfile.txt> --prefix fd00 --node 3,5-7 --instance 30 --from 40:00 --to 45:00
+"""
+import sys
+import csv
+import json
+import argparse
+import importlib.util
+from pathlib import Path
+
+from rpl_log_tokenizer import LogTokenizer, open_log, parse_node_list, DIO, DAG
+from rpl_log_index import window_range, add_window_args, parse_window_args
+
+# --- Tables ---
+TABLES = {
+    'parents': (DAG, ("time", "timestamp", "node", "dag", "parent", "rank", "lnkm", "pathcost", "pref")),
+    'dio': (DIO, ("time", "timestamp", "rx_node", "tx_node", "instance", "version", "rank")),
+}
+FORMATS = {'csv': ".csv", 'jsonl': ".jsonl", 'parquet': ".parquet"}
+
+
+def parents_row(evt):
+    return (round(evt.time, 3), evt.timestamp_str, evt.node, evt.dag, evt.parent, evt.rank,
+            evt.lnkm, evt.pathcost, evt.pref)
+
+
+def dio_row(evt):
+    return (round(evt.time, 3), evt.timestamp_str, evt.node, evt.tx_node, evt.instance, evt.version, evt.rank)
+
+
+ROW_OF = {DAG: parents_row, DIO: dio_row}
+
+
+def _split(values):
+    """Repeated and/or comma separated option values, None when not given."""
+    if not values:
+        return None
+    return [v.strip() for value in values for v in value.split(",") if v.strip()]
+
+
+class TableWriter:
+    """Writes the rows of one table as they come (csv/jsonl) or at close (parquet)."""
+    def __init__(self, path, fmt, columns):
+        self.path = path
+        self.fmt = fmt
+        self.columns = columns
+        self.count = 0
+        self.rows = [] if fmt == "parquet" else None
+        self.file = None
+        if fmt != "parquet":
+            self.file = open(path, 'w', newline='', encoding='utf-8')
+            if fmt == "csv":
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(columns)
+
+    def write(self, row):
+        self.count += 1
+        if self.fmt == "csv":
+            self.writer.writerow(row)
+        elif self.fmt == "jsonl":
+            self.file.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+        else:
+            self.rows.append(row)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            return
+        import pandas as pd
+        pd.DataFrame(self.rows, columns=list(self.columns)).to_parquet(self.path, index=False)
+
+
+def export(filepath, tables, fmt, out_prefix, nodes=None, t_from=None, t_to=None,
+           prefixes=None, instances=None):
+    """Writes <out_prefix>-<table><ext> for each table in one scan; {table: (path, rows)}."""
+    writers = {}
+    for name in tables:
+        event_type, columns = TABLES[name]
+        path = Path(f"{out_prefix}-{name}{FORMATS[fmt]}")
+        writers[event_type] = (name, TableWriter(path, fmt, columns))
+
+    start = window_range(filepath, t_from, t_to)[0] if t_from is not None else 0
+    tokenizer = LogTokenizer(types=writers.keys(), nodes=nodes, t_from=t_from, t_to=t_to,
+                             prefixes=prefixes, instances=instances)
+    try:
+        with open_log(filepath) as f:
+            f.seek(start)
+            for evt in tokenizer.tokenize(f):
+                writers[evt.type][1].write(ROW_OF[evt.type](evt))
+    finally:
+        for _, writer in writers.values():
+            writer.close()
+    return {name: (writer.path, writer.count) for name, writer in writers.values()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export parent-table and DIO data of a log in one pass")
+    parser.add_argument("logfile", type=Path, help="Path to raw log")
+    parser.add_argument("--table", default="parents,dio",
+                        help=f"Comma separated, from {', '.join(TABLES)} (default: parents,dio)")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("-o", "--out-prefix", type=Path,
+                        help="Files are <prefix>-<table>.<ext> (default: the log path without .txt)")
+    parser.add_argument("--prefix", action="append", help="DAG prefixes of the parents table, e.g. fd00")
+    parser.add_argument("--node", action="append", help="Reporting nodes, e.g. 3,5-7")
+    parser.add_argument("--instance", action="append", help="DIO instance ids, e.g. 30")
+    add_window_args(parser)
+    args = parser.parse_args()
+
+    if not args.logfile.exists():
+        print(f"File not found: {args.logfile}")
+        sys.exit(1)
+    tables = [t.strip() for t in args.table.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in TABLES]
+    if unknown or not tables:
+        print(f"Unknown table: {', '.join(unknown)} (choose from {', '.join(TABLES)})")
+        sys.exit(1)
+    try:
+        nodes = set().union(*(parse_node_list(n) for n in args.node)) if args.node else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    t_from, t_to = parse_window_args(args)
+    if args.format == "parquet" and importlib.util.find_spec("pandas") is None:
+        print("Error: --format parquet needs pandas (and pyarrow); use csv or jsonl instead")
+        sys.exit(1)
+
+    out_prefix = args.out_prefix or args.logfile.with_suffix("")
+    written = export(args.logfile, tables, args.format, out_prefix, nodes, t_from, t_to,
+                     _split(args.prefix), _split(args.instance))
+    for name, (path, count) in written.items():
+        print(f"Wrote {count} {name} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Precompiled LaTeX formats for the fixed part of the generated preambles.
+
+The generators put the packages that only depend on TeX (tikz, tabularx,
+graphicx, ...) first and end that part with DUMP_MARKER; fontspec, the Lua
+graph-drawing libraries and anything per document (headers with the log
+name and time) come after it, because LuaTeX does not keep the Lua state
+in a format.
+
+    ensure_format(preamble)    dumps the part before the marker once, with
+                               mylatexformat, into FORMAT_DIR/<hash>.fmt
+    format_args(name)          engine arguments that load it
+
+The hash covers the engine and the dumped text, so a changed preamble gets
+a new format by itself. A document compiled with the format skips its own
+preamble up to the marker; compiled without it (plain latexmk), the marker
+expands to \\relax and the document loads everything as before.
+
+Usage:
+    python3 rpl_latex_format.py build RPL_Timeline.tex [--engine lualatex]
+    python3 rpl_latex_format.py list
+    python3 rpl_latex_format.py clean
+"""
+import os
+import sys
+import fcntl
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+# --- Configuration ---
+FORMAT_DIR = Path.home() / "data" / "rpl_cache" / "formats"
+DEFAULT_ENGINE = "lualatex"
+DUMP_MARKER = r"\csname endofdump\endcsname"
+
+
+def dumpable_part(preamble):
+    """Preamble text up to and including DUMP_MARKER, None if there is no marker."""
+    if DUMP_MARKER not in preamble:
+        return None
+    return preamble.split(DUMP_MARKER, 1)[0] + DUMP_MARKER
+
+
+def format_name(static, engine=DEFAULT_ENGINE):
+    return hashlib.sha1(f"{engine}\0{static}".encode('utf-8')).hexdigest()[:16]
+
+
+def format_args(name, format_dir=FORMAT_DIR):
+    """(arguments, environment) for running the engine with a dumped format."""
+    env = dict(os.environ, TEXFORMATS=f"{format_dir}{os.pathsep}")
+    return [f"-fmt={name}"], env
+
+
+def ensure_format(preamble, engine=DEFAULT_ENGINE, format_dir=FORMAT_DIR):
+    """
+    Name of the format for this preamble, dumping it on first use; None when
+    the preamble has no marker or the dump failed (the failure is remembered
+    until the preamble changes, so a broken format costs one attempt).
+    """
+    static = dumpable_part(preamble)
+    if static is None:
+        return None
+    name = format_name(static, engine)
+    fmt_path = format_dir / f"{name}.fmt"
+    failed_path = format_dir / f"{name}.failed"
+    if fmt_path.is_file():
+        return name
+    if failed_path.is_file():
+        return None
+
+    format_dir.mkdir(parents=True, exist_ok=True)
+    with open(format_dir / f"{name}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)   # Another process may be dumping the same format
+        if fmt_path.is_file():
+            return name
+
+        print(f"Dumping LaTeX format {name} ({engine})...")
+        with tempfile.TemporaryDirectory(prefix="rpl_fmt_") as tmp:
+            tex_path = Path(tmp) / "preamble.tex"
+            tex_path.write_text(static + "\n\\begin{document}\n\\end{document}\n", encoding='utf-8')
+            command = [engine, "-ini", f"-jobname={name}", "-interaction=nonstopmode",
+                       f"-output-directory={tmp}", f"&{engine}", "mylatexformat.ltx", str(tex_path)]
+            try:
+                result = subprocess.run(command, cwd=tmp, capture_output=True, text=True, errors='replace')
+                output = result.stdout
+            except FileNotFoundError as e:
+                output = str(e)
+            dumped = Path(tmp) / f"{name}.fmt"
+            if not dumped.is_file():
+                failed_path.write_text(output[-1500:], encoding='utf-8')
+                print(f"Warning: Could not dump a format for this preamble, compiling without it "
+                      f"(log in {failed_path})")
+                return None
+            tmp_fmt = fmt_path.with_suffix(".tmp")
+            shutil.copyfile(dumped, tmp_fmt)
+            os.replace(tmp_fmt, fmt_path)
+    return name
+
+
+def list_formats(format_dir=FORMAT_DIR):
+    return sorted(format_dir.glob("*.fmt")) + sorted(format_dir.glob("*.failed"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompiled formats for the generated LaTeX preambles")
+    parser.add_argument("--format-dir", type=Path, default=FORMAT_DIR, help=f"Default: {FORMAT_DIR}")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Dump the format of a generated .tex file")
+    p_build.add_argument("texfile", type=Path)
+    p_build.add_argument("--engine", default=DEFAULT_ENGINE, help=f"Default: {DEFAULT_ENGINE}")
+    sub.add_parser("list", help="Dumped (and failed) formats")
+    sub.add_parser("clean", help="Remove every format")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not args.texfile.is_file():
+            print(f"File not found: {args.texfile}")
+            sys.exit(1)
+        text = args.texfile.read_text(encoding='utf-8')
+        preamble = text.split("\\begin{document}", 1)[0]
+        if dumpable_part(preamble) is None:
+            print(f"No {DUMP_MARKER} in the preamble of {args.texfile}")
+            sys.exit(1)
+        # A failed attempt is only remembered for automatic use; retry here
+        (args.format_dir / f"{format_name(dumpable_part(preamble), args.engine)}.failed").unlink(missing_ok=True)
+        name = ensure_format(preamble, args.engine, args.format_dir)
+        if name is None:
+            sys.exit(1)
+        print(f"Format {args.format_dir / name}.fmt")
+
+    elif args.command == "list":
+        for path in list_formats(args.format_dir):
+            print(f"{path.name:24s} {path.stat().st_size / 1e6:8.1f} MB")
+
+    elif args.command == "clean":
+        for path in list_formats(args.format_dir) + sorted(args.format_dir.glob("*.lock")):
+            path.unlink(missing_ok=True)
+        print(f"Removed the formats in {args.format_dir}")
+
+
+if __name__ == "__main__":
+    main()
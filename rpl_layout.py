@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Python-side layered layout for the DODAG drawings of visualize_rpl_timeline.py.
+
+With '\\graph [layered layout]' LuaLaTeX runs the Lua graph-drawing engine for
+every DODAG of every snapshot. StableLayout computes the coordinates here
+instead and emits plain \\node / \\draw commands:
+
+    y  the layer: hops from the root along preferred parents (the top of a
+       detached subtree, or a node on a parent loop, sits on layer 0)
+    x  a column fixed per node for the whole run, so a node only ever moves
+       up or down between snapshots and consecutive pages line up
+
+Drawings are cached by topology, so a DODAG that returns to an earlier shape
+costs a dictionary lookup.
+"""
+from collections import OrderedDict
+
+# --- Layout Settings ---
+SIBLING_CM = 0.8          # Column width
+LEVEL_CM = 1.5            # Distance between layers
+MAX_WIDTH_CM = 9.0        # Fits a 0.48\textwidth minipage on A4; wider pictures are scaled down
+LAYOUT_CACHE_SIZE = 4096  # Drawings kept per StableLayout
+
+
+def _node_key(node):
+    return (0, int(node), "") if node.isdigit() else (1, 0, node)
+
+
+def layers(inst_topology, root):
+    """Layer of every node of a child -> parent map."""
+    depth = {root: 0}
+    for start in inst_topology:
+        path, on_path = [], set()
+        node = start
+        while node not in depth:
+            if node in on_path:             # Parent loop: cut it here
+                depth[node] = 0
+                break
+            path.append(node)
+            on_path.add(node)
+            if node not in inst_topology:   # Top of a detached subtree
+                depth[node] = 0
+                break
+            node = inst_topology[node]
+        for n in reversed(path):
+            if n not in depth:
+                depth[n] = depth[inst_topology[n]] + 1
+    return depth
+
+
+class StableLayout:
+    """
+    Column assignment shared by every snapshot (and both DODAGs) of a run.
+    known_nodes, when given, are placed in ID order up front; nodes seen
+    later get the next free column.
+    """
+    def __init__(self, known_nodes=()):
+        self.columns = {}
+        for node in sorted({str(int(n)) for n in known_nodes}, key=_node_key):
+            self.column(node)
+        self._cache = OrderedDict()
+
+    def column(self, node):
+        col = self.columns.get(node)
+        if col is None:
+            col = self.columns[node] = len(self.columns)
+        return col
+
+    def tikz(self, inst_topology, root):
+        """TikZ picture of one DODAG with fixed coordinates."""
+        key = (root, frozenset(inst_topology.items()))
+        body = self._cache.get(key)
+        if body is None:
+            body = self._cache[key] = self._body(inst_topology, root)
+            if len(self._cache) > LAYOUT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+
+        options = f"x={SIBLING_CM}cm, y=-{LEVEL_CM}cm"
+        width = len(self.columns) * SIBLING_CM
+        if width > MAX_WIDTH_CM:
+            # Shrink nodes with the picture so neighbours on a layer never overlap
+            options += f", scale={MAX_WIDTH_CM / width:.3f}, every node/.append style={{transform shape}}"
+        return "\n".join([fr"\begin{{tikzpicture}}[{options}]", body, r"\end{tikzpicture}"])
+
+    def _body(self, inst_topology, root):
+        depth = layers(inst_topology, root)
+        lines = ["    % Root Node Definition",
+                 fr"    \node[root_style] (n{root}) at ({self.column(root)}, 0) {{{root}}};",
+                 "    % Node Styles"]
+        for node in sorted(depth, key=_node_key):
+            if node != root:
+                lines.append(fr"    \node[node_style] (n{node}) at ({self.column(node)}, {depth[node]}) {{{node}}};")
+
+        for child, parent in sorted(inst_topology.items(), key=lambda e: _node_key(e[0])):
+            edge_style = "loop_style" if inst_topology.get(parent) == child else "edge_style"
+            lines.append(fr"    \draw[{edge_style}] (n{child}) -- (n{parent});")
+        return "\n".join(lines)
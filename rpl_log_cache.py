@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of parsed Cooja logs.
+
+The EventTable of a log (see rpl_event_store.py) is saved under CACHE_DIR,
+keyed by the log's resolved path, size, mtime and a content fingerprint
+(hash of samples from the head, middle and tail of the file). A warm run of
+visualize_rpl.py or visualize_rpl_timeline.py loads the table instead of
+re-parsing the raw log, so changing a rendering constant costs no parse.
+
+Entries are evicted least-recently-used once the cache exceeds CACHE_MAX_BYTES.
+Topology histories (rpl_topology_history.py) and time indexes
+(rpl_log_index.py) live in the same directory and are listed, invalidated
+and evicted with the parsed logs.
+
+Usage:
+    python3 rpl_log_cache.py --list
+    python3 rpl_log_cache.py --warm <logfile.txt> [...]
+    python3 rpl_log_cache.py --invalidate <logfile.txt> [...]
+    python3 rpl_log_cache.py --evict [--max-mb N]
+    python3 rpl_log_cache.py --clear
+"""
+import os
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from rpl_event_store import EventTable, EVENT_DTYPE, DEFAULT_WORKERS, load_event_table
+
+# --- Configuration ---
+CACHE_DIR = Path.home() / "data" / "rpl_cache"
+CACHE_MAX_BYTES = 2 * 1024 ** 3   # 2 GB
+CACHE_FORMAT = 1                  # Bump when the tokenizer or EVENT_DTYPE changes
+FINGERPRINT_SAMPLE = 64 * 1024    # Bytes hashed at head, middle and tail
+
+
+def fingerprint(filepath, size):
+    """Hash of three samples of the file; cheap even for multi-GB logs."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for offset in sorted({0, max(0, size // 2 - FINGERPRINT_SAMPLE // 2),
+                              max(0, size - FINGERPRINT_SAMPLE)}):
+            f.seek(offset)
+            h.update(f.read(FINGERPRINT_SAMPLE))
+    return h.hexdigest()
+
+
+def cache_key(filepath):
+    """Identity of a log file: path, size, mtime and content fingerprint."""
+    path = Path(filepath).resolve()
+    st = path.stat()
+    ident = f"{CACHE_FORMAT}|{path}|{st.st_size}|{st.st_mtime_ns}|{fingerprint(path, st.st_size)}"
+    return hashlib.sha1(ident.encode()).hexdigest(), path, st
+
+
+def _entry_paths(key, cache_dir):
+    return cache_dir / f"{key}.npz", cache_dir / f"{key}.json"
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_entries(cache_dir=CACHE_DIR):
+    """[(npz_path, meta, size_bytes, last_used)] oldest first."""
+    entries = []
+    if not cache_dir.is_dir():
+        return entries
+    for npz_path in cache_dir.glob("*.npz"):
+        meta_path = npz_path.with_suffix(".json")
+        try:
+            st = npz_path.stat()
+        except OSError:
+            continue
+        entries.append((npz_path, _read_meta(meta_path) or {}, st.st_size, st.st_mtime))
+    entries.sort(key=lambda e: e[3])
+    return entries
+
+
+def _remove_entry(npz_path):
+    for p in (npz_path, npz_path.with_suffix(".json")):
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def save_event_table(table, npz_path):
+    """Writes the table columns, strings and scan metadata to one .npz file."""
+    strings = "\n".join(table.strings).encode('utf-8')
+    start = np.nan if table.start_time_abs is None else table.start_time_abs
+    tmp_path = npz_path.with_suffix(".tmp.npz")
+    np.savez(tmp_path, rows=table.rows, strings=np.frombuffer(strings, dtype='u1'),
+             nodes=table.nodes, start_time_abs=np.array(start))
+    os.replace(tmp_path, npz_path)
+
+
+def read_event_table(npz_path):
+    with np.load(npz_path) as data:
+        rows = data['rows']
+        if rows.dtype != EVENT_DTYPE:
+            raise ValueError(f"Stale cache layout in {npz_path}")
+        raw = data['strings'].tobytes().decode('utf-8')
+        strings = raw.split("\n") if raw else []
+        start = float(data['start_time_abs'])
+        nodes = data['nodes']
+    return EventTable(rows, strings, nodes, None if np.isnan(start) else start)
+
+
+def invalidate(filepath, cache_dir=CACHE_DIR, keep_key=None):
+    """
+    Drops every cached entry that was built from this log path, except the
+    table, index and history of keep_key (the log as it is now).
+    """
+    target = str(Path(filepath).resolve())
+    removed = 0
+    for npz_path, meta, _, _ in list_entries(cache_dir):
+        if meta.get('source') == target and npz_path.name.split(".", 1)[0] != keep_key:
+            _remove_entry(npz_path)
+            removed += 1
+    return removed
+
+
+def evict(max_bytes=CACHE_MAX_BYTES, cache_dir=CACHE_DIR):
+    """Removes least-recently-used entries until the cache fits in max_bytes."""
+    entries = list_entries(cache_dir)
+    total = sum(e[2] for e in entries)
+    removed = 0
+    for npz_path, _, size, _ in entries:
+        if total <= max_bytes:
+            break
+        _remove_entry(npz_path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear(cache_dir=CACHE_DIR):
+    entries = list_entries(cache_dir)
+    for npz_path, _, _, _ in entries:
+        _remove_entry(npz_path)
+    return len(entries)
+
+
+def load_cached_event_table(filepath, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, workers=1):
+    """
+    EventTable for a log, from the cache when the log is unchanged.
+    On a miss the log is parsed, entries for older versions of the log are dropped,
+    the new entry is stored and the cache is trimmed to max_bytes.
+    """
+    key, path, st = cache_key(filepath)
+    npz_path, meta_path = _entry_paths(key, cache_dir)
+
+    if npz_path.is_file():
+        try:
+            table = read_event_table(npz_path)
+            os.utime(npz_path)  # Mark as recently used
+            print(f"Loaded parsed events from cache ({npz_path.name})")
+            return table
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring unreadable cache entry {npz_path.name}: {e}")
+            _remove_entry(npz_path)
+
+    table = load_event_table(filepath, workers)
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        invalidate(path, cache_dir, keep_key=key)
+        save_event_table(table, npz_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': str(path), 'size': st.st_size,
+                       'mtime_ns': st.st_mtime_ns, 'rows': len(table)}, f)
+        evict(max_bytes, cache_dir)
+    except OSError as e:
+        print(f"Warning: Could not write cache entry: {e}")
+
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the parsed Cooja log cache")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help=f"Default: {CACHE_DIR}")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--list", action="store_true", help="List cached logs")
+    group.add_argument("--warm", nargs="+", type=Path, metavar="LOG", help="Parse and cache logs")
+    group.add_argument("--invalidate", nargs="+", type=Path, metavar="LOG", help="Drop cached entries of logs")
+    group.add_argument("--evict", action="store_true", help="Trim the cache to --max-mb")
+    group.add_argument("--clear", action="store_true", help="Remove every cached entry")
+    parser.add_argument("--max-mb", type=float, default=CACHE_MAX_BYTES / 1024 ** 2,
+                        help="Size bound used by --warm and --evict")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parser processes for large logs in --warm (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    max_bytes = int(args.max_mb * 1024 ** 2)
+
+    if args.list:
+        entries = list_entries(args.cache_dir)
+        total = sum(e[2] for e in entries)
+        for npz_path, meta, size, _ in reversed(entries):
+            print(f"{size / 1e6:8.1f} MB  {meta.get('rows', '?'):>10} rows  {meta.get('source', npz_path.name)}")
+        print(f"{len(entries)} entries, {total / 1e6:.1f} MB in {args.cache_dir}")
+    elif args.warm:
+        for log in args.warm:
+            if not log.is_file():
+                print(f"File not found: {log}")
+                continue
+            table = load_cached_event_table(log, args.cache_dir, max_bytes, args.workers)
+            print(f"{log}: {len(table)} rows")
+    elif args.invalidate:
+        for log in args.invalidate:
+            print(f"{log}: removed {invalidate(log, args.cache_dir)} entries")
+    elif args.evict:
+        print(f"Removed {evict(max_bytes, args.cache_dir)} entries")
+    elif args.clear:
+        print(f"Removed {clear(args.cache_dir)} entries")
+
+
+if __name__ == "__main__":
+    main()
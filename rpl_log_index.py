@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Sparse sim-time -> byte-offset index of a Cooja log, for reading a time
+window without scanning from byte zero.
+
+Every INDEX_STEP bytes the index records the offset, sim time and Cooja
+tick (-1 when the log has no tick column) of the next timestamped line.
+It is built by seeking to each sample point, so even a multi-GB log is
+indexed with one small read per step. Sim time never decreases in a
+Cooja log; should a log break that (say, two runs appended), the index is
+marked non-monotonic: the start of a window is then found by reading from
+the top of the log, and the window only ends where the reader's own time
+filter stops (grep_by_block.py, which has none, refuses such windows).
+
+byte_range() turns a --from/--to window into the exact byte range of its
+lines: the last sample before each bound is looked up by binary search
+and at most one step is read from there. The parsers then seek straight
+to the window and stop after it:
+
+    visualize_rpl.py / visualize_rpl_timeline.py   --from / --to
+    rpl_export.py                                  --from / --to
+    grep_by_block.py                               --from / --to
+
+The index is saved next to the parsed-log cache (rpl_log_cache.py), keyed
+the same way, so rpl_log_cache.py --list/--invalidate/--evict cover it.
+Times are sim times as printed in the log: seconds, 'MM:SS' or 'HH:MM:SS.ms'.
+
+Usage:
+    python3 rpl_log_index.py build <logfile.txt> [--step-kb 256]
+    python3 rpl_log_index.py show <logfile.txt>
+    python3 rpl_log_index.py range <logfile.txt> --from 40:00 --to 45:00
+    python3 rpl_log_index.py range <logfile.txt> --from 2400000000 --tick
+"""
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from rpl_log_tokenizer import re_base, parse_time, parse_time_arg
+from rpl_event_store import parse_byte_range
+from rpl_log_cache import CACHE_DIR, cache_key
+
+# --- Configuration ---
+INDEX_STEP = 256 * 1024
+INDEX_FORMAT = 1
+
+
+def _line_key(raw):
+    """(sim time, tick) of a raw log line, None if it has no timestamp."""
+    base_match = re_base.match(raw.decode('utf-8', errors='ignore'))
+    if not base_match:
+        return None
+    tick = base_match.group(1)
+    return parse_time(base_match.group(2)), int(tick) if tick is not None else -1
+
+
+class LogIndex:
+    """Samples (offset, time, tick) in file order; see the module doc."""
+    def __init__(self, offsets, times, ticks, size, step):
+        self.offsets = offsets
+        self.times = times
+        self.ticks = ticks
+        self.size = size
+        self.step = step
+        self.monotonic = bool(np.all(np.diff(times) >= 0))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def start_time_abs(self):
+        """Time of the first timestamped line (relative times are counted from it)."""
+        return float(self.times[0]) if len(self.times) else None
+
+    @property
+    def has_ticks(self):
+        return bool(len(self.ticks)) and bool(np.all(self.ticks >= 0))
+
+    @classmethod
+    def build(cls, filepath, step=INDEX_STEP):
+        size = os.path.getsize(filepath)
+        samples = []
+        with open(filepath, 'rb') as f:
+            for point in range(0, size, step):
+                if samples and samples[-1][0] >= point:
+                    continue   # One line (or untimestamped run) longer than the step
+                f.seek(point)
+                offset = point
+                if point:
+                    offset += len(f.readline())   # Skip to the next line start
+                for raw in iter(f.readline, b""):
+                    key = _line_key(raw)
+                    if key is not None:
+                        samples.append((offset, *key))
+                        break
+                    offset += len(raw)
+        offsets, times, ticks = zip(*samples) if samples else ((), (), ())
+        return cls(np.array(offsets, dtype='i8'), np.array(times, dtype='f8'),
+                   np.array(ticks, dtype='i8'), size, step)
+
+    def save(self, path):
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(tmp_path, offsets=self.offsets, times=self.times, ticks=self.ticks,
+                 meta=np.array([self.size, self.step, INDEX_FORMAT], dtype='i8'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            size, step, fmt = data['meta'].tolist()
+            if fmt != INDEX_FORMAT:
+                raise ValueError(f"Stale index layout in {path}")
+            return cls(data['offsets'], data['times'], data['ticks'], size, step)
+
+    # --- Queries ---
+    def _first_line(self, filepath, bound, after, tick):
+        """
+        Offset of the first timestamped line with value >= bound (> bound when
+        after), value being the sim time or the tick; the file size if none.
+        """
+        values = self.ticks if tick else self.times
+        # Last sample that is certainly before the line looked for (none if time goes backwards)
+        i = int(np.searchsorted(values, bound, side='right' if after else 'left')) - 1 if self.monotonic else -1
+        offset = int(self.offsets[i]) if i >= 0 else 0
+        with open(filepath, 'rb') as f:
+            f.seek(offset)
+            for raw in iter(f.readline, b""):
+                key = _line_key(raw)
+                if key is not None:
+                    value = key[1] if tick else key[0]
+                    if value > bound or (value == bound and not after):
+                        return offset
+                offset += len(raw)
+        return self.size
+
+    def byte_range(self, filepath, t_from=None, t_to=None, tick=False):
+        """
+        (start, end) bytes holding the lines from t_from to t_to inclusive;
+        None = open end. Without monotonic time, end is always the file size,
+        so the lines after t_to have to be filtered out by time.
+        """
+        if tick and not self.has_ticks:
+            raise ValueError("This log has no Cooja tick column")
+        if not len(self):
+            return 0, self.size
+        start = self._first_line(filepath, t_from, False, tick) if t_from is not None else 0
+        end = self.size
+        if t_to is not None and self.monotonic:
+            end = self._first_line(filepath, t_to, True, tick)
+        return start, max(start, end)
+
+
+def load_log_index(logfile_path, step=None, cache_dir=CACHE_DIR, rebuild=False):
+    """
+    LogIndex of a log, from disk when the log is unchanged. A saved index of
+    any step is used unless a step is asked for (build --step-kb).
+    """
+    key, path, st = cache_key(logfile_path)
+    npz_path = cache_dir / f"{key}.index.npz"
+
+    if npz_path.is_file() and not rebuild:
+        try:
+            index = LogIndex.load(npz_path)
+            if step in (None, index.step) and index.size == st.st_size:
+                os.utime(npz_path)  # Mark as recently used
+                return index
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring unreadable index {npz_path.name}: {e}")
+
+    index = LogIndex.build(path, step or INDEX_STEP)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        index.save(npz_path)
+        # Same meta layout as the log cache, so --list/--invalidate/--evict cover it
+        with open(npz_path.with_suffix(".json"), 'w', encoding='utf-8') as f:
+            json.dump({'source': str(path), 'size': st.st_size,
+                       'mtime_ns': st.st_mtime_ns, 'rows': len(index)}, f)
+    except OSError as e:
+        print(f"Warning: Could not save log index: {e}")
+    return index
+
+
+def window_range(logfile_path, t_from=None, t_to=None):
+    """(start, end) bytes of a sim-time window of a log, through its index."""
+    return load_log_index(logfile_path).byte_range(logfile_path, t_from, t_to)
+
+
+def load_event_table_window(logfile_path, t_from=None, t_to=None):
+    """
+    EventTable of the lines from t_from to t_to only. Relative times count
+    from the first line of the window, so the slice renders like a log of
+    its own.
+    """
+    start, end = window_range(logfile_path, t_from, t_to)
+    print(f"Reading bytes {start}-{end} of {os.path.getsize(logfile_path)}")
+    # The time filter only matters when sim time goes backwards (see byte_range)
+    return parse_byte_range(str(logfile_path), start, end, None, t_from, t_to)
+
+
+def parse_window_args(args):
+    """(t_from, t_to) seconds from the --from/--to options of a parser; exits on bad input."""
+    try:
+        t_from = parse_time_arg(args.t_from) if args.t_from else None
+        t_to = parse_time_arg(args.t_to) if args.t_to else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if t_from is not None and t_to is not None and t_to < t_from:
+        print("Error: --to is before --from")
+        sys.exit(1)
+    return t_from, t_to
+
+
+def add_window_args(parser):
+    parser.add_argument("--from", dest="t_from", help="Sim time to start at: seconds, MM:SS or HH:MM:SS")
+    parser.add_argument("--to", dest="t_to", help="Sim time to stop after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sparse time -> byte-offset index of a Cooja log")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_p = sub.add_parser("build", help="(Re)build the index")
+    build_p.add_argument("logfile", type=Path)
+    build_p.add_argument("--step-kb", type=int, default=INDEX_STEP // 1024,
+                         help=f"Sample spacing (default: {INDEX_STEP // 1024})")
+    show_p = sub.add_parser("show", help="Print the samples")
+    show_p.add_argument("logfile", type=Path)
+    range_p = sub.add_parser("range", help="Byte range of a window")
+    range_p.add_argument("logfile", type=Path)
+    add_window_args(range_p)
+    range_p.add_argument("--tick", action="store_true", help="--from/--to are Cooja ticks")
+    args = parser.parse_args()
+
+    if not args.logfile.exists():
+        print(f"File not found: {args.logfile}")
+        sys.exit(1)
+
+    if args.command == "build":
+        if args.step_kb <= 0:
+            print("Error: --step-kb must be positive")
+            sys.exit(1)
+        index = load_log_index(args.logfile, args.step_kb * 1024, rebuild=True)
+        print(f"{len(index)} samples every {index.step // 1024} KB of {index.size} bytes"
+              + ("" if index.monotonic else " (sim time goes backwards: windows read on to the end of the log)"))
+    elif args.command == "show":
+        index = load_log_index(args.logfile)
+        for offset, t, tick in zip(index.offsets.tolist(), index.times.tolist(), index.ticks.tolist()):
+            print(f"{offset:14d} {t:12.3f}" + (f" {tick}" if tick >= 0 else ""))
+    else:
+        index = load_log_index(args.logfile)
+        if args.tick:
+            try:
+                t_from = int(args.t_from) if args.t_from else None
+                t_to = int(args.t_to) if args.t_to else None
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        else:
+            t_from, t_to = parse_window_args(args)
+        try:
+            start, end = index.byte_range(args.logfile, t_from, t_to, tick=args.tick)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"{start} {end}")
+
+
+if __name__ == "__main__":
+    main()
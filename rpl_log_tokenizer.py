@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Shared single-pass tokenizer for raw Cooja / Contiki-NG RPL logs.
+
+Reads the log once and turns every relevant line into a typed event:
+
+    DIO          Incoming DIO (id, ver, rank) = (30,240,434) from:fe80::201:1:1:1
+    DAG          RPL: DAG: fd00 Parent: 07 | Rank: 128, LnkM: ..., Pref Y
+    TABLE_START  --- RPL Neighbour Set for Instance ID: 46 ---
+    TABLE_ENTRY  any 'Parent: XX ... Pref Y|N' line inside a neighbour table
+    TABLE_END    --- End of Table
+    DAO          Sending a [No-Path ]DAO with ... / DAO lifetime: ...
+
+The visualize_rpl* scripts subscribe to the event types they need on a
+CoojaLogScanner, so several outputs can be produced from one scan of the log.
+
+Filters given to the tokenizer (reporting nodes, a sim-time range, DAG
+prefixes, DIO instances) are applied before the fields of a line are
+extracted, and tokenizing stops at the first line after the time range.
+
+Usage (diagnostics):
+    python3 rpl_log_tokenizer.py <logfile.txt>
+"""
+import sys
+import re
+from pathlib import Path
+from collections import namedtuple, defaultdict, Counter
+
+# --- Event Types ---
+DIO = 'DIO'
+DAG = 'DAG'
+TABLE_START = 'TABLE_START'
+TABLE_ENTRY = 'TABLE_ENTRY'
+TABLE_END = 'TABLE_END'
+DAO = 'DAO'
+
+EVENT_TYPES = (DIO, DAG, TABLE_START, TABLE_ENTRY, TABLE_END, DAO)
+TABLE_TYPES = (TABLE_START, TABLE_ENTRY, TABLE_END)
+
+# --- Regex Patterns ---
+# 1. Base format, with or without the Cooja tick counter:
+#    00:07:34.307 Node:6 :[INFO: RPL       ] ...
+#    273994:00:19:56.392 Node:2 :[INFO: RPL       ] ...
+re_base = re.compile(r"^(?:(\d+):)?(\d{2}:\d{2}:\d{2}\.\d+)\s+Node:(\d+)\s+:(.*)")
+
+# 2. DIO: Incoming DIO (id, ver, rank) = (30,240,434) from:fe80::201:1:1:1
+re_dio = re.compile(r"Incoming DIO \(id, ver, rank\) = \((\d+),(.*)\) (from:[\w:]+)")
+
+# 3. DAG: RPL: DAG: fd00 ... Parent: 07 | Rank: 128 ...
+re_dag_chk = re.compile(r"RPL: DAG:\s*([0-9a-fA-F]+)")
+
+# 4. Neighbour table dump
+re_table_start = re.compile(r"RPL Neighbour Set for Instance ID:\s+(\d+)")
+re_entry = re.compile(r"Parent:\s*([0-9a-fA-F]+).*Pref\s+(Y|N)")
+re_table_end = re.compile(r"--- End of Table")
+
+# 5. DAO: dao_output_target() and dao_input_nonstoring()
+re_dao_out = re.compile(r"Sending a (?:No-Path )?DAO with sequence number (\d+), lifetime (\d+), prefix ([0-9a-fA-F:]+)")
+re_dao_in = re.compile(r"DAO lifetime:\s*(\d+).*?prefix:\s*([0-9a-fA-F:]+)")
+
+# --- Event Records ---
+# Every event carries the absolute sim time (seconds), the time relative to the
+# first timestamped line of the log, the Cooja tick (None when the log has no
+# tick column), the 'HH:MM:SS.ms' string and the reporting node.
+_BASE_FIELDS = "time rel_time tick timestamp_str node "
+
+
+class DioEvent(namedtuple('DioEvent', _BASE_FIELDS + "instance version rank tx_node")):
+    __slots__ = ()
+    type = DIO
+
+
+class DagEvent(namedtuple('DagEvent', _BASE_FIELDS + "dag parent rank lnkm pathcost pref preferred")):
+    __slots__ = ()
+    type = DAG
+
+
+class TableStartEvent(namedtuple('TableStartEvent', _BASE_FIELDS + "instance")):
+    __slots__ = ()
+    type = TABLE_START
+
+
+class TableEntryEvent(namedtuple('TableEntryEvent', _BASE_FIELDS + "instance parent preferred")):
+    __slots__ = ()
+    type = TABLE_ENTRY
+
+
+class TableEndEvent(namedtuple('TableEndEvent', _BASE_FIELDS + "instance")):
+    __slots__ = ()
+    type = TABLE_END
+
+
+# no_path: 'Sending a No-Path DAO' (sends only; a reception does not say)
+class DaoEvent(namedtuple('DaoEvent', _BASE_FIELDS + "direction no_path seq lifetime target message")):
+    __slots__ = ()
+    type = DAO
+
+
+def parse_time(timestr):
+    """Converts 'HH:MM:SS.ms' to total seconds (float)."""
+    h, m, s = timestr.split(':')
+    return float(h) * 3600 + float(m) * 60 + float(s)
+
+
+def parse_time_arg(text):
+    """Sim time from the command line: seconds, 'MM:SS' or 'HH:MM:SS(.ms)'."""
+    seconds = 0.0
+    for part in text.strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    if seconds < 0 or text.count(':') > 2:
+        raise ValueError(f"Bad time: {text}")
+    return seconds
+
+
+def parse_node_list(text):
+    """'1-20,25' -> [1, ..., 20, 25]"""
+    nodes = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        nodes.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(nodes)
+
+
+def extract_node_id(ipv6_str):
+    """Extracts the node ID from the last segment of an IPv6 string."""
+    clean_ip = ipv6_str.replace("from:", "").strip()
+    parts = clean_ip.split(':')
+    try:
+        return int(parts[-1], 16)
+    except ValueError:
+        return 0
+
+
+def _word_after(parts, key):
+    """Returns the token following 'key' in a split message, or None."""
+    if key not in parts:
+        return None
+    idx = parts.index(key) + 1
+    return parts[idx] if idx < len(parts) else None
+
+
+def _to_int(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+class LogTokenizer:
+    """
+    Turns log lines into typed events.
+    Keeps the small amount of state a single pass needs: the start time of the
+    log, the set of reporting nodes and the neighbour table currently open.
+
+    Optional filters: nodes (reporting nodes), t_from / t_to (absolute sim
+    time, seconds, inclusive), prefixes (DAG events) and instances (DIO and
+    table events). nodes still lists every reporting node seen.
+    """
+    def __init__(self, types=None, start_time_abs=None, nodes=None, t_from=None, t_to=None,
+                 prefixes=None, instances=None):
+        self.types = set(types) if types is not None else set(EVENT_TYPES)
+        # Given when tokenizing a slice of a log, so relative times match a full scan
+        self.start_time_abs = start_time_abs
+        self.nodes = set()
+        # (node, instance) of the neighbour table being dumped, if any
+        self.table = None
+        self._want_tables = any(t in self.types for t in TABLE_TYPES)
+
+        self.node_filter = set(nodes) if nodes is not None else None
+        self.t_from = t_from
+        self.t_to = t_to
+        self.prefixes = {p.lower() for p in prefixes} if prefixes is not None else None
+        self.instances = {str(i) for i in instances} if instances is not None else None
+        self.past_end = False   # Set at the first line after t_to
+
+    def tokenize(self, lines):
+        """Generator over the events of an iterable of lines."""
+        for line in lines:
+            yield from self.feed(line)
+            if self.past_end:
+                break
+
+    def feed(self, line):
+        """Generator over the events found in a single line."""
+        base_match = re_base.match(line)
+        if not base_match:
+            return
+
+        tick, time_str, node_str, message = base_match.groups()
+        current_time = parse_time(time_str)
+        node = int(node_str)
+        self.nodes.add(node)
+        if tick is not None:
+            tick = int(tick)
+
+        if self.start_time_abs is None:
+            self.start_time_abs = current_time
+        rel_time = current_time - self.start_time_abs
+        base = (current_time, rel_time, tick, time_str)
+
+        if self.t_to is not None and current_time > self.t_to:
+            self.past_end = True
+            return
+        if self.t_from is not None and current_time < self.t_from:
+            return
+        if self.node_filter is not None and node not in self.node_filter:
+            return
+
+        # --- Neighbour Table Dumps ---
+        if self._want_tables:
+            match_start = re_table_start.search(message)
+            if match_start:
+                self.table = (node, match_start.group(1))
+                if self.instances is not None and self.table[1] not in self.instances:
+                    self.table = None
+                    return
+                if TABLE_START in self.types:
+                    yield TableStartEvent(*base, node, self.table[1])
+                return
+
+        # --- DIO Reception ---
+        if DIO in self.types and "Incoming DIO" in message:
+            dio_match = re_dio.search(message)
+            if dio_match and (self.instances is None or dio_match.group(1) in self.instances):
+                instance_id, ver_rank, from_ip = dio_match.groups()
+                ver_rank = ver_rank.split(',')
+                yield DioEvent(*base, node, instance_id,
+                               _to_int(ver_rank[0]),
+                               _to_int(ver_rank[-1]) if len(ver_rank) > 1 else None,
+                               extract_node_id(from_ip))
+
+        # --- DAG / Parent Lines ---
+        if DAG in self.types and "RPL: DAG:" in message:
+            dag_match = re_dag_chk.search(message)
+            if dag_match and (self.prefixes is None or dag_match.group(1).lower() in self.prefixes):
+                yield self._dag_event(base, node, dag_match.group(1), message)
+
+        # --- Table Entries and End (only inside a table) ---
+        if self.table is not None and self._want_tables:
+            table_node, instance = self.table
+            match_entry = re_entry.search(message)
+            if match_entry and TABLE_ENTRY in self.types:
+                yield TableEntryEvent(*base, table_node, instance,
+                                      int(match_entry.group(1), 16),
+                                      match_entry.group(2) == 'Y')
+            if re_table_end.search(message):
+                self.table = None
+                if TABLE_END in self.types:
+                    yield TableEndEvent(*base, table_node, instance)
+
+        # --- DAO Transmission / Reception ---
+        if DAO in self.types:
+            if "Sending a" in message and "DAO with" in message:
+                dao_match = re_dao_out.search(message)
+                seq, lifetime, target = dao_match.groups() if dao_match else (None, None, None)
+                yield DaoEvent(*base, node, 'out', "No-Path DAO" in message,
+                               _to_int(seq), _to_int(lifetime), target, message)
+            elif "DAO lifetime:" in message:
+                dao_match = re_dao_in.search(message)
+                lifetime, target = dao_match.groups() if dao_match else (None, None)
+                yield DaoEvent(*base, node, 'in', False, None, _to_int(lifetime), target, message)
+
+    @staticmethod
+    def _dag_event(base, node, dag_prefix, message):
+        """
+        Field extraction mirrors parse-rpl.sh: find the keyword, take the next word.
+        parent is 0 when the line has no parent ('none' or missing) and None
+        when the parent field could not be parsed.
+        """
+        parts = message.split()
+
+        parent_id = 0
+        if "Parent:" in parts:
+            parent_str = _word_after(parts, "Parent:")
+            try:
+                parent_str = parent_str.replace(",", "")
+                parent_id = int(parent_str, 16) if parent_str.lower() != "none" else 0
+            except (AttributeError, ValueError):
+                parent_id = None
+
+        rank = 0
+        if "Rank:" in parts:
+            rank = _to_int((_word_after(parts, "Rank:") or "").replace(",", ""))
+
+        lnkm = _word_after(parts, "LnkM:")
+        if lnkm is not None:
+            lnkm = lnkm.replace(",", "")
+
+        return DagEvent(*base, node, dag_prefix, parent_id, rank, lnkm,
+                        _word_after(parts, "PathCost:"), _word_after(parts, "Pref"),
+                        "Pref Y" in message)
+
+
+def find_start_time(lines):
+    """Absolute time of the first timestamped line, None if there is none."""
+    for line in lines:
+        base_match = re_base.match(line)
+        if base_match:
+            return parse_time(base_match.group(2))
+    return None
+
+
+def open_log(filepath):
+    """Opens a raw log the way every parser here reads it."""
+    return open(filepath, 'r', encoding='utf-8', errors='ignore')
+
+
+class CoojaLogScanner:
+    """
+    Reads a log once and hands each event to the callbacks subscribed to its type.
+    Only the event types somebody subscribed to are tokenized.
+    """
+    def __init__(self):
+        self.subscribers = defaultdict(list)
+
+    def subscribe(self, event_type, callback):
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type: {event_type}")
+        self.subscribers[event_type].append(callback)
+
+    def scan(self, filepath):
+        """Scans the log and returns the tokenizer (nodes, start_time_abs)."""
+        tokenizer = LogTokenizer(types=self.subscribers.keys())
+        subscribers = self.subscribers
+        with open_log(filepath) as f:
+            for evt in tokenizer.tokenize(f):
+                for callback in subscribers[evt.type]:
+                    callback(evt)
+        return tokenizer
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python3 rpl_log_tokenizer.py <logfile.txt>")
+        sys.exit(1)
+
+    log_file = Path(sys.argv[1])
+    if not log_file.exists():
+        print(f"File not found: {log_file}")
+        sys.exit(1)
+
+    counts = Counter()
+    scanner = CoojaLogScanner()
+    for event_type in EVENT_TYPES:
+        scanner.subscribe(event_type, lambda evt: counts.update([evt.type]))
+    tokenizer = scanner.scan(log_file)
+
+    print(f"Nodes: {sorted(tokenizer.nodes)}")
+    for event_type in EVENT_TYPES:
+        print(f"{event_type:12s} {counts[event_type]}")
+
+
+if __name__ == "__main__":
+    main()
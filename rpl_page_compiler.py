@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Parallel, cached per-page compilation of the paginated LaTeX outputs.
+
+Instead of one latexmk run over the whole document, the document is split
+into standalone units, which are compiled concurrently and merged into the
+final PDF with PyPDF2:
+
+    Compare_graph.tex, DIO_graph.tex   one unit per tikzpicture page
+                                       (the pages are separated by \\newpage)
+    RPL_Timeline.tex                   one unit (sections flow across pages,
+                                       as in a plain latexmk run), or with
+                                       --sections-per-unit N, N \\section*
+                                       snapshots per unit
+
+Each compiled unit is cached under PAGE_CACHE_DIR by the hash of its full
+source (and engine), so re-rendering a log after a small change only rebuilds
+the pages whose TikZ changed. Splitting a document changes its layout: every
+unit starts on a new page and its page numbers restart, which is why it is
+opt-in.
+
+Preambles with a dump marker (rpl_latex_format.py) are precompiled into a
+format once, and every unit is started from it.
+
+Usage:
+    python3 rpl_page_compiler.py Compare_graph.tex [--workers N] [-o out.pdf]
+    python3 rpl_page_compiler.py RPL_Timeline.tex --engine lualatex [--sections-per-unit 20]
+"""
+import os
+import sys
+import re
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from rpl_latex_format import DUMP_MARKER, ensure_format, format_args
+
+# --- Configuration ---
+PAGE_CACHE_DIR = Path.home() / "data" / "rpl_cache" / "pages"
+PAGE_CACHE_MAX_BYTES = 1024 ** 3   # 1 GB
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_ENGINE = "lualatex"
+
+# Wrapper for the bare tikzpicture pages of visualize_rpl.py / visualize_rpl-1.py
+TIKZ_PAGE_PREAMBLE = r"""\documentclass[tikz, border=5mm]{standalone}
+\usetikzlibrary{shapes.misc, arrows}
+""" + DUMP_MARKER + "\n"
+
+
+class PageCompileError(Exception):
+    pass
+
+
+def split_tikz_pages(text):
+    """Pages of a visualize_rpl*.py output: tikzpictures separated by \\newpage lines."""
+    pages = re.split(r"(?m)^\\newpage[ \t]*$", text)
+    return [p.strip("\n") for p in pages if p.strip()]
+
+
+def split_document(text, sections_per_unit=None):
+    """
+    (preamble, units) of a full document. By default the whole body is one
+    unit; with sections_per_unit, every unit holds that many \\section*
+    (anything before the first section goes with the first unit).
+    """
+    if "\\begin{document}" not in text:
+        raise ValueError("No \\begin{document} found")
+    preamble, body = text.split("\\begin{document}", 1)
+    body = body.rsplit("\\end{document}", 1)[0]
+    if not sections_per_unit:
+        return preamble, [body.strip("\n")] if body.strip() else []
+    sections = re.split(r"(?m)^(?=\\section\*)", body)
+    if len(sections) > 1:
+        head = sections.pop(0)
+        sections[0] = head + sections[0] if head.strip() else sections[0]
+    units = ["".join(sections[i:i + sections_per_unit]).strip("\n")
+             for i in range(0, len(sections), sections_per_unit)]
+    return preamble, [u for u in units if u.strip()]
+
+
+def unit_source(preamble, body):
+    return f"{preamble.rstrip()}\n\\begin{{document}}\n{body}\n\\end{{document}}\n"
+
+
+def unit_key(source, engine):
+    return hashlib.sha1(f"{engine}\0{source}".encode('utf-8')).hexdigest()
+
+
+def compile_unit(source, engine=DEFAULT_ENGINE, cache_dir=PAGE_CACHE_DIR, base_dir=None, fmt=None):
+    """
+    PDF of one standalone unit; (pdf_path, from_cache).
+    Runs in a private temporary directory, with base_dir (the directory of the
+    original document) as working directory so relative \\includegraphics work.
+    fmt is a format name from rpl_latex_format.ensure_format(); a unit that does
+    not compile with it is retried without.
+    """
+    pdf_path = cache_dir / f"{unit_key(source, engine)}.pdf"
+    if pdf_path.is_file():
+        os.utime(pdf_path)  # Mark as recently used
+        return pdf_path, True
+
+    with tempfile.TemporaryDirectory(prefix="rpl_page_") as tmp:
+        tex_path = Path(tmp) / "page.tex"
+        tex_path.write_text(source, encoding='utf-8')
+        command = [engine, "-interaction=nonstopmode", f"-output-directory={tmp}", str(tex_path)]
+        out_pdf = Path(tmp) / "page.pdf"
+        result = None
+        if fmt:
+            fmt_args, env = format_args(fmt)
+            result = subprocess.run(command[:1] + fmt_args + command[1:], cwd=base_dir, env=env,
+                                    capture_output=True, text=True, errors='replace')
+        if not out_pdf.is_file():
+            result = subprocess.run(command, cwd=base_dir, capture_output=True, text=True, errors='replace')
+        if not out_pdf.is_file():
+            raise PageCompileError(result.stdout[-1500:])
+        if result.returncode != 0:
+            # Like latexmk in nonstop mode: keep the PDF, but say so
+            print(f"Warning: {engine} reported errors for unit {pdf_path.stem[:10]}")
+        tmp_pdf = pdf_path.with_suffix(".tmp.pdf")
+        shutil.copyfile(out_pdf, tmp_pdf)
+        os.replace(tmp_pdf, pdf_path)
+    return pdf_path, False
+
+
+def trim_cache(cache_dir=PAGE_CACHE_DIR, max_bytes=PAGE_CACHE_MAX_BYTES):
+    """Removes least-recently-used page PDFs until the cache fits in max_bytes."""
+    entries = []
+    for p in cache_dir.glob("*.pdf"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, p))
+    entries.sort()
+    total = sum(e[1] for e in entries)
+    for _, size, p in entries:
+        if total <= max_bytes:
+            break
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+def compile_units(preamble, bodies, output_pdf, engine=DEFAULT_ENGINE, workers=DEFAULT_WORKERS,
+                  cache_dir=PAGE_CACHE_DIR, base_dir=None):
+    """Compiles the units in a pool of 'workers' engine processes and merges them in order."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    sources = [unit_source(preamble, body) for body in bodies]
+
+    start = time.time()
+    fmt = None
+    if any(not (cache_dir / f"{unit_key(s, engine)}.pdf").is_file() for s in sources):
+        fmt = ensure_format(preamble, engine)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda s: compile_unit(s, engine, cache_dir, base_dir, fmt), sources))
+    n_cached = sum(1 for _, cached in results if cached)
+
+    writer = PdfWriter()
+    for pdf_path, _ in results:
+        writer.append(PdfReader(pdf_path))
+    tmp_pdf = Path(output_pdf).with_suffix(".tmp.pdf")
+    with open(tmp_pdf, 'wb') as f:
+        writer.write(f)
+    os.replace(tmp_pdf, output_pdf)
+
+    trim_cache(cache_dir)
+    print(f"Compiled {output_pdf}: {len(sources)} units, {n_cached} cached, "
+          f"{len(sources) - n_cached} rebuilt in {time.time() - start:.1f}s ({workers} workers)")
+    return output_pdf
+
+
+def compile_tex_pages(tex_path, output_pdf=None, engine=DEFAULT_ENGINE, workers=DEFAULT_WORKERS,
+                      cache_dir=PAGE_CACHE_DIR, sections_per_unit=None):
+    """Splits a generated .tex file into units (see module doc) and compiles it."""
+    tex_path = Path(tex_path)
+    text = tex_path.read_text(encoding='utf-8')
+    if "\\begin{document}" in text:
+        preamble, bodies = split_document(text, sections_per_unit)
+    else:
+        preamble, bodies = TIKZ_PAGE_PREAMBLE, split_tikz_pages(text)
+    if output_pdf is None:
+        output_pdf = tex_path.with_suffix(".pdf")
+    return compile_units(preamble, bodies, output_pdf, engine, workers, cache_dir,
+                         base_dir=tex_path.resolve().parent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a paginated .tex output page by page, in parallel")
+    parser.add_argument("texfile", type=Path, help="Compare_graph.tex, DIO_graph.tex, RPL_Timeline.tex, ...")
+    parser.add_argument("-o", "--output", type=Path, help="Output PDF (default: next to the .tex)")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, help=f"LaTeX engine (default: {DEFAULT_ENGINE})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Concurrent LaTeX runs (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--cache-dir", type=Path, default=PAGE_CACHE_DIR, help=f"Default: {PAGE_CACHE_DIR}")
+    parser.add_argument("--sections-per-unit", type=int,
+                        help="Split a full document into units of this many \\section* (each unit starts "
+                             "a new page and restarts page numbers; default: one unit)")
+    args = parser.parse_args()
+
+    if not args.texfile.is_file():
+        print(f"File not found: {args.texfile}")
+        sys.exit(1)
+
+    try:
+        compile_tex_pages(args.texfile, args.output, args.engine, args.workers, args.cache_dir,
+                          args.sections_per_unit)
+    except PageCompileError as e:
+        print(f"\n--- LaTeX Compilation Failed ---\n{e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
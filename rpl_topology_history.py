@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Time-travel queries over the preferred-parent topology of a Cooja log.
+
+The neighbour-table dumps of the log are replayed once through the same
+TimelineBuilder / NetworkState rules as visualize_rpl_timeline.py, and every
+topology change is recorded as a delta:
+
+    (time, label, instance, child, old_parent, new_parent)
+
+Every CHECKPOINT_EVERY changes a full copy of the topology is kept. The
+history is saved next to the parsed-log cache (rpl_log_cache.py), so later
+queries neither re-parse nor replay the log:
+
+    topology_at(t)            binary search for the checkpoint, then at most
+                              CHECKPOINT_EVERY deltas
+    changes_between(t1, t2)   two binary searches, then the slice of deltas
+
+Times are either seconds since the first line of the log or log timestamps
+('HH:MM:SS' / 'HH:MM:SS.ms').
+
+Usage:
+    python3 rpl_topology_history.py build <logfile.txt> [--checkpoint-every N]
+    python3 rpl_topology_history.py at <logfile.txt> 00:37:12 [--instance 46] [--tikz out.tex]
+    python3 rpl_topology_history.py changes <logfile.txt> 00:37:00 00:38:00 [--instance 46]
+"""
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from collections import namedtuple
+
+import numpy as np
+
+from rpl_log_tokenizer import parse_time
+from rpl_event_store import DEFAULT_WORKERS
+from rpl_log_cache import CACHE_DIR, cache_key, load_cached_event_table
+from visualize_rpl_timeline import TimelineBuilder, INSTANCE_MAP, topology_text, snapshot_section
+
+# --- Configuration ---
+CHECKPOINT_EVERY = 256   # Deltas between full checkpoints
+HISTORY_FORMAT = 1       # Bump when the stored layout changes
+NO_PARENT = -1
+
+CHANGE_DTYPE = np.dtype([('time', 'f8'), ('instance', 'i4'), ('child', 'i4'),
+                         ('old', 'i4'), ('new', 'i4')])
+
+Change = namedtuple('Change', "time label instance child old_parent new_parent")
+
+
+def _node_id(value):
+    return NO_PARENT if value is None else int(value)
+
+
+def _node_str(value):
+    return None if value == NO_PARENT else str(value)
+
+
+class _ChangeRecorder(TimelineBuilder):
+    """TimelineBuilder that records topology changes instead of writing LaTeX."""
+    def __init__(self, logfile_path):
+        super().__init__(logfile_path)
+        self.changes = []
+        self.network.on_change = self.on_change
+
+    def on_change(self, instance_id, child_id, old_parent, new_parent):
+        self.changes.append((self.time, self.label, int(instance_id), int(child_id),
+                             _node_id(old_parent), _node_id(new_parent)))
+
+    def write_snapshot(self, timestamp):
+        pass
+
+
+class TopologyHistory:
+    """
+    Deltas in log order plus full checkpoints.
+    Checkpoint k is the topology before change k * checkpoint_every, stored
+    as the edge rows checkpoint_edges[checkpoint_offsets[k]:checkpoint_offsets[k + 1]].
+    """
+    def __init__(self, changes, labels, checkpoint_edges, checkpoint_offsets,
+                 checkpoint_every, start_time_abs):
+        self.changes = changes                   # structured: time, instance, child, old, new
+        self.labels = labels                     # 'HH:MM:SS.ms' per change
+        self.checkpoint_edges = checkpoint_edges  # (n, 3) int: instance, child, parent
+        self.checkpoint_offsets = checkpoint_offsets
+        self.checkpoint_every = checkpoint_every
+        self.start_time_abs = start_time_abs
+
+    def __len__(self):
+        return len(self.changes)
+
+    @classmethod
+    def from_changes(cls, records, start_time_abs, checkpoint_every=CHECKPOINT_EVERY):
+        """Builds the history from (time, label, instance, child, old, new) tuples."""
+        changes = np.array([(t, inst, child, old, new) for t, _, inst, child, old, new in records],
+                           dtype=CHANGE_DTYPE)
+        labels = np.array([r[1] for r in records], dtype=str)
+
+        state = {}
+        edges, offsets = [], [0]
+        for i, (_, _, inst, child, _, new) in enumerate(records):
+            if i % checkpoint_every == 0:
+                edges.extend((inst_, child_, parent) for (inst_, child_), parent in sorted(state.items()))
+                offsets.append(len(edges))
+            if new == NO_PARENT:
+                state.pop((inst, child), None)
+            else:
+                state[(inst, child)] = new
+        if not records:
+            offsets.append(0)
+
+        return cls(changes, labels, np.array(edges, dtype='i4').reshape(-1, 3),
+                   np.array(offsets, dtype='i8'), checkpoint_every, start_time_abs)
+
+    # --- Queries ---
+    def to_seconds(self, when):
+        """Seconds since the log start, from a number or an 'HH:MM:SS[.ms]' log timestamp."""
+        if isinstance(when, str) and ":" in when:
+            return parse_time(when) - (self.start_time_abs or 0.0)
+        return float(when)
+
+    def topology_at(self, when, instance=None):
+        """
+        Topology after every change at or before 'when', in the NetworkState
+        layout: {instance_id: {child_id: parent_id}} with string IDs.
+        """
+        n = int(np.searchsorted(self.changes['time'], self.to_seconds(when), side='right'))
+        k = n // self.checkpoint_every
+        if k >= len(self.checkpoint_offsets) - 1:
+            k = len(self.checkpoint_offsets) - 2
+
+        topology = {}
+        lo, hi = self.checkpoint_offsets[k], self.checkpoint_offsets[k + 1]
+        for inst, child, parent in self.checkpoint_edges[lo:hi].tolist():
+            topology.setdefault(str(inst), {})[str(child)] = str(parent)
+
+        for _, inst, child, _, new in self.changes[k * self.checkpoint_every:n].tolist():
+            inst_topology = topology.setdefault(str(inst), {})
+            if new == NO_PARENT:
+                inst_topology.pop(str(child), None)
+            else:
+                inst_topology[str(child)] = str(new)
+
+        if instance is not None:
+            return {instance: topology.get(instance, {})}
+        return topology
+
+    def changes_between(self, t1, t2, instance=None):
+        """Changes with t1 < time <= t2, in log order."""
+        times = self.changes['time']
+        lo = int(np.searchsorted(times, self.to_seconds(t1), side='right'))
+        hi = int(np.searchsorted(times, self.to_seconds(t2), side='right'))
+        rows = self.changes[lo:hi].tolist()
+        labels = self.labels[lo:hi].tolist()
+        result = []
+        for (t, inst, child, old, new), label in zip(rows, labels):
+            if instance is not None and str(inst) != instance:
+                continue
+            result.append(Change(t, label, str(inst), str(child), _node_str(old), _node_str(new)))
+        return result
+
+    # --- Persistence ---
+    def save(self, path):
+        start = np.nan if self.start_time_abs is None else self.start_time_abs
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(tmp_path, changes=self.changes, labels=self.labels,
+                 checkpoint_edges=self.checkpoint_edges, checkpoint_offsets=self.checkpoint_offsets,
+                 checkpoint_every=np.array(self.checkpoint_every), start_time_abs=np.array(start),
+                 format=np.array(HISTORY_FORMAT))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data['format']) != HISTORY_FORMAT:
+                raise ValueError(f"Stale history layout in {path}")
+            start = float(data['start_time_abs'])
+            return cls(data['changes'], data['labels'], data['checkpoint_edges'],
+                       data['checkpoint_offsets'], int(data['checkpoint_every']),
+                       None if np.isnan(start) else start)
+
+
+def build_history(logfile_path, checkpoint_every=CHECKPOINT_EVERY, workers=1):
+    """Replays the neighbour tables of a log (read through the parse cache)."""
+    table = load_cached_event_table(logfile_path, workers=workers)
+    recorder = _ChangeRecorder(logfile_path)
+    recorder.replay(table)
+    return TopologyHistory.from_changes(recorder.changes, table.start_time_abs, checkpoint_every)
+
+
+def load_topology_history(logfile_path, checkpoint_every=CHECKPOINT_EVERY, cache_dir=CACHE_DIR,
+                          rebuild=False, workers=1):
+    """TopologyHistory of a log, from disk when the log is unchanged."""
+    key, path, st = cache_key(logfile_path)
+    npz_path = cache_dir / f"{key}.history.npz"
+
+    if npz_path.is_file() and not rebuild:
+        try:
+            history = TopologyHistory.load(npz_path)
+            if history.checkpoint_every == checkpoint_every:
+                os.utime(npz_path)  # Mark as recently used
+                return history
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring unreadable history {npz_path.name}: {e}")
+
+    history = build_history(logfile_path, checkpoint_every, workers)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        history.save(npz_path)
+        # Same meta layout as the log cache, so --list/--invalidate/--evict cover it
+        with open(npz_path.with_suffix(".json"), 'w', encoding='utf-8') as f:
+            json.dump({'source': str(path), 'size': st.st_size,
+                       'mtime_ns': st.st_mtime_ns, 'rows': len(history)}, f)
+    except OSError as e:
+        print(f"Warning: Could not save topology history: {e}")
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Topology-at-time and change queries for a Cooja log")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Build (or rebuild) and store the history of a log")
+    p_at = sub.add_parser("at", help="Topology at a time")
+    p_changes = sub.add_parser("changes", help="Parent changes in (t1, t2]")
+    for p in (p_build, p_at, p_changes):
+        p.add_argument("logfile", type=Path, help="Path to raw log")
+        p.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+                       help=f"Deltas between full checkpoints (default: {CHECKPOINT_EVERY})")
+        p.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                       help=f"Parser processes for large logs (default: {DEFAULT_WORKERS})")
+    p_at.add_argument("time", help="Seconds since log start or HH:MM:SS[.ms]")
+    p_changes.add_argument("t1", help="Seconds since log start or HH:MM:SS[.ms]")
+    p_changes.add_argument("t2", help="Seconds since log start or HH:MM:SS[.ms]")
+    for p in (p_at, p_changes):
+        p.add_argument("--instance", help="Only this instance ID (e.g. 46)")
+    p_at.add_argument("--tikz", type=Path, help="Also write the snapshot as a TikZ section")
+    args = parser.parse_args()
+
+    if not args.logfile.exists():
+        print(f"File not found: {args.logfile}")
+        sys.exit(1)
+
+    history = load_topology_history(args.logfile, args.checkpoint_every,
+                                    rebuild=args.command == "build", workers=args.workers)
+
+    if args.command == "build":
+        print(f"{len(history)} changes, {len(history.checkpoint_offsets) - 1} checkpoints")
+
+    elif args.command == "at":
+        topology = history.topology_at(args.time, args.instance)
+        print(f"Topology at {args.time} ({history.to_seconds(args.time):.3f}s into the log)")
+        for inst in ([args.instance] if args.instance else sorted(set(INSTANCE_MAP) | set(topology))):
+            print("\n".join(topology_text(topology, inst)))
+        if args.tikz:
+            with open(args.tikz, 'w') as f:
+                f.write("\n".join(snapshot_section(args.time, topology)) + "\n")
+            print(f"Wrote {args.tikz}")
+
+    elif args.command == "changes":
+        changes = history.changes_between(args.t1, args.t2, args.instance)
+        for c in changes:
+            old = c.old_parent or "-"
+            new = c.new_parent or "-"
+            print(f"{c.label}  instance {c.instance}  node {c.child}: {old} -> {new}")
+        print(f"{len(changes)} changes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of the simulation runs in ~/data.
+
+Indexes, per run timestamp (YYYYMMDDHHMMSS):
+    run date, start and finish time, MOP, the OFs of fd00 and fd02    (text_<ts>.txt)
+    every RPL_CONF_* value captured from rpl-conf.h                    (text_<ts>.txt)
+    paths of graph_<ts>.pdf, table_<ts>.pdf, routes_<ts>.txt and the PDF page counts
+
+The catalog is brought up to date before every query: one listing of DATA_DIR,
+and only files whose mtime changed are re-read (PDFs are opened only then).
+
+Usage:
+    python3 run_catalog.py update [--rebuild]
+    python3 run_catalog.py list [--mop 2] [--of fd02=MRHOF] [--since July] [--until 2025-08-15]
+                                [--conf RPL_CONF_DIO_INTERVAL_MIN=12] [--csv]
+    python3 run_catalog.py show <timestamp>
+"""
+import os
+import re
+import sys
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import date
+
+from summarize_run import DATA_DIR, parse_summary_file, get_pdf_page_count
+
+# --- Configuration ---
+CATALOG_DB = DATA_DIR / "run_catalog.sqlite"
+
+# Files of a run, by kind
+RUN_FILES = {
+    'text':   re.compile(r"^text_(\d{14})\.txt$"),
+    'graph':  re.compile(r"^graph_(\d{14})\.pdf$"),
+    'table':  re.compile(r"^table_(\d{14})\.pdf$"),
+    'routes': re.compile(r"^routes_(\d{14})\.txt$"),
+}
+
+# Contiki-NG rpl-const.h
+MOP_NUMBERS = {
+    'RPL_MOP_NO_DOWNWARD_ROUTES': 0,
+    'RPL_MOP_NON_STORING': 1,
+    'RPL_MOP_STORING_NO_MULTICAST': 2,
+    'RPL_MOP_STORING_MULTICAST': 3,
+}
+
+MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+          "august", "september", "october", "november", "december"]
+
+# '    52\t#define RPL_CONF_MOP RPL_MOP_NON_STORING' (cat -n output), trailing // comment dropped
+re_conf = re.compile(r"^\s*(?:\d+\s+)?#define\s+(RPL_CONF_\w+)\s+(.*?)\s*(?://.*)?$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    timestamp     TEXT PRIMARY KEY,
+    run_date      TEXT,
+    start_time    TEXT,
+    finish_time   TEXT,
+    mop           TEXT,
+    mop_num       INTEGER,
+    of_fd00       TEXT,
+    of_fd02       TEXT,
+    text_path     TEXT, text_mtime_ns   INTEGER,
+    graph_path    TEXT, graph_mtime_ns  INTEGER, graph_pages INTEGER,
+    table_path    TEXT, table_mtime_ns  INTEGER, table_pages INTEGER,
+    routes_path   TEXT, routes_mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS run_config (
+    timestamp TEXT NOT NULL REFERENCES runs(timestamp) ON DELETE CASCADE,
+    name      TEXT NOT NULL,
+    value     TEXT,
+    PRIMARY KEY (timestamp, name)
+);
+CREATE INDEX IF NOT EXISTS runs_mop ON runs(mop_num);
+CREATE INDEX IF NOT EXISTS run_config_name ON run_config(name, value);
+"""
+
+LIST_COLUMNS = ("timestamp", "run_date", "start_time", "finish_time", "mop", "of_fd00", "of_fd02",
+                "graph_pages", "table_pages")
+
+
+def connect(db_path=CATALOG_DB):
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def parse_run_text(path):
+    """parse_summary_file() fields plus the OF of each DAG and the RPL_CONF_* values."""
+    data = parse_summary_file(path)
+    data['of_fd00'] = data['of_fd02'] = None
+    config = {}
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            # Same rule as parse_summary_file: the last matching line wins
+            if "fd00" in line and ":" in line:
+                data['of_fd00'] = line.split(":", 1)[1].strip()
+            if "fd02" in line and ":" in line:
+                data['of_fd02'] = line.split(":", 1)[1].strip()
+            match = re_conf.match(line)
+            if match:
+                config[match.group(1)] = match.group(2)
+    data['config'] = config
+    return data
+
+
+def scan_data_dir(data_dir=DATA_DIR):
+    """{timestamp: {kind: (path, mtime_ns)}} from one directory listing."""
+    runs = {}
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            for kind, pattern in RUN_FILES.items():
+                match = pattern.match(entry.name)
+                if match:
+                    runs.setdefault(match.group(1), {})[kind] = (entry.path, entry.stat().st_mtime_ns)
+                    break
+    return runs
+
+
+def update_catalog(conn, data_dir=DATA_DIR, rebuild=False):
+    """Re-reads the files that changed since the last update; returns (updated, removed)."""
+    if rebuild:
+        conn.execute("DELETE FROM runs")
+    known = {row['timestamp']: row for row in conn.execute("SELECT * FROM runs")}
+    found = scan_data_dir(data_dir)
+
+    updated = 0
+    with conn:
+        for timestamp, files in found.items():
+            row = known.get(timestamp)
+            values = {} if row is None else dict(row)
+            changed = row is None
+            config = None
+
+            for kind in RUN_FILES:
+                path, mtime_ns = files.get(kind, (None, None))
+                if row is not None and row[f"{kind}_mtime_ns"] == mtime_ns and row[f"{kind}_path"] == path:
+                    continue
+                changed = True
+                values[f"{kind}_path"] = path
+                values[f"{kind}_mtime_ns"] = mtime_ns
+
+                if kind == 'text':
+                    data = parse_run_text(path) if path else {}
+                    mop = data.get('mop')
+                    values.update(run_date=data.get('run_date'), start_time=data.get('start_time'),
+                                  finish_time=data.get('finish_time'), mop=mop,
+                                  mop_num=MOP_NUMBERS.get(mop), of_fd00=data.get('of_fd00'),
+                                  of_fd02=data.get('of_fd02'))
+                    conn.execute("DELETE FROM run_config WHERE timestamp = ?", (timestamp,))
+                    config = data.get('config', {})
+                elif kind in ('graph', 'table'):
+                    values[f"{kind}_pages"] = get_pdf_page_count(Path(path)) if path else None
+
+            if not changed:
+                continue
+            values['timestamp'] = timestamp
+            columns = ", ".join(values)
+            # An upsert, not INSERT OR REPLACE: the delete of a REPLACE would cascade to run_config
+            conn.execute(f"INSERT INTO runs ({columns}) VALUES ({', '.join('?' * len(values))}) "
+                         f"ON CONFLICT(timestamp) DO UPDATE SET "
+                         + ", ".join(f"{c} = excluded.{c}" for c in values if c != 'timestamp'),
+                         list(values.values()))
+            if config:
+                conn.executemany("INSERT OR REPLACE INTO run_config VALUES (?, ?, ?)",
+                                 [(timestamp, name, value) for name, value in config.items()])
+            updated += 1
+
+        removed = [ts for ts in known if ts not in found]
+        conn.executemany("DELETE FROM runs WHERE timestamp = ?", [(ts,) for ts in removed])
+    return updated, len(removed)
+
+
+def parse_since(text, today=None):
+    """
+    Start of a period as a 14-digit timestamp prefix bound:
+    '2025', '2025-07', '2025-07-15', '20250715' or a month name ('July' = the
+    most recent July, this year or last).
+    """
+    today = today or date.today()
+    word = text.strip().lower()
+    for i, month in enumerate(MONTHS, 1):
+        if len(word) >= 3 and month.startswith(word):
+            year = today.year if i <= today.month else today.year - 1
+            return f"{year:04d}{i:02d}01000000"
+    digits = re.sub(r"\D", "", text)
+    if len(digits) not in (4, 6, 8, 10, 12, 14):
+        raise ValueError(f"Unrecognised date: {text}")
+    return digits.ljust(14, "0")
+
+
+def parse_until(text, today=None):
+    """End of a period (inclusive), same formats as parse_since."""
+    start = parse_since(text, today)
+    digits = re.sub(r"\D", "", text)
+    if digits:
+        return digits.ljust(14, "9")
+    # A month name: the whole month
+    return start[:6] + "99999999"
+
+
+def query_runs(conn, mop=None, ofs=(), since=None, until=None, conf=()):
+    """Runs matching every given filter, oldest first."""
+    where, params = [], []
+    if mop is not None:
+        if str(mop).isdigit():
+            where.append("mop_num = ?")
+            params.append(int(mop))
+        else:
+            where.append("mop LIKE ?")
+            params.append(f"%{mop}%")
+    for dag, of in ofs:
+        if dag not in ("fd00", "fd02"):
+            raise ValueError(f"Unknown DAG prefix: {dag}")
+        where.append(f"of_{dag} LIKE ?")
+        params.append(f"%{of}%")
+    if since:
+        where.append("timestamp >= ?")
+        params.append(parse_since(since))
+    if until:
+        where.append("timestamp <= ?")
+        params.append(parse_until(until))
+    for name, value in conf:
+        where.append("EXISTS (SELECT 1 FROM run_config c WHERE c.timestamp = runs.timestamp "
+                     "AND c.name = ? AND c.value = ?)")
+        params.extend((name, value))
+    sql = "SELECT * FROM runs" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY timestamp"
+    return conn.execute(sql, params).fetchall()
+
+
+def _pair(text):
+    if "=" not in text:
+        raise argparse.ArgumentTypeError(f"Expected NAME=VALUE, got {text}")
+    name, value = text.split("=", 1)
+    return name.strip(), value.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog of simulation runs in ~/data")
+    parser.add_argument("--db", type=Path, default=CATALOG_DB, help=f"Default: {CATALOG_DB}")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help=f"Default: {DATA_DIR}")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_update = sub.add_parser("update", help="Index new and changed runs")
+    p_update.add_argument("--rebuild", action="store_true", help="Re-read every run")
+
+    p_list = sub.add_parser("list", help="List runs matching all filters")
+    p_list.add_argument("--mop", help="MOP number (e.g. 2) or name part (e.g. NON_STORING)")
+    p_list.add_argument("--of", type=_pair, action="append", default=[], metavar="DAG=OF",
+                        help="e.g. fd02=MRHOF (substring match)")
+    p_list.add_argument("--since", help="e.g. July, 2025-07, 20250715")
+    p_list.add_argument("--until", help="Same formats as --since, inclusive")
+    p_list.add_argument("--conf", type=_pair, action="append", default=[], metavar="NAME=VALUE",
+                        help="e.g. RPL_CONF_DIO_INTERVAL_MIN=12")
+    p_list.add_argument("--csv", action="store_true", help="Comma separated output")
+
+    p_show = sub.add_parser("show", help="Everything indexed for one run")
+    p_show.add_argument("timestamp")
+
+    for p in (p_list, p_show):
+        p.add_argument("--no-update", action="store_true", help="Query without refreshing the catalog")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.command == "update":
+        updated, removed = update_catalog(conn, args.data_dir, args.rebuild)
+        total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        print(f"{updated} runs updated, {removed} removed, {total} in {args.db}")
+        return
+
+    if not args.no_update:
+        update_catalog(conn, args.data_dir)
+
+    if args.command == "list":
+        try:
+            rows = query_runs(conn, args.mop, args.of, args.since, args.until, args.conf)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if args.csv:
+            print(",".join(LIST_COLUMNS))
+            for row in rows:
+                print(",".join('' if row[c] is None else f'"{row[c]}"' if "," in str(row[c]) else str(row[c])
+                               for c in LIST_COLUMNS))
+        else:
+            for row in rows:
+                print(f"{row['timestamp']}  {row['run_date'] or '':8s} {row['start_time'] or '':8s} "
+                      f"{row['finish_time'] or '':5s}  {row['mop'] or '':30s} "
+                      f"fd00: {row['of_fd00'] or '-':12s} fd02: {row['of_fd02'] or '-':12s} "
+                      f"pages: {row['graph_pages'] or 0}/{row['table_pages'] or 0}")
+            print(f"{len(rows)} runs")
+
+    elif args.command == "show":
+        row = conn.execute("SELECT * FROM runs WHERE timestamp = ?", (args.timestamp,)).fetchone()
+        if row is None:
+            print(f"No run {args.timestamp} in the catalog")
+            sys.exit(1)
+        for key in row.keys():
+            print(f"{key:16s} {row[key]}")
+        for name, value in conn.execute("SELECT name, value FROM run_config WHERE timestamp = ? ORDER BY name",
+                                        (args.timestamp,)):
+            print(f"{name:32s} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,29 +2,60 @@
 import sys
 import os
 import re
+import time
+import glob
+import json
+import fcntl
+import argparse
 import subprocess
+from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from PyPDF2 import PdfReader
 
+from rpl_page_compiler import compile_units, PageCompileError
+from summary_pdf import render_summary
+from rpl_latex_format import DUMP_MARKER
+
 # --- Configuration ---
 DATA_DIR = Path.home() / "data"
 SUMMARY_TEX_FILE = DATA_DIR / "SimSummary.tex"
+# One fragment per run (entry_<timestamp>.tex); SimSummary.tex \input's them in order.
+# entry_<timestamp>.json keeps the parsed run for the Python backend.
+FRAGMENT_DIR = DATA_DIR / "SimSummary.d"
+ENTRY_MARKER = "% --- Entry for simulation "
+
+# --- Update Queue ---
+# Runs finishing together each add their fragment under SUMMARY_LOCK_FILE and
+# leave a token in QUEUE_DIR; whoever holds COMPILE_LOCK_FILE compiles once
+# for every token present after the burst has settled.
+SUMMARY_LOCK_FILE = DATA_DIR / "SimSummary.lock"
+COMPILE_LOCK_FILE = DATA_DIR / "SimSummary.compile.lock"
+QUEUE_DIR = DATA_DIR / "SimSummary.queue"
+COMPILE_DEBOUNCE_S = 5.0    # Compile once no run was queued for this long...
+COMPILE_MAX_WAIT_S = 60.0   # ...but never wait longer than this
+
+# --- Batch Mode ---
+BATCH_WORKERS = os.cpu_count() or 1
 
 # --- LaTeX Preamble (Cleaned up) ---
+# The part before DUMP_MARKER is precompiled into a format (rpl_latex_format.py);
+# fontspec needs Lua and hyperref has to come last, so they are loaded per run
 LATEX_PREAMBLE = r"""
 \documentclass[a4paper, landscape]{article}
 \usepackage[margin=1.5cm, top=2cm, bottom=2cm]{geometry}
-\usepackage{fontspec}
-\setmainfont{Latin Modern Roman}
-\setmonofont{DejaVu Sans Mono}
 
 \usepackage{graphicx}
 \usepackage{xcolor}
 \usepackage{listings}
-\usepackage{hyperref}
 \usepackage{tabularx}
-
 \usepackage{draftwatermark}
+""" + DUMP_MARKER + r"""
+\usepackage{fontspec}
+\setmainfont{Latin Modern Roman}
+\setmonofont{DejaVu Sans Mono}
+\usepackage{hyperref}
+
 \SetWatermarkLightness{ 0.9 }
 \SetWatermarkText{SimSummary\\Updated: \today}
 \SetWatermarkScale{ 0.3 }
@@ -143,27 +174,184 @@ def generate_latex_entry(data, timestamp):
 """
     return latex_entry
 
-# ... (update_summary_file, compile_latex, and main functions are unchanged) ...
-def update_summary_file(latex_entry):
-    header = LATEX_PREAMBLE
-    footer = "\\end{document}\n"
-    body = ""
-    if SUMMARY_TEX_FILE.exists():
-        with open(SUMMARY_TEX_FILE, 'r', encoding='utf-8') as f:
-            content = f.read()
-            preamble_match = re.match(r"(.*\\begin\{document\})", content, re.DOTALL)
-            if preamble_match:
-                header = preamble_match.group(1) + "\n"
-                body_content = re.split(r"\\begin\{document\}", content, 1)[1]
-                body = body_content.rsplit("\\end{document}", 1)[0]
-            else:
-                print("Warning: Could not find document structure. Starting fresh body.")
-    body += latex_entry
-    with open(SUMMARY_TEX_FILE, 'w', encoding='utf-8') as f:
-        f.write(header + body + footer)
-    print(f"Updated summary file at {SUMMARY_TEX_FILE}")
+def _write_atomic(path, text):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def list_fragments():
+    """Fragment files in document order (the timestamps sort chronologically)."""
+    return sorted(FRAGMENT_DIR.glob("entry_*.tex"))
+
+def fragment_path(timestamp):
+    if timestamp == "unknown":
+        timestamp = f"unknown_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    return FRAGMENT_DIR / f"entry_{timestamp}.tex"
+
+def migrate_summary_file():
+    """
+    One-off split of a SimSummary.tex that still holds its entries inline into
+    fragment files, so no earlier run is lost.
+    """
+    if list_fragments() or not SUMMARY_TEX_FILE.exists():
+        return
+    with open(SUMMARY_TEX_FILE, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if "\\begin{document}" not in content:
+        return
+    body = content.split("\\begin{document}", 1)[1].rsplit("\\end{document}", 1)[0]
+    entries = [e for e in re.split(r"(?m)^(?=" + re.escape(ENTRY_MARKER) + ")", body)
+               if e.startswith(ENTRY_MARKER)]
+    for i, entry in enumerate(entries):
+        timestamp = entry[len(ENTRY_MARKER):].split()[0]
+        path = FRAGMENT_DIR / f"entry_{timestamp}.tex"
+        if path.exists():
+            path = FRAGMENT_DIR / f"entry_{timestamp}_{i}.tex"
+        # Same shape as generate_latex_entry() output
+        _write_atomic(path, "\n" + entry.strip("\n") + "\n\n")
+    if entries:
+        print(f"Moved {len(entries)} existing entries to {FRAGMENT_DIR}")
+
+def write_master_file():
+    """SimSummary.tex: the preamble plus one \\input per fragment."""
+    inputs = "".join(f"\\input{{{path}}}\n" for path in list_fragments())
+    _write_atomic(SUMMARY_TEX_FILE, LATEX_PREAMBLE + inputs + "\\end{document}\n")
+
+def _lock(path, blocking=True):
+    """Opens and flocks path; keep the returned file open to hold the lock (None if busy)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = open(path, 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
+
+def add_summary_entries(entries):
+    """
+    Writes (timestamp, latex_entry, data) fragments and the master file once;
+    returns the fragment paths.
+    """
+    lock = _lock(SUMMARY_LOCK_FILE)
+    try:
+        FRAGMENT_DIR.mkdir(parents=True, exist_ok=True)
+        migrate_summary_file()
+        paths = []
+        for timestamp, latex_entry, data in entries:
+            path = fragment_path(timestamp)
+            _write_atomic(path, latex_entry)
+            if data is not None:
+                _write_atomic(path.with_suffix(".json"), json.dumps(data))
+            paths.append(path)
+        write_master_file()
+    finally:
+        lock.close()
+    return paths
+
+def update_summary_file(latex_entry, timestamp, data=None):
+    path, = add_summary_entries([(timestamp, latex_entry, data)])
+    print(f"Added {path.name}, updated summary file at {SUMMARY_TEX_FILE}")
+
+def pending_compiles():
+    return sorted(QUEUE_DIR.glob("*.pending"))
+
+def enqueue_compile(timestamp):
+    """Leaves a compile token for this run; returns the queue depth."""
+    QUEUE_DIR.mkdir(parents=True, exist_ok=True)
+    (QUEUE_DIR / f"{timestamp}_{os.getpid()}.pending").touch()
+    return len(pending_compiles())
+
+def run_compile_queue(compile_func, debounce=COMPILE_DEBOUNCE_S, max_wait=COMPILE_MAX_WAIT_S):
+    """
+    Compiles until no token is left, once per burst of queued runs.
+    Returns immediately if another process holds the compile lock: it re-checks
+    the queue after every batch (and after releasing the lock), so the tokens
+    left here are picked up.
+    """
+    while pending_compiles():
+        lock = _lock(COMPILE_LOCK_FILE, blocking=False)
+        if lock is None:
+            print(f"A compile is already running; it will include this run "
+                  f"(queue depth {len(pending_compiles())})")
+            return
+        try:
+            # Debounce: wait until the queue stops growing
+            waited = 0.0
+            depth = len(pending_compiles())
+            while waited < max_wait:
+                pause = min(debounce, max_wait - waited)
+                if pause <= 0:
+                    break
+                time.sleep(pause)
+                waited += pause
+                new_depth = len(pending_compiles())
+                if new_depth == depth:
+                    break
+                depth = new_depth
+
+            batch = pending_compiles()
+            start = time.time()
+            compile_func()
+            for token in batch:
+                token.unlink(missing_ok=True)
+            print(f"Compiled a batch of {len(batch)} run(s) in {time.time() - start:.1f}s "
+                  f"(waited {waited:.0f}s for more runs, {len(pending_compiles())} still queued)")
+        finally:
+            lock.close()
+
+def compile_latex_entries():
+    """
+    Incremental build (--per-entry): the title block and every fragment are
+    compiled as separate units, cached by their source (rpl_page_compiler.py),
+    and merged. Adding a run compiles that run's entry only, but every entry
+    starts a new page and restarts the page numbers.
+    """
+    preamble, title_block = LATEX_PREAMBLE.split("\\begin{document}", 1)
+    # Settings of the title block that the entries rely on
+    entry_setup = "\n".join(line for line in title_block.splitlines() if line.startswith("\\setlength"))
+
+    units = [title_block]
+    for path in list_fragments():
+        with open(path, 'r', encoding='utf-8') as f:
+            units.append(entry_setup + "\n" + f.read())
+
+    pdf_path = SUMMARY_TEX_FILE.with_suffix('.pdf')
+    print(f"Compiling {len(units) - 1} entries of {SUMMARY_TEX_FILE} with lualatex...")
+    try:
+        compile_units(preamble, units, pdf_path, engine="lualatex")
+        print("Compilation successful!")
+        print(f"Output saved to {pdf_path}")
+    except PageCompileError as e:
+        print(f"\n--- LaTeX Compilation Failed ---\n{e}")
+
+def fragment_runs():
+    """(timestamp, data, graph_pdf_path) of every fragment, in document order."""
+    runs = []
+    for path in list_fragments():
+        timestamp = path.stem.split("_")[1]
+        json_path = path.with_suffix(".json")
+        text_file = DATA_DIR / f"text_{timestamp}.txt"
+        if json_path.is_file():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        elif text_file.is_file():
+            # Entries written before the .json files existed
+            data = parse_summary_file(text_file)
+        else:
+            data = {'mop': 'N/A', 'ofs': 'N/A', 'start_time': 'N/A', 'finish_time': 'N/A', 'run_date': 'N/A'}
+        runs.append((timestamp, data, DATA_DIR / f"graph_{timestamp}.pdf"))
+    return runs
+
+def compile_python():
+    """Renders SimSummary.pdf without LaTeX (summary_pdf.py)."""
+    pdf_path = SUMMARY_TEX_FILE.with_suffix('.pdf')
+    render_summary(fragment_runs(), pdf_path)
+    print(f"Output saved to {pdf_path}")
 
 def compile_latex():
+    """Single latexmk run over the whole master document (entries flow across pages)."""
     print(f"Compiling {SUMMARY_TEX_FILE} with lualatex...")
     try:
         latexmk_command = ['latexmk', '-lualatex', '-interaction=nonstopmode', f'-output-directory={DATA_DIR}', str(SUMMARY_TEX_FILE)]
@@ -174,23 +362,101 @@ def compile_latex():
     except subprocess.CalledProcessError as e:
         print(f"\n--- LaTeX Compilation Failed ---\n{e.stdout[-1500:]}")
 
+def run_timestamp(text_file):
+    match = re.search(r"text_(\d+)\.txt", text_file.name)
+    return match.group(1) if match else "unknown"
+
+def build_entry(text_file):
+    """(timestamp, latex_entry, data) of one run; the unit of work of batch mode."""
+    timestamp = run_timestamp(text_file)
+    data = parse_summary_file(text_file)
+    return timestamp, generate_latex_entry(data, timestamp), data
+
+def collect_text_files(specs):
+    """Run files named by files, directories (their text_*.txt) or quoted glob patterns."""
+    files = []
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            files.extend(sorted(path.glob("text_*.txt")))
+        elif glob.has_magic(spec):
+            files.extend(sorted(Path(p) for p in glob.glob(spec) if Path(p).is_file()))
+        else:
+            files.append(path)
+    return files
+
+def summarize_batch(text_files, workers=BATCH_WORKERS, compile_func=None):
+    """
+    Rebuilds the entries of many runs: parse and generate in a process pool,
+    write every fragment under one lock, then compile once.
+    """
+    stages = []
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        entries = list(pool.map(build_entry, text_files, chunksize=16))
+    stages.append(("parse + generate", time.time() - start))
+
+    start = time.time()
+    add_summary_entries(entries)
+    stages.append(("write fragments", time.time() - start))
+    print(f"Added {len(entries)} entries, updated summary file at {SUMMARY_TEX_FILE}")
+
+    start = time.time()
+    lock = _lock(COMPILE_LOCK_FILE)   # Wait for a queued compile to finish instead of racing it
+    try:
+        (compile_func or compile_latex)()
+    finally:
+        lock.close()
+    stages.append(("compile", time.time() - start))
+
+    print(f"\n--- Timings ({len(entries)} runs, {workers} workers) ---")
+    for name, seconds in stages:
+        print(f"{name:18s} {seconds:8.2f}s")
+    print(f"{'total':18s} {sum(s for _, s in stages):8.2f}s")
+
 def main():
-    if len(sys.argv) != 2:
-        print(f"Usage: {sys.argv[0]} <path_to_text_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Add runs to the simulation summary and compile it")
+    parser.add_argument("text_files", nargs="+",
+                        help="text_<timestamp>.txt written by process_rpl_log.sh; a directory or a quoted "
+                             "glob ('~/data/text_2025*.txt') rebuilds all its runs with a single compile")
+    parser.add_argument("--per-entry", action="store_true",
+                        help="Compile entry by entry, cached, instead of one latexmk run (faster for "
+                             "many runs, but every entry starts a new page and page numbers restart)")
+    parser.add_argument("--debounce", type=float, default=COMPILE_DEBOUNCE_S,
+                        help=f"Seconds without new runs before compiling (default: {COMPILE_DEBOUNCE_S}, 0 = now)")
+    parser.add_argument("--backend", choices=("latex", "python"), default="latex",
+                        help="latex: lualatex (default); python: draw the PDF directly, no LaTeX needed")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help=f"Parser processes in batch mode (default: {BATCH_WORKERS})")
+    args = parser.parse_args()
 
-    input_file = Path(sys.argv[1])
-    if not input_file.is_file():
-        print(f"Error: Input file not found: {input_file}")
+    text_files = collect_text_files(args.text_files)
+    for path in text_files:
+        if not path.is_file():
+            print(f"Error: Input file not found: {path}")
+            sys.exit(1)
+    if not text_files:
+        print(f"Error: No text_*.txt files in {' '.join(args.text_files)}")
         sys.exit(1)
 
-    match = re.search(r"text_(\d+)\.txt", input_file.name)
-    timestamp = match.group(1) if match else "unknown"
+    if args.backend == "python":
+        compile_func = compile_python
+    else:
+        compile_func = compile_latex_entries if args.per_entry else compile_latex
+
+    if len(args.text_files) > 1 or len(text_files) > 1 or Path(args.text_files[0]).is_dir():
+        summarize_batch(text_files, args.workers, compile_func)
+        return
+
+    input_file = text_files[0]
+    timestamp = run_timestamp(input_file)
 
     parsed_data = parse_summary_file(input_file)
     new_entry = generate_latex_entry(parsed_data, timestamp)
-    update_summary_file(new_entry)
-    compile_latex()
+    update_summary_file(new_entry, timestamp, parsed_data)
+    depth = enqueue_compile(timestamp)
+    print(f"Queued for compilation (queue depth {depth})")
+    run_compile_queue(compile_func, args.debounce)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+LaTeX-free renderer of SimSummary.pdf (summarize_run.py --backend python).
+
+Draws the same per-run table as the LaTeX template of summarize_run.py with
+PDF operators written here, using the standard Times and Courier fonts (no
+font embedding). The graph_<timestamp>.pdf pages are not rasterised: each
+page is wrapped once as a form XObject and placed by reference, so the
+graphs stay vector and a page used twice is stored once.
+
+Layout follows the LaTeX output (A4 landscape, same margins, column widths,
+4cm graph height, watermark and page numbers); entries are never split
+across pages, like a tabularx.
+
+Written against PyPDF2 3.0.x; objects shared between pages are added
+through _add_object() below.
+"""
+import os
+import time
+import math
+from datetime import date
+
+from PyPDF2 import PdfReader, PdfWriter, PageObject
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject,
+                            NameObject)
+
+# --- Page Geometry (points) ---
+CM = 72 / 2.54
+PAGE_W, PAGE_H = 29.7 * CM, 21.0 * CM           # A4 landscape
+MARGIN_X, MARGIN_Y = 1.5 * CM, 2.0 * CM
+TEXT_W = PAGE_W - 2 * MARGIN_X
+TAB_SEP = 6.0                                   # \tabcolsep
+COLUMNS_CM = (2.5, 3.5, 5.0)                    # p{} columns; the X column takes the rest
+ROW_H = 15.0                                    # baselineskip + \extrarowheight
+FONT_SIZE = 10.0
+GRAPH_H = 4 * CM
+ENTRY_GAP = 1 * CM                              # \vspace{1cm}
+
+FONTS = {
+    '/F1': 'Times-Roman',
+    '/F2': 'Times-Bold',
+    '/F3': 'Times-Italic',
+    '/F4': 'Courier',
+}
+# Average advance of the proportional fonts, as a fraction of the size (Courier is exactly 0.6)
+TIMES_ADVANCE = 0.5
+
+
+def _add_object(writer, obj):
+    """
+    Indirect reference to obj in writer, so pages can share it. Uses the
+    public add_object where the library has one; PyPDF2 3.0.x (the last
+    PyPDF2 release) only provides the private _add_object.
+    """
+    add = getattr(writer, 'add_object', None) or writer._add_object
+    return add(obj)
+
+
+def _pdf_string(text):
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return "(" + text + ")"
+
+
+def _text_width(text, font, size):
+    return len(text) * size * (0.6 if font == '/F4' else TIMES_ADVANCE)
+
+
+class _Canvas:
+    """Content stream of one page."""
+    def __init__(self):
+        self.ops = []
+        self.xobjects = {}
+
+    def text(self, x, y, text, font='/F1', size=FONT_SIZE):
+        self.ops.append(f"BT {font} {size:.2f} Tf {x:.2f} {y:.2f} Td {_pdf_string(text)} Tj ET")
+
+    def centered(self, cx, y, text, font='/F1', size=FONT_SIZE):
+        self.text(cx - _text_width(text, font, size) / 2, y, text, font, size)
+
+    def line(self, x1, y1, x2, y2):
+        self.ops.append(f"{x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S")
+
+    def form(self, name, ref, x, y, scale):
+        self.xobjects[name] = ref
+        self.ops.append(f"q {scale:.5f} 0 0 {scale:.5f} {x:.2f} {y:.2f} cm {name} Do Q")
+
+    def watermark(self, lines, size, gray=0.9, angle=45):
+        c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        self.ops.append(f"q {gray} g")
+        for i, text in enumerate(lines):
+            # Lines stacked along the rotated y axis, each centred on the page centre
+            dy = (len(lines) / 2 - i - 0.75) * size * 1.2
+            dx = -_text_width(text, '/F1', size) / 2
+            x = PAGE_W / 2 + dx * c - dy * s
+            y = PAGE_H / 2 + dx * s + dy * c
+            self.ops.append(f"BT /F1 {size:.2f} Tf {c:.4f} {s:.4f} {-s:.4f} {c:.4f} {x:.2f} {y:.2f} Tm "
+                            f"{_pdf_string(text)} Tj ET")
+        self.ops.append("Q")
+
+
+class SummaryRenderer:
+    """Builds the summary document page by page; see render_summary()."""
+    def __init__(self):
+        self.writer = PdfWriter()
+        self.fonts = DictionaryObject()
+        for name, base in FONTS.items():
+            font = DictionaryObject({NameObject('/Type'): NameObject('/Font'),
+                                     NameObject('/Subtype'): NameObject('/Type1'),
+                                     NameObject('/BaseFont'): NameObject('/' + base),
+                                     NameObject('/Encoding'): NameObject('/WinAnsiEncoding')})
+            self.fonts[NameObject(name)] = _add_object(self.writer, font)
+        self._readers = {}
+        self._forms = {}
+        self.pages = []
+        self.canvas = None
+        self.y = 0.0
+
+    # --- Graph pages as form XObjects ---
+    def graph_form(self, pdf_path, page_number):
+        """(reference, width, height) of one page of a graph PDF, None if unavailable."""
+        key = (str(pdf_path), page_number)
+        if key in self._forms:
+            return self._forms[key]
+        form = None
+        if not pdf_path.is_file():
+            self._forms[key] = None   # Run without a graph
+            return None
+        try:
+            reader = self._readers.get(key[0])
+            if reader is None:
+                reader = self._readers[key[0]] = PdfReader(str(pdf_path))
+            if page_number <= len(reader.pages):
+                page = reader.pages[page_number - 1]
+                box = [float(v) for v in page.mediabox]
+                contents = page.get_contents()
+                stream = DecodedStreamObject()
+                stream.set_data(contents.get_data() if contents is not None else b"")
+                stream[NameObject('/Type')] = NameObject('/XObject')
+                stream[NameObject('/Subtype')] = NameObject('/Form')
+                stream[NameObject('/BBox')] = ArrayObject(FloatObject(v) for v in box)
+                # Place the box origin at (0, 0)
+                stream[NameObject('/Matrix')] = ArrayObject(FloatObject(v) for v in
+                                                            (1, 0, 0, 1, -box[0], -box[1]))
+                if '/Resources' in page:
+                    stream[NameObject('/Resources')] = page['/Resources'].get_object().clone(self.writer)
+                form = (_add_object(self.writer, stream), box[2] - box[0], box[3] - box[1])
+        except Exception as e:
+            print(f"Warning: Could not embed page {page_number} of {pdf_path}: {e}")
+        self._forms[key] = form
+        return form
+
+    # --- Pages ---
+    def new_page(self):
+        self.canvas = _Canvas()
+        self.canvas.watermark(["SimSummary", f"Updated: {_today()}"], size=0.3 * 5 * CM)
+        self.canvas.ops.append("0 g 0.4 w")
+        self.pages.append(self.canvas)
+        self.y = PAGE_H - MARGIN_Y
+
+    def title_block(self):
+        cx = PAGE_W / 2
+        self.y -= 2 * 17.28
+        self.canvas.centered(cx, self.y, "Simulation Run Summary", size=17.28)
+        self.y -= 2 * 12
+        self.canvas.centered(cx, self.y, "Contiki-NG RPL Project", size=12)
+        self.y -= 1.5 * 12
+        self.canvas.centered(cx, self.y, _today(), size=12)
+        self.y -= 2.5 * 12
+
+    def entry_height(self):
+        return 5 * ROW_H + FONT_SIZE + GRAPH_H + 2 * TAB_SEP
+
+    def entry(self, timestamp, data, graph_pdf_path):
+        """One run table, on a new page if it does not fit on this one."""
+        if self.y - self.entry_height() < MARGIN_Y:
+            self.new_page()
+        c = self.canvas
+        widths = [w * CM + 2 * TAB_SEP for w in COLUMNS_CM]
+        xs = [MARGIN_X]
+        for w in widths:
+            xs.append(xs[-1] + w)
+        xs.append(MARGIN_X + TEXT_W)
+        left, right = xs[0], xs[-1]
+        top = self.y
+
+        def cell(col, y, text, font='/F1', width=None):
+            size = FONT_SIZE
+            width = width or (xs[col + 1] - xs[col] - 2 * TAB_SEP)
+            if _text_width(text, font, size) > width:
+                size = max(5.0, width / max(1, len(text)) / (0.6 if font == '/F4' else TIMES_ADVANCE))
+            c.text(xs[col] + TAB_SEP, y, text, font, size)
+
+        # Row 1: headers and values, four columns
+        y = top
+        c.line(left, y, right, y)
+        base = y - ROW_H + 4
+        for col, text in enumerate(("Start Time", "Sim Run ID", "Run Date", "Notes")):
+            cell(col, base, text, '/F2')
+        base -= ROW_H
+        for col, text in enumerate((data['start_time'], timestamp, data['run_date'])):
+            cell(col, base, text, '/F4')
+        y -= 2 * ROW_H
+        for x in xs:
+            c.line(x, top, x, y)
+        c.line(left, y, right, y)
+
+        # Row 2: finish time, MOP & OFs over columns 2-3 (two lines), notes
+        row2 = y
+        merged = xs[3] - xs[1] - 2 * TAB_SEP
+        base = y - ROW_H + 4
+        cell(0, base, "Finish Time", '/F2')
+        cell(1, base, "MOP & OFs", '/F2', merged)
+        y -= ROW_H
+        c.line(left, y, right, y)
+        base = y - ROW_H + 4
+        cell(0, base, data['finish_time'], '/F4')
+        cell(1, base, data['mop'], '/F4', merged)
+        cell(1, base - ROW_H + 3, data['ofs'], '/F4', merged)
+        y -= 2 * ROW_H
+        for x in (xs[0], xs[1], xs[3], xs[4]):
+            c.line(x, row2, x, y)
+        c.line(left, y, right, y)
+
+        # Graphics row: the two DODAG pages side by side, centred in half-width boxes
+        graphs_top = y
+        inner = TEXT_W - 2 * TAB_SEP
+        box_w = 0.49 * inner
+        base = y - ROW_H + 4
+        for i in (0, 1):
+            cx = left + TAB_SEP + (box_w / 2 if i == 0 else inner - box_w / 2)
+            c.centered(cx, base, f"DODAG {i + 1} Graph", '/F2')
+            form = self.graph_form(graph_pdf_path, i + 1) if graph_pdf_path else None
+            if form is not None:
+                ref, w, h = form
+                scale = min(0.48 * box_w / w, GRAPH_H / h)
+                c.form(f"/G{len(c.xobjects)}", ref, cx - w * scale / 2, base - 4 - h * scale, scale)
+            elif i == 0:
+                c.centered(cx, base - ROW_H, "(Graph 1 not found)", '/F3')
+        bottom = graphs_top - (ROW_H + GRAPH_H + 2 * TAB_SEP)
+        c.line(left, graphs_top, left, bottom)
+        c.line(right, graphs_top, right, bottom)
+        c.line(left, bottom, right, bottom)
+
+        self.y = bottom - ENTRY_GAP
+
+    def write(self, output_pdf):
+        for number, canvas in enumerate(self.pages, 1):
+            canvas.centered(PAGE_W / 2, MARGIN_Y - 30, str(number))
+            page = PageObject.create_blank_page(width=PAGE_W, height=PAGE_H)
+            stream = DecodedStreamObject()
+            stream.set_data("\n".join(canvas.ops).encode('latin-1', errors='replace'))
+            resources = DictionaryObject({NameObject('/Font'): self.fonts})
+            if canvas.xobjects:
+                resources[NameObject('/XObject')] = DictionaryObject(
+                    {NameObject(name): ref for name, ref in canvas.xobjects.items()})
+            page[NameObject('/Resources')] = resources
+            page[NameObject('/Contents')] = _add_object(self.writer, stream)
+            self.writer.add_page(page)
+
+        tmp_pdf = output_pdf.with_suffix(".tmp.pdf")
+        with open(tmp_pdf, 'wb') as f:
+            self.writer.write(f)
+        os.replace(tmp_pdf, output_pdf)
+
+
+def _today():
+    today = date.today()
+    return f"{today.strftime('%B')} {today.day}, {today.year}"   # \today
+
+
+def render_summary(runs, output_pdf):
+    """
+    Writes the summary PDF for runs: (timestamp, data, graph_pdf_path) in
+    document order, data as returned by summarize_run.parse_summary_file().
+    """
+    start = time.time()
+    renderer = SummaryRenderer()
+    renderer.new_page()
+    renderer.title_block()
+    for timestamp, data, graph_pdf_path in runs:
+        renderer.entry(timestamp, data, graph_pdf_path)
+    renderer.write(output_pdf)
+    print(f"Rendered {output_pdf}: {len(runs)} entries on {len(renderer.pages)} pages "
+          f"in {time.time() - start:.2f}s")
+    return output_pdf
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 import sys
-import re
 import argparse
 from pathlib import Path
+from operator import itemgetter
+
+from rpl_log_tokenizer import CoojaLogScanner, DIO, DAG
+from visualize_rpl import batch_positions
+from rpl_page_compiler import compile_tex_pages, DEFAULT_WORKERS as PAGE_WORKERS
 
 # --- Configuration ---
 OUTPUT_FILENAME = "DIO_graph.tex"
@@ -17,96 +21,52 @@ MIN_LABEL_DIST_CM = 0.5  # Min distance between timestamps
 # TikZ Colors to cycle through for arrows
 COLORS = ["red", "blue", "orange", "teal", "violet", "cyan!70!black", "magenta"]
 
-def parse_time(timestr):
-    """Converts 'HH:MM:SS.ms' to total seconds (float)."""
-    h, m, s = timestr.split(':')
-    return float(h) * 3600 + float(m) * 60 + float(s)
-
-def extract_node_id(ipv6_str):
-    """Extracts node ID from IPv6 string."""
-    clean_ip = ipv6_str.replace("from:", "").strip()
-    parts = clean_ip.split(':')
-    try:
-        return int(parts[-1], 16)
-    except ValueError:
-        return 0
+class DioGraphCollector:
+    """Collects DIOs and preferred-parent switches for one Instance/DAG."""
+    def __init__(self):
+        self.nodes = set()
+        self.dio_events = []
+        self.parent_events = []
+
+    def subscribe(self, scanner):
+        scanner.subscribe(DIO, self.on_dio)
+        scanner.subscribe(DAG, self.on_dag)
+
+    # --- DIO Events ---
+    def on_dio(self, dio):
+        if dio.instance == TARGET_INSTANCE:
+            self.nodes.add(dio.tx_node)
+            self.dio_events.append({
+                'time': dio.rel_time,
+                'timestamp_str': dio.timestamp_str,
+                'rx_node': dio.node,
+                'tx_node': dio.tx_node
+            })
+
+    # --- Parent Events ---
+    def on_dag(self, dag):
+        # We strictly ignore entries unless they are marked 'Pref Y'
+        if not dag.preferred:
+            return
+
+        if dag.dag == TARGET_DAG_PREFIX and dag.parent is not None:
+            self.parent_events.append({
+                'time': dag.rel_time,
+                'timestamp_str': dag.timestamp_str,
+                'node': dag.node,
+                'parent': dag.parent
+            })
+
+    def result(self, tokenizer):
+        return sorted(self.nodes | tokenizer.nodes), self.dio_events, self.parent_events
 
 def parse_log_file(filepath):
     """Parses log file for DIOs and Parent changes."""
-    dio_events = []
-    parent_events = []
-    nodes = set()
-
-    # Regex 1: Time and Node
-    re_base = re.compile(r"^(\d{2}:\d{2}:\d{2}\.\d+)\s+Node:(\d+)\s+:(.*)")
-
-    # Regex 2: Incoming DIO
-    re_dio = re.compile(r"Incoming DIO \(id, ver, rank\) = \((\d+),.*\) (from:[\w:]+)")
-
-    # Regex 3: DAG Info
-    re_dag_chk = re.compile(r"RPL: DAG:\s*([0-9a-fA-F]+)")
-
-    start_time_abs = None
-
-    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            base_match = re_base.match(line)
-            if not base_match:
-                continue
-
-            time_str, node_str, message = base_match.groups()
-            current_time = parse_time(time_str)
-            rx_node = int(node_str)
-            nodes.add(rx_node)
-
-            if start_time_abs is None:
-                start_time_abs = current_time
-
-            rel_time = current_time - start_time_abs
-
-            # --- DIO Events ---
-            if "Incoming DIO" in message:
-                dio_match = re_dio.search(message)
-                if dio_match:
-                    instance_id, from_ip = dio_match.groups()
-                    if instance_id == TARGET_INSTANCE:
-                        tx_node = extract_node_id(from_ip)
-                        nodes.add(tx_node)
-                        dio_events.append({
-                            'time': rel_time,
-                            'timestamp_str': time_str,
-                            'rx_node': rx_node,
-                            'tx_node': tx_node
-                        })
-
-            # --- Parent Events ---
-            if "RPL: DAG:" in message:
-
-                # --- FILTER APPLIED HERE ---
-                # We strictly ignore entries unless they are marked 'Pref Y'
-                if "Pref Y" not in message:
-                    continue
-
-                dag_match = re_dag_chk.search(message)
-                if dag_match and dag_match.group(1) == TARGET_DAG_PREFIX:
-                    parts = message.split()
-                    parent_id = 0
-                    try:
-                        if "Parent:" in parts:
-                            p_idx = parts.index("Parent:") + 1
-                            parent_str = parts[p_idx].replace(",", "")
-                            parent_id = int(parent_str, 16) if parent_str.lower() != "none" else 0
-
-                        parent_events.append({
-                            'time': rel_time,
-                            'timestamp_str': time_str,
-                            'node': rx_node,
-                            'parent': parent_id
-                        })
-                    except (ValueError, IndexError):
-                        pass
-
-    return sorted(list(nodes)), dio_events, parent_events
+    scanner = CoojaLogScanner()
+    collector = DioGraphCollector()
+    collector.subscribe(scanner)
+    tokenizer = scanner.scan(filepath)
+    return collector.result(tokenizer)
 
 def generate_tikz_pages(nodes, dio_events, parent_events, output_path):
     """Generates a paginated TikZ file."""
@@ -146,9 +106,10 @@ def generate_tikz_pages(nodes, dio_events, parent_events, output_path):
     content.extend(add_header(0))
     last_label_y = -999
 
-    i = 0
-    while i < len(all_events):
-        evt = all_events[i]
+    def parent_change(evt):
+        return 0 if evt['type'] == 'PARENT' else None
+
+    for evt, _, idx_in_batch in batch_positions(all_events, parent_change, itemgetter('time')):
         t = evt['time']
 
         if t > current_page_end_time:
@@ -177,20 +138,6 @@ def generate_tikz_pages(nodes, dio_events, parent_events, output_path):
             if parent == 0:
                 content.append(fr"\node[cross out, draw=black, thick, inner sep=2pt] at ({child}, {y_pos:.2f}) {{}};")
             else:
-                simul_count = 0
-                idx_in_batch = 0
-
-                # Check simultaneous events
-                j = i
-                while j < len(all_events) and abs(all_events[j]['time'] - t) < 0.001 and all_events[j]['type'] == 'PARENT':
-                    simul_count += 1
-                    j += 1
-
-                k = i
-                while k >= 0 and abs(all_events[k]['time'] - t) < 0.001 and all_events[k]['type'] == 'PARENT':
-                    idx_in_batch += 1
-                    k -= 1
-
                 color = COLORS[(idx_in_batch - 1) % len(COLORS)]
 
                 # --- CURVATURE SETTING ---
@@ -200,8 +147,6 @@ def generate_tikz_pages(nodes, dio_events, parent_events, output_path):
 
                 content.append(fr"\draw[->, thick, {color}, >={latex_arrow_head()}, {bend_cmd}] ({child}, {y_pos:.2f}) to ({parent}, {y_pos:.2f});")
 
-        i += 1
-
     content.append(r"\end{tikzpicture}")
 
     with open(output_path, 'w') as f:
@@ -214,6 +159,10 @@ def latex_arrow_head():
 def main():
     parser = argparse.ArgumentParser(description="Visualize RPL Log (TikZ)")
     parser.add_argument("logfile", type=Path, help="Path to raw Contiki log file")
+    parser.add_argument("--pdf", action="store_true",
+                        help="Also compile the output page by page in parallel (cached per page)")
+    parser.add_argument("--latex-workers", type=int, default=PAGE_WORKERS,
+                        help=f"Concurrent LaTeX runs for --pdf (default: {PAGE_WORKERS})")
     args = parser.parse_args()
 
     if not args.logfile.exists():
@@ -232,5 +181,8 @@ def main():
 
     generate_tikz_pages(nodes, dios, parents, OUTPUT_FILENAME)
 
+    if args.pdf:
+        compile_tex_pages(OUTPUT_FILENAME, workers=args.latex_workers)
+
 if __name__ == "__main__":
     main()
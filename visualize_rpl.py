@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 import sys
-import re
 import argparse
 from pathlib import Path
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+
+from rpl_event_store import load_event_table, KIND_DIO, KIND_DAG, DEFAULT_WORKERS
+from rpl_log_cache import load_cached_event_table
+from rpl_log_index import load_event_table_window, window_range, add_window_args, parse_window_args
+from rpl_log_tokenizer import LogTokenizer, DIO, DAG, open_log, parse_node_list
+from rpl_page_compiler import compile_tex_pages, DEFAULT_WORKERS as PAGE_WORKERS
 
 # --- Configuration ---
 OUTPUT_FILENAME = "Compare_graph.tex"
@@ -26,94 +36,135 @@ GAP_WIDTH = 4           # Node slots between graphs
 # TikZ Colors
 COLORS = ["red", "blue", "orange", "teal", "violet", "cyan!70!black", "magenta"]
 
-def parse_time(timestr):
-    h, m, s = timestr.split(':')
-    return float(h) * 3600 + float(m) * 60 + float(s)
-
-def extract_node_id(ipv6_str):
-    clean_ip = ipv6_str.replace("from:", "").strip()
-    parts = clean_ip.split(':')
-    try:
-        return int(parts[-1], 16)
-    except ValueError:
-        return 0
-
-def parse_log_file(filepath):
-    events_left = []
-    events_right = []
-    nodes = set()
-
-    re_base = re.compile(r"^(\d{2}:\d{2}:\d{2}\.\d+)\s+Node:(\d+)\s+:(.*)")
-    re_dio = re.compile(r"Incoming DIO \(id, ver, rank\) = \((\d+),.*\) (from:[\w:]+)")
-    re_dag_chk = re.compile(r"RPL: DAG:\s*([0-9a-fA-F]+)")
-
-    start_time_abs = None
-
-    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            base_match = re_base.match(line)
-            if not base_match:
+# Rows converted to Python values at a time while rendering
+RENDER_BLOCK = 65536
+
+# Parent changes closer than this are drawn as one simultaneous batch
+SIMULTANEOUS_S = 0.001
+
+def compare_nodes(table):
+    """All reporting nodes plus every DIO sender."""
+    return np.union1d(table.nodes, table.select(kind=KIND_DIO)['peer']).tolist()
+
+def parse_log_file(filepath, use_cache=True, workers=1, t_from=None, t_to=None):
+    if t_from is not None or t_to is not None:
+        table = load_event_table_window(filepath, t_from, t_to)
+    elif use_cache:
+        table = load_cached_event_table(filepath, workers=workers)
+    else:
+        table = load_event_table(filepath, workers)
+    return compare_nodes(table), table
+
+def compare_events(table):
+    """
+    Left/right graph rows in render order.
+    Returns the selected rows sorted by time and a parallel array with the
+    graph side (0 = LEFT, 1 = RIGHT); at equal times left rows come first.
+    """
+    dio = table.mask(kind=KIND_DIO)
+    parent = table.mask(kind=KIND_DAG, preferred=True)
+
+    left = (dio & table.mask(scope=L_INST)) | (parent & table.mask(scope=L_DAG))
+    right = ((dio & table.mask(scope=R_INST)) | (parent & table.mask(scope=R_DAG))) & ~left
+
+    selected = left | right
+    rows = table.rows[selected]
+    graph = np.where(left[selected], 0, 1).astype('u1')
+
+    order = np.lexsort((graph, rows['time']))
+    return rows[order], graph[order]
+
+def table_records(table):
+    """Render records (time, label, kind, node, peer, graph) of an EventTable, in render order."""
+    rows, graphs = compare_events(table)
+    strings = table.strings
+    for block_start in range(0, len(rows), RENDER_BLOCK):
+        block = slice(block_start, block_start + RENDER_BLOCK)
+        labels = [strings[i] for i in rows['label'][block].tolist()]
+        yield from zip(rows['time'][block].tolist(), labels, rows['kind'][block].tolist(),
+                       rows['node'][block].tolist(), rows['peer'][block].tolist(),
+                       graphs[block].tolist())
+
+def _side_records(events):
+    """Left/right render records of tokenizer events, in log order."""
+    for evt in events:
+        if evt.type == DIO:
+            if evt.instance == L_INST:
+                graph = 0
+            elif evt.instance == R_INST:
+                graph = 1
+            else:
                 continue
-
-            time_str, node_str, message = base_match.groups()
-            current_time = parse_time(time_str)
-            rx_node = int(node_str)
-            nodes.add(rx_node)
-
-            if start_time_abs is None:
-                start_time_abs = current_time
-            rel_time = current_time - start_time_abs
-
-            # --- DIO Parsing ---
-            if "Incoming DIO" in message:
-                dio_match = re_dio.search(message)
-                if dio_match:
-                    instance_id, from_ip = dio_match.groups()
-                    tx_node = extract_node_id(from_ip)
-                    nodes.add(tx_node)
-
-                    evt = {
-                        'time': rel_time,
-                        'timestamp_str': time_str,
-                        'rx_node': rx_node,
-                        'tx_node': tx_node,
-                        'type': 'DIO'
-                    }
-                    if instance_id == L_INST:
-                        events_left.append(evt)
-                    elif instance_id == R_INST:
-                        events_right.append(evt)
-
-            # --- Parent Parsing (Pref Y Only) ---
-            if "RPL: DAG:" in message and "Pref Y" in message:
-                dag_match = re_dag_chk.search(message)
-                if dag_match:
-                    dag_prefix = dag_match.group(1)
-                    parts = message.split()
-                    parent_id = 0
-                    try:
-                        if "Parent:" in parts:
-                            p_idx = parts.index("Parent:") + 1
-                            parent_str = parts[p_idx].replace(",", "")
-                            parent_id = int(parent_str, 16) if parent_str.lower() != "none" else 0
-
-                        evt = {
-                            'time': rel_time,
-                            'timestamp_str': time_str,
-                            'node': rx_node,
-                            'parent': parent_id,
-                            'type': 'PARENT'
-                        }
-                        if dag_prefix == L_DAG:
-                            events_left.append(evt)
-                        elif dag_prefix == R_DAG:
-                            events_right.append(evt)
-                    except:
-                        pass
-
-    return sorted(list(nodes)), events_left, events_right
-
-def generate_tikz_pages(nodes, events_left, events_right, output_path):
+            yield (evt.rel_time, evt.timestamp_str, KIND_DIO, evt.node, evt.tx_node, graph)
+        elif evt.preferred and evt.parent is not None:
+            if evt.dag == L_DAG:
+                graph = 0
+            elif evt.dag == R_DAG:
+                graph = 1
+            else:
+                continue
+            yield (evt.rel_time, evt.timestamp_str, KIND_DAG, evt.node, evt.parent, graph)
+
+def stream_records(filepath, t_from=None, t_to=None):
+    """
+    Render records parsed on the fly, without building an event table.
+    The left and right streams are each in log (= time) order, so merging them
+    only needs the records sharing one timestamp: left ones are yielded first,
+    as the stable sort of compare_events() does.
+    With t_from / t_to only that window is read (seeking through the log index).
+    """
+    start = window_range(filepath, t_from, t_to)[0] if t_from is not None else 0
+    tokenizer = LogTokenizer(types=(DIO, DAG), t_from=t_from, t_to=t_to)
+    with open_log(filepath) as f:
+        f.seek(start)
+        for _, group in groupby(_side_records(tokenizer.tokenize(f)), key=itemgetter(0)):
+            group = list(group)
+            if len(group) == 1:
+                yield group[0]
+            else:
+                yield from (r for r in group if r[5] == 0)
+                yield from (r for r in group if r[5] == 1)
+
+def batch_positions(records, key, time=itemgetter(0)):
+    """
+    Grouping stage for simultaneous parent changes, in one linear pass.
+    Yields (record, batch_id, idx_in_batch). key(record) is None for records
+    that never batch; otherwise a record continues the run of preceding
+    records with the same key that are less than SIMULTANEOUS_S older, and
+    idx_in_batch is its 1-based position in that run (0 for unbatched).
+    Records must be in time order.
+    """
+    run = deque()   # times of the current run, oldest first
+    run_key = None
+    batch_id = -1
+    for rec in records:
+        k = key(rec)
+        if k is None:
+            run.clear()
+            run_key = None
+            yield rec, None, 0
+            continue
+        t = time(rec)
+        if k != run_key:
+            run.clear()
+            run_key = k
+        while run and not abs(run[0] - t) < SIMULTANEOUS_S:
+            run.popleft()
+        if not run:
+            batch_id += 1
+        run.append(t)
+        yield rec, batch_id, len(run)
+
+def _parent_change_graph(rec):
+    return rec[5] if rec[2] == KIND_DAG else None
+
+def generate_tikz_pages(nodes, records, output_path):
+    """
+    Renders an iterable of time-ordered render records (see table_records and
+    stream_records). Each page is written to output_path as soon as it is
+    complete, so neither the events nor the document are held in memory.
+    Returns the number of rendered (left, right) events.
+    """
     if not nodes:
         print("No nodes found.")
         return
@@ -138,21 +189,10 @@ def generate_tikz_pages(nodes, events_left, events_right, output_path):
 
     print(f"Layout Info: Total Units={total_units_width}, Scale={x_scale:.2f} cm/unit")
 
-    # --- 2. Merge Data ---
-    all_events = []
-    for e in events_left:
-        e['graph'] = 'LEFT'
-        e['offset'] = 0
-        all_events.append(e)
-    for e in events_right:
-        e['graph'] = 'RIGHT'
-        e['offset'] = right_offset
-        all_events.append(e)
-
-    all_events.sort(key=lambda x: x['time'])
+    offsets = (0, right_offset)
+    counts = [0, 0]
 
     time_per_page = PAGE_HEIGHT_CM / Y_SCALE_CM
-    content = []
 
     # --- Helper: Header ---
     def add_header(current_time_offset):
@@ -190,90 +230,77 @@ def generate_tikz_pages(nodes, events_left, events_right, output_path):
     current_page_start_time = 0.0
     current_page_end_time = time_per_page
 
-    content.extend(add_header(0))
+    content = add_header(0)
     last_label_y = -999
 
     # Sender deduplication tracker (per page/timestamp)
     # Stores tuples: (timestamp_float, tx_node_id, graph_side)
     drawn_senders = set()
 
-    i = 0
-    while i < len(all_events):
-        evt = all_events[i]
-        t = evt['time']
-
-        # Pagination
-        if t > current_page_end_time:
-            content.extend(close_page())
-            current_page_idx += 1
-            current_page_start_time = current_page_end_time
-            current_page_end_time += time_per_page
-            content.extend(add_header(current_page_start_time))
-            last_label_y = -999
-            drawn_senders.clear() # Clear dedupe cache for new page
-
-        y_pos = (t - current_page_start_time) * Y_SCALE_CM
-        x_shift = evt['offset']
-
-        # Timestamp (Left Axis)
-        if abs(y_pos - last_label_y) > MIN_LABEL_DIST_CM:
-            label = evt['timestamp_str']
-            # We put this at x=-1 to ensure it sits left of the grid
-            content.append(fr"\node[anchor=east, font=\tiny, color=gray] at (-0.5, {y_pos:.2f}) {{{label}}};")
-            last_label_y = y_pos
-
-        if evt['type'] == 'DIO':
-            rx = evt['rx_node'] + x_shift
-            tx = evt['tx_node'] + x_shift
-
-            # 1. Draw Receiver (Small Filled)
-            content.append(fr"\fill[green!60!black] ({rx}, {y_pos:.2f}) circle (2pt);")
-
-            # 2. Draw Sender (Large Hollow) - Deduplicated
-            sender_key = (t, evt['tx_node'], evt['graph'])
-            if sender_key not in drawn_senders:
-                content.append(fr"\draw[green!60!black, thick] ({tx}, {y_pos:.2f}) circle (4pt);")
-                drawn_senders.add(sender_key)
-
-        elif evt['type'] == 'PARENT':
-            child = evt['node'] + x_shift
-            parent_raw = evt['parent']
-
-            if parent_raw == 0:
-                content.append(fr"\node[cross out, draw=black, thick, inner sep=2pt] at ({child}, {y_pos:.2f}) {{}};")
-            else:
-                parent = parent_raw + x_shift
-
-                # Simultaneous check
-                simul_count = 0
-                idx_in_batch = 0
-
-                j = i
-                while j < len(all_events) and abs(all_events[j]['time'] - t) < 0.001 \
-                      and all_events[j]['type'] == 'PARENT' and all_events[j]['graph'] == evt['graph']:
-                    simul_count += 1
-                    j += 1
-
-                k = i
-                while k >= 0 and abs(all_events[k]['time'] - t) < 0.001 \
-                      and all_events[k]['type'] == 'PARENT' and all_events[k]['graph'] == evt['graph']:
-                    idx_in_batch += 1
-                    k -= 1
-
-                color = COLORS[(idx_in_batch - 1) % len(COLORS)]
-
-                bend_deg = ARROW_BEND + ((idx_in_batch - 1) * 15)
-                bend_cmd = f"bend right={bend_deg}"
-
-                content.append(fr"\draw[->, thick, {color}, >={latex_arrow_head()}, {bend_cmd}] ({child}, {y_pos:.2f}) to ({parent}, {y_pos:.2f});")
-
-        i += 1
-
-    content.append(r"\end{tikzpicture}")
-
     with open(output_path, 'w') as f:
-        f.write("\n".join(content))
+        separator = ""
+
+        def write_page(lines):
+            nonlocal separator
+            f.write(separator + "\n".join(lines))
+            f.flush()
+            separator = "\n"
+
+        for (t, label, kind, node, peer, graph), _, idx_in_batch in batch_positions(records, _parent_change_graph):
+            # Pagination
+            if t > current_page_end_time:
+                content.extend(close_page())
+                write_page(content)
+                current_page_idx += 1
+                current_page_start_time = current_page_end_time
+                current_page_end_time += time_per_page
+                content = add_header(current_page_start_time)
+                last_label_y = -999
+                drawn_senders.clear() # Clear dedupe cache for new page
+
+            counts[graph] += 1
+            y_pos = (t - current_page_start_time) * Y_SCALE_CM
+            x_shift = offsets[graph]
+
+            # Timestamp (Left Axis)
+            if abs(y_pos - last_label_y) > MIN_LABEL_DIST_CM:
+                # We put this at x=-1 to ensure it sits left of the grid
+                content.append(fr"\node[anchor=east, font=\tiny, color=gray] at (-0.5, {y_pos:.2f}) {{{label}}};")
+                last_label_y = y_pos
+
+            if kind == KIND_DIO:
+                rx = node + x_shift
+                tx = peer + x_shift
+
+                # 1. Draw Receiver (Small Filled)
+                content.append(fr"\fill[green!60!black] ({rx}, {y_pos:.2f}) circle (2pt);")
+
+                # 2. Draw Sender (Large Hollow) - Deduplicated
+                sender_key = (t, peer, graph)
+                if sender_key not in drawn_senders:
+                    content.append(fr"\draw[green!60!black, thick] ({tx}, {y_pos:.2f}) circle (4pt);")
+                    drawn_senders.add(sender_key)
+
+            elif kind == KIND_DAG:
+                child = node + x_shift
+
+                if peer == 0:
+                    content.append(fr"\node[cross out, draw=black, thick, inner sep=2pt] at ({child}, {y_pos:.2f}) {{}};")
+                else:
+                    parent = peer + x_shift
+
+                    color = COLORS[(idx_in_batch - 1) % len(COLORS)]
+
+                    bend_deg = ARROW_BEND + ((idx_in_batch - 1) * 15)
+                    bend_cmd = f"bend right={bend_deg}"
+
+                    content.append(fr"\draw[->, thick, {color}, >={latex_arrow_head()}, {bend_cmd}] ({child}, {y_pos:.2f}) to ({parent}, {y_pos:.2f});")
+
+        content.append(r"\end{tikzpicture}")
+        write_page(content)
+
     print(f"Generated side-by-side TikZ: {output_path}")
+    return tuple(counts)
 
 def latex_arrow_head():
     return "stealth"
@@ -281,23 +308,50 @@ def latex_arrow_head():
 def main():
     parser = argparse.ArgumentParser(description="Visualize RPL Log Comparison")
     parser.add_argument("logfile", type=Path, help="Path to raw log")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse the raw log")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parser processes for large logs (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--stream", action="store_true",
+                        help="Render pages while the log is read (no cache, constant memory)")
+    parser.add_argument("--nodes", help="Node IDs for --stream, e.g. 1-20 or 1-8,12")
+    parser.add_argument("--pdf", action="store_true",
+                        help="Also compile the output page by page in parallel (cached per page)")
+    parser.add_argument("--latex-workers", type=int, default=PAGE_WORKERS,
+                        help=f"Concurrent LaTeX runs for --pdf (default: {PAGE_WORKERS})")
+    add_window_args(parser)
     args = parser.parse_args()
 
     if not args.logfile.exists():
         print("Error: File not found.")
         sys.exit(1)
-
-    print(f"Parsing {args.logfile}...")
-    nodes, ev_l, ev_r = parse_log_file(args.logfile)
-
-    if not nodes:
-        print("No nodes found.")
-        sys.exit(1)
-
-    print(f"Nodes: {len(nodes)}")
-    print(f"Left ({L_DAG}): {len(ev_l)} events. Right ({R_DAG}): {len(ev_r)} events.")
-
-    generate_tikz_pages(nodes, ev_l, ev_r, OUTPUT_FILENAME)
+    t_from, t_to = parse_window_args(args)
+
+    if args.stream:
+        if not args.nodes:
+            print("Error: --stream needs --nodes (the grid is drawn before the log is read).")
+            sys.exit(1)
+        nodes = parse_node_list(args.nodes)
+        print(f"Streaming {args.logfile}...")
+        n_left, n_right = generate_tikz_pages(nodes, stream_records(args.logfile, t_from, t_to), OUTPUT_FILENAME) or (0, 0)
+        print(f"Left ({L_DAG}): {n_left} events. Right ({R_DAG}): {n_right} events.")
+    else:
+        print(f"Parsing {args.logfile}...")
+        nodes, table = parse_log_file(args.logfile, use_cache=not args.no_cache, workers=args.workers,
+                                      t_from=t_from, t_to=t_to)
+
+        if not nodes:
+            print("No nodes found.")
+            sys.exit(1)
+
+        print(f"Nodes: {len(nodes)}")
+        _, graphs = compare_events(table)
+        n_left = int(np.count_nonzero(graphs == 0))
+        print(f"Left ({L_DAG}): {n_left} events. Right ({R_DAG}): {len(graphs) - n_left} events.")
+
+        generate_tikz_pages(nodes, table_records(table), OUTPUT_FILENAME)
+
+    if args.pdf:
+        compile_tex_pages(OUTPUT_FILENAME, workers=args.latex_workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Produces the comparison graph, the DIO graph, the PNG plot and the timeline
+from ONE scan of a raw Cooja log.
+
+Each visualize_rpl* script registers its collector on a shared CoojaLogScanner,
+the log is tokenized once, then every output is rendered from the collected events.
+
+Usage:
+    python3 visualize_rpl_all.py <logfile.txt> [--only compare,dio,png,timeline]
+"""
+import sys
+import argparse
+import importlib.util
+from importlib.machinery import SourceFileLoader
+from pathlib import Path
+
+from rpl_log_tokenizer import CoojaLogScanner
+from rpl_event_store import EventStoreBuilder
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+OUTPUTS = ("compare", "dio", "png", "timeline")
+
+def load_script(filename, module_name):
+    """Imports a sibling script whose filename is not a valid module name."""
+    loader = SourceFileLoader(module_name, str(SCRIPT_DIR / filename))
+    spec = importlib.util.spec_from_loader(module_name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+def main():
+    parser = argparse.ArgumentParser(description="Render all RPL log visualizations from a single scan")
+    parser.add_argument("logfile", type=Path, help="Path to raw Cooja log")
+    parser.add_argument("--only", default=",".join(OUTPUTS),
+                        help=f"Comma separated subset of: {', '.join(OUTPUTS)}")
+    args = parser.parse_args()
+
+    if not args.logfile.exists():
+        print("Error: File not found.")
+        sys.exit(1)
+
+    wanted = [o.strip() for o in args.only.split(",") if o.strip()]
+    unknown = [o for o in wanted if o not in OUTPUTS]
+    if unknown:
+        print(f"Error: Unknown output(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    scanner = CoojaLogScanner()
+    renderers = []
+
+    if "compare" in wanted:
+        import visualize_rpl as compare
+        store = EventStoreBuilder()
+        store.subscribe(scanner)
+
+        def render_compare(tok, m=compare, b=store):
+            table = b.freeze(tok)
+            m.generate_tikz_pages(m.compare_nodes(table), m.table_records(table), m.OUTPUT_FILENAME)
+        renderers.append(render_compare)
+
+    if "dio" in wanted:
+        dio_graph = load_script("visualize_rpl-1.py", "visualize_rpl_dio")
+        collector = dio_graph.DioGraphCollector()
+        collector.subscribe(scanner)
+        renderers.append(lambda tok, m=dio_graph, c=collector:
+                         m.generate_tikz_pages(*c.result(tok), m.OUTPUT_FILENAME))
+
+    if "png" in wanted:
+        png = load_script("visualize_rpl.py.1", "visualize_rpl_png")
+        collector = png.PngCollector()
+        collector.subscribe(scanner)
+
+        def render_png(tok, m=png, c=collector):
+            nodes, dios, parents = c.result(tok)
+            m.generate_png(nodes, dios, parents, args.logfile.with_suffix('.png'))
+            m.generate_tikz(nodes, dios, parents, args.logfile.with_suffix('.tex'))
+        renderers.append(render_png)
+
+    if "timeline" in wanted:
+        import visualize_rpl_timeline as timeline
+        builder = timeline.TimelineBuilder(args.logfile)
+        builder.subscribe(scanner)
+        renderers.append(lambda tok, b=builder: b.write(args.logfile))
+
+    print(f"Scanning {args.logfile} once for: {', '.join(wanted)}")
+    tokenizer = scanner.scan(args.logfile)
+
+    if not tokenizer.nodes:
+        print("No nodes found.")
+        sys.exit(1)
+
+    for render in renderers:
+        render(tokenizer)
+
+if __name__ == "__main__":
+    main()
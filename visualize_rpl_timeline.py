@@ -1,10 +1,24 @@
 #!/usr/bin/env python3
+import os
 import sys
 import re
+import time
+import html
+import random
+import argparse
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+from rpl_log_tokenizer import LogTokenizer, TABLE_START, TABLE_ENTRY, TABLE_END, TABLE_TYPES, open_log
+from rpl_event_store import (load_event_table, DEFAULT_WORKERS, FLAG_PREFERRED,
+                             KIND_TABLE_START, KIND_TABLE_ENTRY, KIND_TABLE_END)
+from rpl_log_cache import load_cached_event_table
+from rpl_log_index import load_event_table_window, add_window_args, parse_window_args
+from rpl_layout import StableLayout
+from rpl_page_compiler import compile_tex_pages, DEFAULT_WORKERS as PAGE_WORKERS
+from rpl_latex_format import DUMP_MARKER
+
 # --- Configuration ---
 # Map Instance IDs to recognizable names/roots based on your context
 INSTANCE_MAP = {
@@ -15,21 +29,37 @@ INSTANCE_MAP = {
 # Output filename
 OUTPUT_TEX_FILE = "RPL_Timeline.tex"
 
-def get_latex_preamble(log_filename, generation_time):
+# --- Live (--follow) mode ---
+LIVE_TEX_FILE = "RPL_Timeline_live.tex"   # Snapshot sections, appended as they happen
+FOLLOW_POLL_S = 1.0                       # Wait between reads once the end of the log is reached
+FOLLOW_READ_CHARS = 1 << 20
+HTML_REFRESH_S = 5
+
+def get_latex_preamble(log_filename, generation_time, graphdrawing=True):
 
     # Escape underscores for LaTeX
     safe_filename = log_filename.replace("_", r"\_")
 
+    # The Lua graph-drawing engine is only needed for '\graph [layered layout]'
+    if graphdrawing:
+        tikz_libraries = r"\usetikzlibrary{graphs, arrows.meta}"
+        gd_libraries = (r"\usetikzlibrary{graphdrawing}" "\n"
+                        r"\usegdlibrary{layered, trees} % Requires LuaLaTeX" "\n")
+    else:
+        tikz_libraries = r"\usetikzlibrary{arrows.meta}"
+        gd_libraries = ""
+
+    # Everything before DUMP_MARKER goes into a precompiled format (rpl_latex_format.py);
+    # fontspec and the graph-drawing libraries need Lua, which a format does not keep
     return r"""
 \documentclass[a4paper, portrait]{article}
 \usepackage[margin=1cm, includefoot, top=2.5cm, headheight=15pt]{geometry}
 \usepackage{fancyhdr}
+\usepackage{tikz}
+""" + tikz_libraries + "\n" + DUMP_MARKER + r"""
 \usepackage{fontspec}
 \setmainfont{Latin Modern Roman}
-\usepackage{tikz}
-\usetikzlibrary{graphs, graphdrawing, arrows.meta}
-\usegdlibrary{layered, trees} % Requires LuaLaTeX
-
+""" + gd_libraries + r"""
 % Header Configuration
 \pagestyle{fancy}
 \fancyhf{}
@@ -57,31 +87,71 @@ def get_latex_footer(graphicTime):
     """
 
 class NetworkState:
-    def __init__(self):
+    """
+    Preferred-parent topology with an incremental Zobrist fingerprint.
+    Every instance and every (instance, child, parent) edge has a random 64-bit
+    key; the fingerprint is the XOR of the keys of what is currently present,
+    so it changes in O(1) with each update and equal topologies have equal
+    fingerprints. Mutate the topology only through the methods below.
+    """
+    def __init__(self, seed=0):
         # Structure: self.topology[instance_id][child_id] = parent_id
-        self.topology = defaultdict(dict)
+        self.topology = {}
         self.last_written_topology = None
-        
+        self.fingerprint = 0
+        self._keys = {}
+        self._rng = random.Random(seed)
+
+        # Called as on_change(instance_id, child_id, old_parent, new_parent)
+        # for every change; a parent of None means no parent
+        self.on_change = None
+
+    def _key(self, item):
+        key = self._keys.get(item)
+        if key is None:
+            key = self._keys[item] = self._rng.getrandbits(64)
+        return key
+
+    def instance(self, instance_id):
+        """Child -> parent map of an instance, created (and fingerprinted) on first use."""
+        inst_topology = self.topology.get(instance_id)
+        if inst_topology is None:
+            inst_topology = self.topology[instance_id] = {}
+            self.fingerprint ^= self._key(instance_id)
+        return inst_topology
+
     def update_parent(self, instance_id, child_id, parent_id):
         """
         Updates the parent. 
         Returns True if this actually changed the topology, False otherwise.
         """
-        current_parent = self.topology[instance_id].get(child_id)
+        inst_topology = self.instance(instance_id)
+        current_parent = inst_topology.get(child_id)
         
         if current_parent != parent_id:
-            self.topology[instance_id][child_id] = parent_id
+            if current_parent is not None:
+                self.fingerprint ^= self._key((instance_id, child_id, current_parent))
+            inst_topology[child_id] = parent_id
+            self.fingerprint ^= self._key((instance_id, child_id, parent_id))
+            if self.on_change is not None:
+                self.on_change(instance_id, child_id, current_parent, parent_id)
             return True
         return False
 
+    def remove_parent(self, instance_id, child_id):
+        """Drops the parent of a node. Returns True if it had one."""
+        inst_topology = self.instance(instance_id)
+        if child_id not in inst_topology:
+            return False
+        parent_id = inst_topology.pop(child_id)
+        self.fingerprint ^= self._key((instance_id, child_id, parent_id))
+        if self.on_change is not None:
+            self.on_change(instance_id, child_id, parent_id, None)
+        return True
+
     def get_snapshot_hash(self):
-        """Create a hashable representation of the current state to detect changes."""
-        # Convert dicts to sorted tuples for comparison
-        snap = []
-        for inst in sorted(self.topology.keys()):
-            edges = sorted(self.topology[inst].items())
-            snap.append((inst, tuple(edges)))
-        return tuple(snap)
+        """Fingerprint of the current state, to detect changes in constant time."""
+        return self.fingerprint
 
 def generate_tikz_graph(topology, instance_id):
     """Generates TikZ code for a single Instance graph."""
@@ -124,124 +194,339 @@ def generate_tikz_graph(topology, instance_id):
     tikz.append(r"\end{tikzpicture}")
     return "\n".join(tikz)
 
-def process_log_file(logfile_path):
-    network = NetworkState()
-    
-    # Extract date from filename
-    match = re.search(r"10-RPL-Single-(\d+)\.txt", logfile_path.name)
-    logfileTimestamp = match.group(1) if match else "unknown"
-
-    # Regex Patterns
-    # Matches: 273994:00:19:56.392 Node:2 :[INFO: RPL       ] --- RPL Neighbour Set for Instance ID: 46 ---
-    re_table_start = re.compile(r'(\d+:\d{2}:\d{2}\.\d{3})\s+Node:(\d+)\s+.*RPL Neighbour Set for Instance ID:\s+(\d+)')
-    
-    # Matches: ... Parent: 08 | ... | Fresh U, Pref Y
-    re_entry = re.compile(r'Parent:\s*([0-9a-fA-F]+).*Pref\s+(Y|N)')
-    
-    # Matches: --- End of Table ...
-    re_table_end = re.compile(r'--- End of Table')
-
-    with open(logfile_path, 'r', encoding='utf-8') as f:
-        
-        #latex_content = [get_latex_preamble()]
+class TimelineBuilder:
+    """
+    Builds the timeline document from the neighbour-table events of a CoojaLogScanner.
+    A new section is written whenever a table dump changes the network state.
+    """
+    def __init__(self, logfile_path, layout=None):
+        self.network = NetworkState()
+        # StableLayout for fixed coordinates, None for TikZ graph drawing
+        self.layout = layout
 
         # Add filename and Timestamp in header
         gen_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # Escaping underscores in filename to prevent LaTeX errors
-#        safe_filename = logfile_path.name.replace("_", r"\_")
-#        latex_content.append(f"\\noindent{{\\Large \\textbf{{Log Analysis:}} {safe_filename}}} \\hfill \\small{{Generated: {gen_time}}} \\\\ \\hrule \\vspace{{1cm}}")
+        self.latex_content = [get_latex_preamble(logfile_path.name, gen_time, graphdrawing=layout is None)]
 
-        # Moved details to header
-        latex_content = [get_latex_preamble(logfile_path.name, gen_time)]
-        
-        current_timestamp = ""
-        current_node = None
-        current_instance = None
-        current_preferred_found = False
-        pending_change = False
-
-        for line in f:
-            # 1. Check for Table Start
-            match_start = re_table_start.search(line)
-            if match_start:
-                current_timestamp = match_start.group(1)
-                current_node = str(int(match_start.group(2))) # Normalize '02' to '2'
-                current_instance = match_start.group(3)
-                current_preferred_found = False
-                continue
+        self.current_preferred_found = False
+        self.pending_change = False
+
+        # Log time (relative seconds, 'HH:MM:SS.ms') of the event being handled
+        self.time = None
+        self.label = None
+        # 'HH:MM:SS.ms' of the table being dumped; sections are headed with it
+        self.table_label = None
+
+        # Called as on_snapshot(timestamp, topology, section) for every new snapshot
+        self.on_snapshot = None
+
+    def subscribe(self, scanner):
+        scanner.subscribe(TABLE_START, self.on_table_start)
+        scanner.subscribe(TABLE_ENTRY, self.on_table_entry)
+        scanner.subscribe(TABLE_END, self.on_table_end)
+
+    def on_table_start(self, evt):
+        self.time, self.label = evt.rel_time, evt.timestamp_str
+        self.table_start()
+
+    def on_table_entry(self, evt):
+        self.time, self.label = evt.rel_time, evt.timestamp_str
+        self.table_entry(evt.instance, evt.node, evt.parent, evt.preferred)
+
+    def on_table_end(self, evt):
+        self.time, self.label = evt.rel_time, evt.timestamp_str
+        self.table_end(self.table_label, evt.instance, evt.node)
+
+    def replay(self, table):
+        """Feeds the neighbour-table rows of an EventTable, in log order."""
+        rows = table.select(kind=[KIND_TABLE_START, KIND_TABLE_ENTRY, KIND_TABLE_END]).rows
+        columns = (rows['time'].tolist(), rows['kind'].tolist(), rows['label'].tolist(),
+                   rows['scope'].tolist(), rows['node'].tolist(), rows['peer'].tolist(),
+                   rows['flags'].tolist())
+        strings = table.strings
+        for t, kind, label, scope, node, peer, flags in zip(*columns):
+            self.time, self.label = t, strings[label]
+            if kind == KIND_TABLE_START:
+                self.table_start()
+            elif kind == KIND_TABLE_ENTRY:
+                self.table_entry(strings[scope], node, peer, bool(flags & FLAG_PREFERRED))
+            else:
+                self.table_end(self.table_label, strings[scope], node)
+
+    # 1. Table Start
+    def table_start(self):
+        self.current_preferred_found = False
+        self.table_label = self.label
+
+    # 2. Table Entries (only inside a table)
+    def table_entry(self, instance, node, parent, preferred):
+        if preferred:
+            # Parent arrives as hex (08), stored as decimal string (8)
+            parent_id = str(parent)
+
+            # Update Network State
+            if self.network.update_parent(instance, str(node), parent_id):
+                self.pending_change = True
+
+            self.current_preferred_found = True
+
+    # 3. Table End
+    def table_end(self, timestamp, current_instance, node):
+        network = self.network
+        current_node = str(node)
+
+        # Handle case where a node has NO preferred parent (lost connectivity)
+        if not self.current_preferred_found:
+            # If it previously had a parent in this instance, remove it
+            if network.remove_parent(current_instance, current_node):
+                self.pending_change = True
+
+        # IF the network state changed effectively, write a snapshot
+        if self.pending_change:
+            # Only write if the global hash changed (deduplication)
+            current_hash = network.get_snapshot_hash()
+            if current_hash != network.last_written_topology:
+                self.write_snapshot(timestamp)
+                network.last_written_topology = current_hash
+                self.pending_change = False # Reset flag
+
+    def write_snapshot(self, timestamp):
+        topology = self.network.topology
+        section = snapshot_section(timestamp, topology, self.layout)
+        self.latex_content.extend(section)
+        if self.on_snapshot is not None:
+            self.on_snapshot(timestamp, topology, section)
+
+    def write(self, logfile_path):
+        # Extract date from filename
+        match = re.search(r"10-RPL-Single-(\d+)\.txt", logfile_path.name)
+        logfileTimestamp = match.group(1) if match else "unknown"
+
+        self.latex_content.append(get_latex_footer(logfileTimestamp))
 
-            # 2. Check for Table Entries (only if we are inside a table)
-            if current_node and current_instance:
-                match_entry = re_entry.search(line)
-                if match_entry:
-                    parent_hex = match_entry.group(1)
-                    is_preferred = match_entry.group(2) == 'Y'
-                    
-                    if is_preferred:
-                        # Convert hex parent (08) to decimal string (8)
-                        parent_id = str(int(parent_hex, 16))
-                        
-                        # Update Network State
-                        if network.update_parent(current_instance, current_node, parent_id):
-                            pending_change = True
-                        
-                        current_preferred_found = True
-
-                # 3. Check for Table End
-                if re_table_end.search(line):
-                    # Handle case where a node has NO preferred parent (lost connectivity)
-                    if not current_preferred_found:
-                        # If it previously had a parent in this instance, remove it
-                        if current_node in network.topology[current_instance]:
-                            del network.topology[current_instance][current_node]
-                            pending_change = True
-                    
-                    # IF the network state changed effectively, write a snapshot
-                    if pending_change:
-                        # Only write if the global hash changed (deduplication)
-                        current_hash = network.get_snapshot_hash()
-                        if current_hash != network.last_written_topology:
-                            
-                            # --- Generate Latex Page ---
-#                            latex_content.append(r"\clearpage") # Don't want a new page for per section
-                            latex_content.append(f"\\section*{{Timestamp: {current_timestamp}}}")
-                            latex_content.append(r"\begin{center}")
-                            
-                            # Side by Side layout
-                            latex_content.append(r"\begin{minipage}[t]{0.48\textwidth}")
-                            latex_content.append(r"\centering \textbf{DODAG 1 (fd00)}\\ \vspace{0.5cm}")
-                            latex_content.append(generate_tikz_graph(network.topology, '30'))
-                            latex_content.append(r"\end{minipage}\hfill")
-                            latex_content.append(r"\begin{minipage}[t]{0.48\textwidth}")
-                            latex_content.append(r"\centering \textbf{DODAG 2 (fd02)}\\ \vspace{0.5cm}")
-                            latex_content.append(generate_tikz_graph(network.topology, '46'))
-                            latex_content.append(r"\end{minipage}")
-                            
-                            latex_content.append(r"\end{center}")
-                            
-                            network.last_written_topology = current_hash
-                            pending_change = False # Reset flag
-
-                    # Reset State variables
-                    current_node = None
-                    current_instance = None
-
-        latex_content.append(get_latex_footer(logfileTimestamp))
-        
         # Write to file
         with open(OUTPUT_TEX_FILE, 'w') as out:
-            out.write("\n".join(latex_content))
-            
-        print(f"Generated {OUTPUT_TEX_FILE} with {len(latex_content)} lines.")
+            out.write("\n".join(self.latex_content))
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 visualize_rpl_timeline.py <logfile.txt>")
-        sys.exit(1)
-    
-    log_file = Path(sys.argv[1])
-    if not log_file.exists():
-        print(f"File not found: {log_file}")
+        print(f"Generated {OUTPUT_TEX_FILE} with {len(self.latex_content)} lines.")
+
+def generate_tikz_graph_fixed(topology, instance_id, layout):
+    """Same drawing as generate_tikz_graph, with coordinates from a StableLayout."""
+    config = INSTANCE_MAP.get(instance_id, {'name': f'Instance {instance_id}', 'root': '?'})
+    return layout.tikz(topology.get(instance_id, {}), config['root'])
+
+def snapshot_section(timestamp, topology, layout=None):
+    """LaTeX lines for one timeline snapshot: both DODAGs side by side."""
+    if layout is None:
+        graph = generate_tikz_graph
+    else:
+        def graph(topology, instance_id):
+            return generate_tikz_graph_fixed(topology, instance_id, layout)
+
+    section = []
+    section.append(f"\\section*{{Timestamp: {timestamp}}}")
+    section.append(r"\begin{center}")
+
+    # Side by Side layout
+    section.append(r"\begin{minipage}[t]{0.48\textwidth}")
+    section.append(r"\centering \textbf{DODAG 1 (fd00)}\\ \vspace{0.5cm}")
+    section.append(graph(topology, '30'))
+    section.append(r"\end{minipage}\hfill")
+    section.append(r"\begin{minipage}[t]{0.48\textwidth}")
+    section.append(r"\centering \textbf{DODAG 2 (fd02)}\\ \vspace{0.5cm}")
+    section.append(graph(topology, '46'))
+    section.append(r"\end{minipage}")
+
+    section.append(r"\end{center}")
+    return section
+
+def topology_text(topology, instance_id):
+    """Plain-text tree of one instance, for the live view."""
+    config = INSTANCE_MAP.get(instance_id, {'name': f'Instance {instance_id}', 'root': '?'})
+    inst_topology = topology.get(instance_id, {})
+
+    children = defaultdict(list)
+    for child, parent in inst_topology.items():
+        children[parent].append(child)
+
+    lines = [f"{config['name']}: {len(inst_topology)} nodes with a parent", f"  {config['root']} (root)"]
+    placed = set()
+
+    def walk(node, depth):
+        for child in sorted(children.get(node, []), key=int):
+            if child in placed:
+                lines.append("  " * depth + f"`- {child} (loop)")
+                continue
+            placed.add(child)
+            lines.append("  " * depth + f"`- {child}")
+            walk(child, depth + 1)
+
+    walk(config['root'], 2)
+
+    detached = sorted(set(inst_topology) - placed, key=int)
+    if detached:
+        lines.append("  Not connected to root: " + ", ".join(f"{c}->{inst_topology[c]}" for c in detached))
+    return lines
+
+class LiveView:
+    """
+    Output of --follow: every new snapshot is appended to a TikZ fragment file
+    (\\input it after the timeline preamble), reported on the console and,
+    optionally, shown on a self-refreshing HTML page.
+    """
+    def __init__(self, logfile_path, tex_path=LIVE_TEX_FILE, html_path=None):
+        self.logfile_path = logfile_path
+        self.tex_path = tex_path
+        self.html_path = html_path
+        self.count = 0
+        open(tex_path, 'w').close()
+
+    def snapshot(self, timestamp, topology, section):
+        self.count += 1
+        with open(self.tex_path, 'a') as f:
+            f.write("\n".join(section) + "\n")
+
+        sizes = ", ".join(f"{inst}: {len(topology.get(inst, {}))} nodes" for inst in INSTANCE_MAP)
+        print(f"[{timestamp}] Snapshot {self.count}: {sizes}")
+
+        if self.html_path:
+            self.write_html(timestamp, topology)
+
+    def write_html(self, timestamp, topology):
+        text = [f"Snapshot {self.count} at {timestamp}", ""]
+        for inst in INSTANCE_MAP:
+            text.extend(topology_text(topology, inst))
+            text.append("")
+        page = (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+                f"<meta http-equiv=\"refresh\" content=\"{HTML_REFRESH_S}\">"
+                f"<title>{html.escape(self.logfile_path.name)}</title></head>\n"
+                f"<body><h3>{html.escape(str(self.logfile_path))}</h3>\n"
+                f"<pre>{html.escape(chr(10).join(text))}</pre>\n"
+                f"<p>Updated {datetime.now().strftime('%H:%M:%S')}</p></body></html>\n")
+        tmp_path = self.html_path.with_name(self.html_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(page)
+        os.replace(tmp_path, self.html_path)
+
+def follow_lines(path, poll_interval=FOLLOW_POLL_S, idle_exit=None):
+    """
+    Generator over the lines of a log that is still being written, from the start.
+    A partial final line is held back until its newline arrives. Stops when the
+    log is truncated or replaced (a new run), or after idle_exit seconds
+    without growth (None = follow until interrupted).
+    """
+    while not path.exists():
+        time.sleep(poll_interval)
+
+    with open_log(path) as f:
+        ino = os.fstat(f.fileno()).st_ino
+        size_seen = 0
+        pending = ""
+        idle = 0.0
+        while True:
+            chunk = f.read(FOLLOW_READ_CHARS)
+            if chunk:
+                idle = 0.0
+                size_seen = os.fstat(f.fileno()).st_size
+                lines = (pending + chunk).split("\n")
+                pending = lines.pop()
+                yield from lines
+                continue
+
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                st = None
+            if st is None or st.st_ino != ino or st.st_size < size_seen:
+                print(f"{path} was truncated or replaced, stopping.")
+                break
+            if idle_exit is not None and idle >= idle_exit:
+                print(f"No new output for {idle_exit:g}s, stopping.")
+                break
+            time.sleep(poll_interval)
+            idle += poll_interval
+
+        if pending:
+            yield pending
+
+def follow_log_file(logfile_path, poll_interval=FOLLOW_POLL_S, idle_exit=None, html_path=None,
+                    layout=None):
+    """
+    Live timeline of a running simulation: lines are tokenized as they are
+    written and every topology change is emitted straight away (LiveView).
+    The full timeline document is written when following stops (Ctrl-C).
+    """
+    builder = TimelineBuilder(logfile_path, layout)
+    view = LiveView(logfile_path, html_path=html_path)
+    builder.on_snapshot = view.snapshot
+
+    tokenizer = LogTokenizer(types=TABLE_TYPES)
+    handlers = {TABLE_START: builder.on_table_start,
+                TABLE_ENTRY: builder.on_table_entry,
+                TABLE_END: builder.on_table_end}
+
+    print(f"Following {logfile_path} (Ctrl-C to stop), snapshots in {view.tex_path}")
+    try:
+        for line in follow_lines(logfile_path, poll_interval, idle_exit):
+            for evt in tokenizer.feed(line):
+                handlers[evt.type](evt)
+    except KeyboardInterrupt:
+        print("Stopped following.")
+    builder.write(logfile_path)
+
+def process_log_file(logfile_path, use_cache=True, workers=1, layout=None, t_from=None, t_to=None):
+    if t_from is not None or t_to is not None:
+        table = load_event_table_window(logfile_path, t_from, t_to)
+    elif use_cache:
+        table = load_cached_event_table(logfile_path, workers=workers)
+    else:
+        table = load_event_table(logfile_path, workers)
+    if layout == "python":
+        layout = StableLayout(known_nodes=table.nodes.tolist())
+    builder = TimelineBuilder(logfile_path, layout)
+    builder.replay(table)
+    builder.write(logfile_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="RPL topology timeline from a Cooja log")
+    parser.add_argument("logfile", type=Path, help="Path to raw log")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse the raw log")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parser processes for large logs (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--layout", choices=("graphdrawing", "python"), default="graphdrawing",
+                        help="Lay DODAGs out with TikZ graph drawing in LuaLaTeX (default) "
+                             "or with fixed, stable coordinates computed here (much faster to compile)")
+    parser.add_argument("--pdf", action="store_true",
+                        help="Also compile the output page by page in parallel (cached per page)")
+    parser.add_argument("--latex-workers", type=int, default=PAGE_WORKERS,
+                        help=f"Concurrent LaTeX runs for --pdf (default: {PAGE_WORKERS})")
+    parser.add_argument("--follow", action="store_true",
+                        help="Tail a log that is still being written and emit snapshots live")
+    parser.add_argument("--html", type=Path, help="With --follow: also keep this HTML view up to date")
+    parser.add_argument("--poll", type=float, default=FOLLOW_POLL_S,
+                        help=f"With --follow: seconds between checks for new output (default: {FOLLOW_POLL_S})")
+    parser.add_argument("--idle-exit", type=float,
+                        help="With --follow: stop after this many seconds without new output")
+    add_window_args(parser)
+    args = parser.parse_args()
+    t_from, t_to = parse_window_args(args)
+    if args.follow and (t_from is not None or t_to is not None):
+        print("Error: --from/--to cannot be used with --follow")
         sys.exit(1)
-        
-    process_log_file(log_file)
+
+    if args.follow:
+        follow_log_file(args.logfile, args.poll, args.idle_exit, args.html,
+                        StableLayout() if args.layout == "python" else None)
+    else:
+        if not args.logfile.exists():
+            print(f"File not found: {args.logfile}")
+            sys.exit(1)
+
+        process_log_file(args.logfile, use_cache=not args.no_cache, workers=args.workers,
+                         layout=args.layout if args.layout == "python" else None, t_from=t_from, t_to=t_to)
+
+    if args.pdf:
+        compile_tex_pages(OUTPUT_TEX_FILE, workers=args.latex_workers)
+
+if __name__ == "__main__":
+    main()
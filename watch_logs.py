@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Watch a folder for finished Cooja logs and process each one once.
+
+A log (a name like 10-RPL-20250702210825.txt) counts as finished once it
+has not been written for --stable seconds, or as soon as one of
+END_MARKERS appears in its last few KB. Finished logs are queued for the
+pipelines below and run by a bounded pool of workers:
+
+    rpl        process_rpl_log.py <log> --no-view     (text/graph/table/routes, summary)
+    timeline   process_timeline.sh <log> --no-view    (RPL_Timeline-<ts>.pdf)
+
+Both can run for several logs at once: process_rpl_log.py keeps per-run
+files and process_timeline.sh takes a lock around its shared RPL_Timeline.tex.
+
+Every log's status is kept in STATE_FILE, so a restarted watcher skips the
+logs already done; a log that is rewritten later is processed again. A
+failed log is retried after RETRY_BASE_S, doubling each time, up to
+--max-attempts. Output of each run goes to WATCH_LOG_DIR/<log name>.log.
+
+Usage:
+    python3 watch_logs.py ~/contiki-ng/tools/cooja [--pipeline rpl,timeline] [--workers 2]
+    python3 watch_logs.py <dir> --once          # process what is finished now, then exit
+    python3 watch_logs.py --status
+"""
+import os
+import re
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# --- Configuration ---
+DATA_DIR = Path.home() / "data"
+STATE_FILE = DATA_DIR / "watch_state.json"
+WATCH_LOG_DIR = DATA_DIR / "watch"
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+LOG_NAME = re.compile(r"RPL.*\d{14}\.txt$")
+END_MARKERS = (b"TEST OK", b"TEST FAILED", b"Simulation stopped")
+TAIL_BYTES = 4096
+
+POLL_S = 10.0
+STABLE_S = 120.0          # No writes for this long = finished
+DEFAULT_WORKERS = 2
+MAX_ATTEMPTS = 4
+RETRY_BASE_S = 60.0       # Then 120, 240, ...
+
+PIPELINES = {
+    'rpl': lambda log: [sys.executable, str(SCRIPTS_DIR / "process_rpl_log.py"), str(log), "--no-view"],
+    'timeline': lambda log: ["bash", str(SCRIPTS_DIR / "process_timeline.sh"), str(log), "--no-view"],
+}
+
+
+def has_end_marker(path):
+    try:
+        with open(path, 'rb') as f:
+            f.seek(max(0, os.path.getsize(path) - TAIL_BYTES))
+            tail = f.read()
+    except OSError:
+        return False
+    return any(marker in tail for marker in END_MARKERS)
+
+
+def process_log(log, pipelines):
+    """Runs the pipelines on one log in order; (ok, seconds, error)."""
+    WATCH_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    start = time.time()
+    with open(WATCH_LOG_DIR / f"{log.name}.log", 'a', encoding='utf-8') as out:
+        for name in pipelines:
+            command = PIPELINES[name](log)
+            out.write(f"\n=== {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {' '.join(command)}\n")
+            out.flush()
+            result = subprocess.run(command, stdout=out, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+            if result.returncode != 0:
+                return False, time.time() - start, f"{name} exited with {result.returncode}"
+    return True, time.time() - start, None
+
+
+class LogWatcher:
+    def __init__(self, watch_dir, pipelines, workers=DEFAULT_WORKERS, stable_s=STABLE_S,
+                 max_attempts=MAX_ATTEMPTS, state_file=STATE_FILE):
+        self.watch_dir = watch_dir
+        self.pipelines = pipelines
+        self.workers = workers
+        self.stable_s = stable_s
+        self.max_attempts = max_attempts
+        self.state_file = state_file
+        self.state = load_state(state_file)
+        self.stopping = False
+
+    def save(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp_path, self.state_file)
+
+    def ready_logs(self, busy):
+        """Finished logs that need a (first, repeated or retried) run, oldest first."""
+        now = time.time()
+        ready = []
+        with os.scandir(self.watch_dir) as entries:
+            for entry in entries:
+                if not LOG_NAME.search(entry.name) or not entry.is_file():
+                    continue
+                path = str(Path(entry.path).resolve())
+                if path in busy:
+                    continue
+                st = entry.stat()
+                if now - st.st_mtime < self.stable_s and not has_end_marker(path):
+                    continue   # Still being written
+
+                record = self.state.get(path)
+                if record is None or (record['size'], record['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+                    # New, or rewritten since it was processed
+                    self.state[path] = record = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                                 'status': 'pending', 'attempts': 0, 'next_try': 0.0}
+                if record['status'] == 'pending' or (record['status'] == 'failed' and now >= record['next_try']):
+                    ready.append((st.st_mtime, path))
+        return [Path(p) for _, p in sorted(ready)]
+
+    def finish(self, path, ok, seconds, error):
+        record = self.state[str(path)]
+        record['attempts'] += 1
+        record['seconds'] = round(seconds, 1)
+        record['finished'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if ok:
+            record['status'] = 'done'
+            record.pop('error', None)
+            print(f"Processed {path.name} in {seconds:.0f}s")
+        elif record['attempts'] >= self.max_attempts:
+            record['status'] = 'gave up'
+            record['error'] = error
+            print(f"Failed {path.name}: {error}; giving up after {record['attempts']} attempts "
+                  f"(see {WATCH_LOG_DIR / (path.name + '.log')})")
+        else:
+            delay = RETRY_BASE_S * 2 ** (record['attempts'] - 1)
+            record['status'] = 'failed'
+            record['error'] = error
+            record['next_try'] = time.time() + delay
+            print(f"Failed {path.name}: {error}; retrying in {delay:.0f}s")
+        self.save()
+
+    def run(self, poll=POLL_S, once=False):
+        """Polls until stopped; with once, returns when nothing is left to do right now."""
+        print(f"Watching {self.watch_dir} ({', '.join(self.pipelines)}, {self.workers} workers)")
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            while True:
+                if not self.stopping:
+                    busy = {str(p) for p in running.values()}
+                    for path in self.ready_logs(busy)[:max(0, self.workers - len(running))]:
+                        self.state[str(path)]['status'] = 'running'
+                        print(f"Processing {path.name}")
+                        running[pool.submit(process_log, path, self.pipelines)] = path
+                    self.save()
+
+                if not running and (once or self.stopping):
+                    break
+                done, _ = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        ok, seconds, error = future.result()
+                    except OSError as e:
+                        ok, seconds, error = False, 0.0, str(e)
+                    self.finish(path, ok, seconds, error)
+
+    def stop(self, *_):
+        if not self.stopping:
+            print("Stopping: waiting for the running logs to finish")
+        self.stopping = True
+
+
+def load_state(state_file=STATE_FILE):
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    for record in state.values():
+        if record['status'] == 'running':   # Interrupted: run it again
+            record['status'] = 'pending'
+    return state
+
+
+def print_status(state):
+    for path, record in sorted(state.items(), key=lambda e: e[1].get('finished', '')):
+        line = f"{record['status']:8s} {record['attempts']}x  {record.get('finished', ''):19s}  {Path(path).name}"
+        if record.get('error'):
+            line += f"  ({record['error']})"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process finished Cooja logs as they appear")
+    parser.add_argument("watch_dir", type=Path, nargs="?", help="Folder the logs are written to")
+    parser.add_argument("--pipeline", default="rpl,timeline",
+                        help=f"Comma separated, run in order per log; from {', '.join(PIPELINES)} (default: rpl,timeline)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Logs processed at the same time (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--stable", type=float, default=STABLE_S,
+                        help=f"Seconds without writes before a log counts as finished (default: {STABLE_S:.0f})")
+    parser.add_argument("--poll", type=float, default=POLL_S, help=f"Seconds between scans (default: {POLL_S:.0f})")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                        help=f"Runs of a failing log before giving up (default: {MAX_ATTEMPTS})")
+    parser.add_argument("--once", action="store_true", help="Process the logs finished now, then exit")
+    parser.add_argument("--retry", action="store_true", help="Clear given-up logs so they are tried again")
+    parser.add_argument("--status", action="store_true", help=f"Show {STATE_FILE} and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status(load_state())
+        return
+
+    if args.watch_dir is None or not args.watch_dir.is_dir():
+        print(f"Directory not found: {args.watch_dir}")
+        sys.exit(1)
+    pipelines = [p.strip() for p in args.pipeline.split(",") if p.strip()]
+    unknown = [p for p in pipelines if p not in PIPELINES]
+    if unknown or not pipelines:
+        print(f"Unknown pipeline: {', '.join(unknown)} (choose from {', '.join(PIPELINES)})")
+        sys.exit(1)
+
+    watcher = LogWatcher(args.watch_dir, pipelines, args.workers, args.stable, args.max_attempts)
+    if args.retry:
+        for record in watcher.state.values():
+            if record['status'] == 'gave up':
+                record.update(status='failed', attempts=0, next_try=0.0)
+    signal.signal(signal.SIGTERM, watcher.stop)
+    signal.signal(signal.SIGINT, watcher.stop)
+    watcher.run(args.poll, args.once)
+
+
+if __name__ == "__main__":
+    main()